@@ -6,12 +6,28 @@ Render デプロイメント用
 
 import os
 import sys
+import json
 from pathlib import Path
 from dotenv import load_dotenv
 import logging
+import logging.handlers
+import functools
+import queue
+import atexit
 
-# 環境変数を読み込み
-load_dotenv()
+# 環境変数を読み込み（1プロセス1回のみ）
+# 本番環境（Render）ではプラットフォームが設定した環境変数を使用するため .env は読み込まない
+_LOADED = False
+
+def _load_once():
+    """.env ファイルを一度だけ読み込む"""
+    global _LOADED
+    if _LOADED or os.environ.get('FLASK_ENV') == 'production':
+        return
+    load_dotenv()
+    _LOADED = True
+
+_load_once()
 
 # プロジェクトルートをパスに追加
 project_root = Path(__file__).parent
@@ -19,63 +35,128 @@ sys.path.insert(0, str(project_root))
 
 # 設定クラスをインポート
 from src.core.config import Config
+from flask.sessions import SessionInterface
+
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
+
+# レスポンス圧縮設定（brotli → gzip の順に交渉）
+COMPRESS_SETTINGS = {
+    'COMPRESS_ALGORITHM': ['br', 'gzip'],
+    'COMPRESS_MIMETYPES': ['text/html', 'application/json', 'text/css', 'application/javascript'],
+    'COMPRESS_LEVEL': 4,
+    'COMPRESS_BR_LEVEL': 4,
+    'COMPRESS_MIN_SIZE': 500,
+}
+
+# ログ出力スレッド（ファイル書き込みをリクエスト処理スレッドから切り離す）
+_log_queue_handler = None
+_log_listener = None
+
+def _start_log_listener():
+    """QueueListener を起動し、ログ送信用の QueueHandler を返す"""
+    global _log_queue_handler, _log_listener
+    
+    log_queue = queue.Queue(-1)
+    _log_queue_handler = logging.handlers.QueueHandler(log_queue)
+    _log_listener = logging.handlers.QueueListener(
+        log_queue,
+        logging.FileHandler(Config.LOG_FILE_STR),
+        logging.StreamHandler(),
+        respect_handler_level=True
+    )
+    _log_listener.start()
+    atexit.register(_stop_log_listener)
+    
+    return _log_queue_handler
+
+def _stop_log_listener():
+    """ログ出力スレッドを停止（キューに残ったログを書き出す）"""
+    if _log_listener is not None and _log_listener._thread is not None:
+        _log_listener.stop()
+
+def restart_log_listener():
+    """フォーク後のワーカーでログ出力スレッドを再起動
+    
+    スレッドはフォーク先に引き継がれないため、新しいキューで QueueListener を作り直す。
+    """
+    global _log_listener
+    if _log_listener is None:
+        return
+    
+    log_queue = queue.Queue(-1)
+    _log_queue_handler.queue = log_queue
+    _log_listener = logging.handlers.QueueListener(
+        log_queue,
+        *_log_listener.handlers,
+        respect_handler_level=True
+    )
+    _log_listener.start()
 
 # 本番環境用設定
 def setup_production_environment():
     """本番環境用の設定を適用"""
     
-    # 必要なディレクトリを作成
-    Config.create_directories()
-    
-    # ログ設定
-    log_level = os.environ.get('LOG_LEVEL', Config.LOG_LEVEL)
-    logging.basicConfig(
-        level=getattr(logging, log_level),
-        format=Config.LOG_FORMAT,
-        handlers=[
-            logging.FileHandler(Config.LOG_FILE),
-            logging.StreamHandler()
-        ]
-    )
+    # 必要なディレクトリを作成（作成済みの場合はスキップ）
+    Config.create_directories_once()
+    
+    # ログ設定（ハンドラーが既に設定済みの場合は重複登録しない）
+    if not logging.getLogger().handlers:
+        log_level = os.environ.get('LOG_LEVEL', Config.LOG_LEVEL)
+        logging.basicConfig(
+            level=getattr(logging, log_level),
+            format=Config.LOG_FORMAT,
+            handlers=[_start_log_listener()]
+        )
     
     logger = logging.getLogger(__name__)
     logger.info("本番環境設定完了")
     
     return logger
 
-# 本番環境設定を実行
-logger = setup_production_environment()
-
-# Flaskアプリケーションをインポート
-try:
-    from src.web.main import app
-    logger.info("Flaskアプリケーション読み込み完了")
+class StaticRequestFilteringSessionInterface(SessionInterface):
+    """静的ファイル・ヘルスチェックへのリクエストではセッションストアにアクセスしないセッションインターフェース"""
     
-    # 本番用設定を適用
-    app.config.update({
-        'SECRET_KEY': os.environ.get('SECRET_KEY', 'fallback-secret-key-for-render'),
-        'SESSION_FILE_DIR': os.environ.get('SESSION_FILE_DIR', str(Config.PROJECT_ROOT / 'flask_session')),
-        'DATABASE_PATH': os.environ.get('DATABASE_PATH', str(Config.DATABASE_PATH)),
-    })
+    _exclude_path_prefix = ('/static/', '/ready', '/info', '/api/')
     
-    # Flask環境の設定
-    if os.environ.get('FLASK_ENV') == 'production':
-        app.config['DEBUG'] = False
-        app.config['TESTING'] = False
-        logger.info("本番モードで起動")
-    
-except Exception as e:
-    logger.error(f"アプリケーション初期化エラー: {e}")
-    raise
-
-# Renderのヘルスチェック用
-@app.route('/ready')
-def ready():
-    """Render用レディネスチェック"""
-    return {'status': 'ready', 'app': 'it-exam-learning-system'}
-
-# アプリケーション情報
-@app.route('/info')
+    def __init__(self, app):
+        self._delegate = app.session_interface
+    
+    def _is_excluded(self, request):
+        return request.path.startswith(self._exclude_path_prefix)
+    
+    def open_session(self, app, request):
+        if self._is_excluded(request):
+            # ファイルの読み込み・期限更新を行わないダミーセッション
+            return self.make_null_session(app)
+        return self._delegate.open_session(app, request)
+    
+    def save_session(self, app, session, response):
+        if self.is_null_session(session):
+            return None
+        return self._delegate.save_session(app, session, response)
+
+# Render用レディネスチェックのレスポンス（起動時に一度だけエンコード）
+_READY_BODY = json.dumps({'status': 'ready', 'app': 'it-exam-learning-system'}).encode('utf-8')
+_READY = (
+    _READY_BODY,
+    '200 OK',
+    [('Content-Type', 'application/json'), ('Content-Length', str(len(_READY_BODY)))]
+)
+
+def ready_middleware(wsgi_app):
+    """/ready をFlaskのリクエスト処理（セッション等）より前に応答するWSGIミドルウェア"""
+    def wsgi(environ, start_response):
+        if environ.get('PATH_INFO') == '/ready':
+            body, status, headers = _READY
+            start_response(status, headers)
+            return [body]
+        return wsgi_app(environ, start_response)
+    return wsgi
+
 def app_info():
     """アプリケーション情報"""
     return {
@@ -85,11 +166,67 @@ def app_info():
         'python_version': sys.version
     }
 
-if __name__ == '__main__':
-    # 開発用サーバー（本番ではGunicornが使用される）
+@functools.cache
+def get_app():
+    """設定済みのFlaskアプリケーションを取得（初期化は1プロセス1回のみ）"""
+    logger = setup_production_environment()
+    
+    # Flaskアプリケーションをインポート
+    try:
+        from src.web.main import app
+        logger.info("Flaskアプリケーション読み込み完了")
+        
+        # 本番用設定を適用
+        app.config.update({
+            'SECRET_KEY': os.environ.get('SECRET_KEY', 'fallback-secret-key-for-render'),
+            'DATABASE_PATH': os.environ.get('DATABASE_PATH', Config.DATABASE_PATH_STR),
+        })
+        
+        # Flask環境の設定
+        if os.environ.get('FLASK_ENV') == 'production':
+            app.config['DEBUG'] = False
+            app.config['TESTING'] = False
+            logger.info("本番モードで起動")
+        
+    except Exception as e:
+        logger.error(f"アプリケーション初期化エラー: {e}")
+        raise
+    
+    # Render のヘルスチェックや静的ファイル配信でセッションファイルのI/Oを発生させない
+    app.session_interface = StaticRequestFilteringSessionInterface(app)
+    
+    # テキストレスポンスを圧縮
+    if HAS_COMPRESS:
+        app.config.update(COMPRESS_SETTINGS)
+        Compress(app)
+    else:
+        logger.warning("flask-compress が見つかりません。レスポンス圧縮は無効です")
+    
+    # Renderのヘルスチェック用
+    app.wsgi_app = ready_middleware(app.wsgi_app)
+    # アプリケーション情報
+    app.add_url_rule('/info', 'app_info', app_info)
+    
+    return app
+
+app = get_app()
+
+def start_web_server():
+    """Webサーバーを起動（本番ではGunicorn、開発ではFlask開発サーバー）"""
     port = int(os.environ.get('PORT', 5001))
+    
+    if os.environ.get('FLASK_ENV') == 'production':
+        # 本番環境ではGunicornにプロセスを置き換える
+        config_path = str(project_root / 'gunicorn_conf.py')
+        os.execvp('gunicorn', ['gunicorn', '-c', config_path, 'app:app'])
+    
+    # 開発用サーバー（デバッグモードは FLASK_DEBUG=1 の場合のみ）
     app.run(
         host='0.0.0.0',
         port=port,
-        debug=os.environ.get('FLASK_ENV') != 'production'
+        debug=os.environ.get('FLASK_DEBUG') == '1',
+        threaded=True
     )
+
+if __name__ == '__main__':
+    start_web_server()
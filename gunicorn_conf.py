@@ -0,0 +1,48 @@
+"""
+情報技術者試験学習システム - Gunicorn設定
+Render デプロイメント用
+
+使用法: gunicorn -c gunicorn_conf.py app:app
+（エントリーポイントはルートの app.py。/ready・セッション・レスポンス圧縮の設定は app.py で適用する）
+"""
+
+import os
+import sys
+import multiprocessing
+
+# バインド設定
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# ワーカー設定（2 * CPU + 1 を基本とし、DB接続数の増加を防ぐため上限を設ける）
+max_workers = int(os.environ.get("GUNICORN_MAX_WORKERS", 4))
+workers = min(
+    int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)),
+    max_workers
+)
+
+# スレッド設定（I/O待ちのリクエストを並行処理）
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# アプリケーションをマスタープロセスで一度だけ読み込み、フォークしたワーカー間で共有する
+# （ディレクトリ作成・ログ設定は app.get_app() によりマスターで1回だけ実行される）
+preload_app = True
+
+# タイムアウト設定
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+# ログ設定
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    """ワーカーのフォーク後に呼ばれるフック"""
+    # preload_app 時はマスターのログ出力スレッドが引き継がれないため再起動する
+    # （ルートの app.py を読み込み済みの場合のみ。ここで import するとワーカーごとに読み込まれる）
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.restart_log_listener()
+    
+    server.log.info("ワーカー起動: pid=%s", worker.pid)
@@ -3,14 +3,83 @@
 情報技術者試験学習システム - デモンストレーション用Webアプリケーション
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, send_from_directory, abort, make_response
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
 import json
 import os
 from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from functools import lru_cache, wraps
+from itertools import cycle, islice
+from concurrent.futures import ThreadPoolExecutor
+import string
+import hashlib
+import time
+import zlib
+import base64
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from flask_compress import Compress
+    HAS_COMPRESS = True
+except ImportError:
+    HAS_COMPRESS = False
+
+class OrjsonProvider(JSONProvider):
+    """orjson を使用したJSONプロバイダー"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # str へのデコードを経由せず bytes のままレスポンスを作成
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'demo-secret-key'
 
+# 本番環境ではテンプレートの再読み込みを無効化し、キャッシュを拡大
+if os.environ.get('FLASK_ENV') == 'production':
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_options = {**app.jinja_options, 'cache_size': 500, 'auto_reload': False}
+
+# テキストレスポンスを圧縮（brotli → gzip の順に交渉）
+if HAS_COMPRESS:
+    app.config.update({
+        'COMPRESS_ALGORITHM': ['br', 'gzip'],
+        'COMPRESS_MIMETYPES': ['text/html', 'application/json', 'text/css', 'application/javascript'],
+        'COMPRESS_LEVEL': 4,
+        'COMPRESS_BR_LEVEL': 4,
+        'COMPRESS_MIN_SIZE': 500,
+    })
+    Compress(app)
+
+# orjson が利用可能な場合は jsonify を高速化
+if HAS_ORJSON:
+    app.json = OrjsonProvider(app)
+
+# レポート出力ディレクトリ
+REPORTS_DIR = os.path.abspath('reports')
+Path(REPORTS_DIR).mkdir(exist_ok=True)
+
+# デモで扱う試験種別
+DEMO_EXAM_TYPES = ('FE', 'AP', 'IP', 'SG')
+
 # デモ用のサンプルデータ
 sample_stats = {
     'total_questions': 240,
@@ -76,20 +145,288 @@ sample_questions = [
     }
 ]
 
+# デモ用の固定タイムスタンプ（起動時刻）
+_BOOT_TIME = datetime.now()
+
+# デモ用のレポート一覧
+DEMO_REPORTS = (
+    {
+        'name': 'comprehensive_report_FE_20250717_143000.html',
+        'path': 'reports/comprehensive_report_FE_20250717_143000.html',
+        'created': _BOOT_TIME
+    },
+    {
+        'name': 'session_report_20250717_142500.html',
+        'path': 'reports/session_report_20250717_142500.html',
+        'created': _BOOT_TIME
+    },
+    {
+        'name': 'comprehensive_report_FE_20250716_101500.html',
+        'path': 'reports/comprehensive_report_FE_20250716_101500.html',
+        'created': _BOOT_TIME
+    }
+)
+
+# テンプレートのコンテキスト（固定データのため起動時に一度だけ構築し、読み取り専用で共有）
+_INDEX_CTX = MappingProxyType({
+    'stats': sample_stats,
+    'recent_activity': sample_recent_activity,
+    'recommendations': sample_recommendations
+})
+
+_STUDY_CTX = MappingProxyType({
+    'exam_types': list(DEMO_EXAM_TYPES),
+    'categories': ['テクノロジ系', 'マネジメント系', 'ストラテジ系']
+})
+
+demo_progress = {
+    'overall_statistics': sample_stats,
+    'category_statistics': [
+        {'category': 'テクノロジ系', 'total_questions': 120, 'correct_answers': 96, 'correct_rate': 80.0},
+        {'category': 'マネジメント系', 'total_questions': 80, 'correct_answers': 52, 'correct_rate': 65.0},
+        {'category': 'ストラテジ系', 'total_questions': 40, 'correct_answers': 32, 'correct_rate': 80.0}
+    ],
+    'weak_areas': [
+        {'category': 'マネジメント系', 'correct_rate': 65.0, 'total_questions': 80}
+    ],
+    'recent_activity': sample_recent_activity
+}
+
+demo_analysis = {
+    'basic_stats': {
+        'total_questions': 240,
+        'correct_answers': 180,
+        'correct_rate': 0.75,
+        'study_days': 15
+    },
+    'growth_trend': {
+        'trend': 'improving',
+        'weekly_rates': [0.60, 0.65, 0.70, 0.75]
+    },
+    'performance_prediction': {
+        'prediction': 'high_pass_probability',
+        'recent_performance': 0.80,
+        'overall_performance': 0.75
+    }
+}
+
+_PROGRESS_CTX = MappingProxyType({
+    'progress_data': demo_progress,
+    'detailed_analysis': demo_analysis,
+    'exam_type': 'FE',
+    'days': 30
+})
+
+demo_db_info = {
+    'questions_count': 1250,
+    'learning_records_count': 240,
+    'study_sessions_count': 15,
+    'file_size': 2048000,  # 2MB
+    'last_modified': _BOOT_TIME
+}
+
+demo_settings = {
+    'project_root': '/path/to/project',
+    'database_path': '/path/to/database.db',
+    'report_output_dir': '/path/to/reports',
+    'log_level': 'INFO'
+}
+
+_SETTINGS_CTX = MappingProxyType({
+    'db_info': demo_db_info,
+    'settings_info': demo_settings
+})
+
+# デモ用APIレスポンス（固定データのため起動時に一度だけシリアライズ）
+API_CACHE_CONTROL = 'public, max-age=60'
+
+# 1回に返すデモ問題数の上限（問題数ごとのキャッシュが巨大な値で膨らまないようにする）
+MAX_DEMO_QUESTIONS = 100
+
+_STATS_JSON = json.dumps({
+    'overall_statistics': sample_stats,
+    'category_statistics': [
+        {'category': 'テクノロジ系', 'correct_rate': 80.0, 'total_questions': 120},
+        {'category': 'マネジメント系', 'correct_rate': 65.0, 'total_questions': 80},
+        {'category': 'ストラテジ系', 'correct_rate': 80.0, 'total_questions': 40}
+    ]
+}, ensure_ascii=False).encode('utf-8')
+
+def _clamp_question_count(count):
+    """要求された問題数を 0〜MAX_DEMO_QUESTIONS に収める（islice は負数を受け付けない）"""
+    return max(0, min(count, MAX_DEMO_QUESTIONS))
+
+@lru_cache(maxsize=64)
+def _build_demo_questions(count):
+    """指定数のデモ問題を生成（問題数ごとにキャッシュ）"""
+    return tuple(islice(cycle(sample_questions), count))
+
+@lru_cache(maxsize=64)
+def _demo_questions_json(count):
+    """デモ問題のJSONを生成（問題数ごとにキャッシュ）"""
+    return json.dumps(_build_demo_questions(count), ensure_ascii=False).encode('utf-8')
+
+def _json_response(payload):
+    """シリアライズ済みJSONからキャッシュ可能なレスポンスを作成"""
+    response = Response(payload, mimetype='application/json')
+    response.headers['Cache-Control'] = API_CACHE_CONTROL
+    return response
+
+# デモ用レポートのHTMLテンプレート（起動時に一度だけ構築）
+_REPORT_TEMPLATE = string.Template('''
+    <!DOCTYPE html>
+    <html lang="ja">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>学習レポート - $exam_type</title>
+        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
+        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    </head>
+    <body>
+        <div class="container mt-5">
+            <h1 class="text-center mb-4">📊 学習レポート</h1>
+            <div class="row">
+                <div class="col-md-6">
+                    <div class="card">
+                        <div class="card-header">
+                            <h5>学習概要</h5>
+                        </div>
+                        <div class="card-body">
+                            <p><strong>試験種別:</strong> $exam_type</p>
+                            <p><strong>対象期間:</strong> 過去$days日間</p>
+                            <p><strong>生成日時:</strong> $generated_at</p>
+                        </div>
+                    </div>
+                </div>
+                <div class="col-md-6">
+                    <div class="card">
+                        <div class="card-header">
+                            <h5>統計情報</h5>
+                        </div>
+                        <div class="card-body">
+                            <p><strong>学習問題数:</strong> 240問</p>
+                            <p><strong>正答率:</strong> 75%</p>
+                            <p><strong>学習日数:</strong> 15日</p>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            <div class="mt-4 text-center">
+                <p class="text-muted">これはデモンストレーション用のレポートです。</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    ''')
+
+# 試験種別ごとに事前展開したレポートテンプレート（リクエスト時は日数・生成日時のみ置換）
+_REPORT_TEMPLATE_BY_EXAM = {
+    exam_type: _REPORT_TEMPLATE.safe_substitute(exam_type=exam_type).encode('utf-8')
+    for exam_type in DEMO_EXAM_TYPES
+}
+
+# レポートファイル書き込み用のスレッドプール
+_report_writer = ThreadPoolExecutor(max_workers=2)
+
+def _write_report(path, content):
+    """レポートファイルを書き込み（bytes を1回の write で出力）"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, content)
+    finally:
+        os.close(fd)
+
+# テンプレートショーケースのHTML（固定内容のため事前にエンコード）
+_SHOWCASE_HTML = '''
+    <html>
+    <head>
+        <title>テンプレートショーケース</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 20px; }
+            .template-link { 
+                display: block; 
+                margin: 10px 0; 
+                padding: 10px; 
+                background: #f0f0f0; 
+                text-decoration: none; 
+                border-radius: 5px;
+            }
+            .template-link:hover { background: #e0e0e0; }
+        </style>
+    </head>
+    <body>
+        <h1>🎯 情報技術者試験学習システム - テンプレートショーケース</h1>
+        
+        <h2>主要ページ</h2>
+        <a href="/" class="template-link">📊 ダッシュボード - 学習統計と概要</a>
+        <a href="/study" class="template-link">📚 学習ページ - セッション設定</a>
+        <a href="/demo_question" class="template-link">❓ 問題ページ - インタラクティブ問題</a>
+        <a href="/session_result" class="template-link">🎉 結果ページ - セッション結果</a>
+        <a href="/progress" class="template-link">📈 進捗ページ - 学習進捗分析</a>
+        <a href="/reports" class="template-link">📄 レポート一覧 - 生成済みレポート</a>
+        <a href="/settings" class="template-link">⚙️ 設定ページ - システム設定</a>
+        
+        <h2>API エンドポイント</h2>
+        <a href="/api/stats" class="template-link">📊 統計API - JSON形式の統計データ</a>
+        <a href="/api/questions" class="template-link">❓ 問題API - JSON形式の問題データ</a>
+        
+        <h2>特徴</h2>
+        <ul>
+            <li>✅ レスポンシブデザイン（PC・タブレット・スマホ対応）</li>
+            <li>✅ Bootstrap 5.1.3 を使用</li>
+            <li>✅ Font Awesome アイコン</li>
+            <li>✅ Chart.js によるグラフ表示</li>
+            <li>✅ インタラクティブな問題解答</li>
+            <li>✅ リアルタイムの結果フィードバック</li>
+            <li>✅ 美しいアニメーション効果</li>
+        </ul>
+        
+        <p><strong>注意:</strong> これはデモンストレーション用のサンプルデータです。実際の運用には完全なセットアップが必要です。</p>
+    </body>
+    </html>
+    '''.encode('utf-8')
+
+# 起動ごとに変わるETag（デモデータはプロセス内で変化しないため）
+_BOOT_ETAG = hashlib.md5(str(time.time()).encode()).hexdigest()
+STATIC_PAGE_CACHE_CONTROL = 'public, max-age=300'
+
+def etagged(f):
+    """固定内容のページにETagを付与し、一致した場合は 304 を返すデコレーター"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if _BOOT_ETAG in request.if_none_match:
+            response = make_response('', 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+        response.set_etag(_BOOT_ETAG)
+        response.headers['Cache-Control'] = STATIC_PAGE_CACHE_CONTROL
+        return response
+    return wrapper
+
+def _encode_session_data(session_data):
+    """セッションデータをテンプレート埋め込み用に圧縮エンコード
+    
+    JSON → zlib（レベル1）→ base64 の順に変換する。
+    クライアント側では atob と DecompressionStream('deflate') で復元できる。
+    """
+    if HAS_ORJSON:
+        raw = orjson.dumps(session_data)
+    else:
+        raw = json.dumps(session_data, ensure_ascii=False).encode('utf-8')
+    return base64.b64encode(zlib.compress(raw, 1)).decode('ascii')
+
 @app.route('/')
+@etagged
 def index():
     """ダッシュボード"""
-    return render_template('web/index.html', 
-                         stats=sample_stats,
-                         recent_activity=sample_recent_activity,
-                         recommendations=sample_recommendations)
+    return render_template('web/index.html', **_INDEX_CTX)
 
 @app.route('/study')
+@etagged
 def study():
     """学習ページ"""
-    return render_template('web/study.html',
-                         exam_types=['FE', 'AP', 'IP', 'SG'],
-                         categories=['テクノロジ系', 'マネジメント系', 'ストラテジ系'])
+    return render_template('web/study.html', **_STUDY_CTX)
 
 @app.route('/start_session', methods=['POST'])
 def start_session():
@@ -97,11 +434,10 @@ def start_session():
     # セッション設定を取得
     exam_type = request.form.get('exam_type', 'FE')
     mode = request.form.get('mode', 'practice')
-    count = int(request.form.get('count', 20))
+    count = _clamp_question_count(int(request.form.get('count', 20)))
     
-    # デモ用の問題を準備
-    questions = sample_questions * (count // 2 + 1)
-    questions = questions[:count]
+    # デモ用の問題を準備（キャッシュ済みのタプルをそのまま使用し、JSON化時にのみ展開）
+    questions = _build_demo_questions(count)
     
     # セッション情報を簡単に管理（実際にはセッションまたはDBに保存）
     session_data = {
@@ -116,9 +452,10 @@ def start_session():
                          question=questions[0],
                          question_number=1,
                          total_questions=len(questions),
-                         session_data=json.dumps(session_data))
+                         session_data=_encode_session_data(session_data))
 
 @app.route('/demo_question')
+@etagged
 def demo_question():
     """デモ用問題ページ"""
     return render_template('web/question.html',
@@ -144,6 +481,7 @@ def answer():
     })
 
 @app.route('/session_result')
+@etagged
 def session_result():
     """セッション結果（デモ用）"""
     # デモ用の結果データ
@@ -162,67 +500,16 @@ def session_result():
     return render_template('web/session_result.html', summary=demo_summary)
 
 @app.route('/progress')
+@etagged
 def progress():
     """進捗ページ（デモ用）"""
-    demo_progress = {
-        'overall_statistics': sample_stats,
-        'category_statistics': [
-            {'category': 'テクノロジ系', 'total_questions': 120, 'correct_answers': 96, 'correct_rate': 80.0},
-            {'category': 'マネジメント系', 'total_questions': 80, 'correct_answers': 52, 'correct_rate': 65.0},
-            {'category': 'ストラテジ系', 'total_questions': 40, 'correct_answers': 32, 'correct_rate': 80.0}
-        ],
-        'weak_areas': [
-            {'category': 'マネジメント系', 'correct_rate': 65.0, 'total_questions': 80}
-        ],
-        'recent_activity': sample_recent_activity
-    }
-    
-    demo_analysis = {
-        'basic_stats': {
-            'total_questions': 240,
-            'correct_answers': 180,
-            'correct_rate': 0.75,
-            'study_days': 15
-        },
-        'growth_trend': {
-            'trend': 'improving',
-            'weekly_rates': [0.60, 0.65, 0.70, 0.75]
-        },
-        'performance_prediction': {
-            'prediction': 'high_pass_probability',
-            'recent_performance': 0.80,
-            'overall_performance': 0.75
-        }
-    }
-    
-    return render_template('web/progress.html',
-                         progress_data=demo_progress,
-                         detailed_analysis=demo_analysis,
-                         exam_type='FE',
-                         days=30)
+    return render_template('web/progress.html', **_PROGRESS_CTX)
 
 @app.route('/reports')
+@etagged
 def reports():
     """レポート一覧（デモ用）"""
-    demo_reports = [
-        {
-            'name': 'comprehensive_report_FE_20250717_143000.html',
-            'path': 'reports/comprehensive_report_FE_20250717_143000.html',
-            'created': datetime.now()
-        },
-        {
-            'name': 'session_report_20250717_142500.html',
-            'path': 'reports/session_report_20250717_142500.html',
-            'created': datetime.now()
-        },
-        {
-            'name': 'comprehensive_report_FE_20250716_101500.html',
-            'path': 'reports/comprehensive_report_FE_20250716_101500.html',
-            'created': datetime.now()
-        }
-    ]
-    
-    return render_template('web/reports.html', report_files=demo_reports)
+    return render_template('web/reports.html', report_files=DEMO_REPORTS)
 
 @app.route('/generate_report', methods=['POST'])
 def generate_report():
@@ -230,64 +517,24 @@ def generate_report():
     exam_type = request.form.get('exam_type', 'FE')
     days = request.form.get('days', '30')
     
+    # 入力検証（試験種別はファイル名にも使用するため許可リストで判定）
+    if exam_type not in _REPORT_TEMPLATE_BY_EXAM:
+        return jsonify({'success': False, 'message': '不正な試験種別です'}), 400
+    if not days.isdigit():
+        return jsonify({'success': False, 'message': '日数は整数で指定してください'}), 400
+    
     # デモ用のレポート生成
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     report_name = f'comprehensive_report_{exam_type}_{timestamp}.html'
     
     # 簡単なHTMLレポートを生成
-    report_html = f'''
-    <!DOCTYPE html>
-    <html lang="ja">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>学習レポート - {exam_type}</title>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    </head>
-    <body>
-        <div class="container mt-5">
-            <h1 class="text-center mb-4">📊 学習レポート</h1>
-            <div class="row">
-                <div class="col-md-6">
-                    <div class="card">
-                        <div class="card-header">
-                            <h5>学習概要</h5>
-                        </div>
-                        <div class="card-body">
-                            <p><strong>試験種別:</strong> {exam_type}</p>
-                            <p><strong>対象期間:</strong> 過去{days}日間</p>
-                            <p><strong>生成日時:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                        </div>
-                    </div>
-                </div>
-                <div class="col-md-6">
-                    <div class="card">
-                        <div class="card-header">
-                            <h5>統計情報</h5>
-                        </div>
-                        <div class="card-body">
-                            <p><strong>学習問題数:</strong> 240問</p>
-                            <p><strong>正答率:</strong> 75%</p>
-                            <p><strong>学習日数:</strong> 15日</p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            <div class="mt-4 text-center">
-                <p class="text-muted">これはデモンストレーション用のレポートです。</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
+    report_html = _REPORT_TEMPLATE_BY_EXAM[exam_type] \
+        .replace(b'$days', days.encode('ascii')) \
+        .replace(b'$generated_at', now.strftime('%Y-%m-%d %H:%M:%S').encode('ascii'))
     
-    # reportsディレクトリを作成
-    os.makedirs('reports', exist_ok=True)
-    
-    # レポートファイルを保存
-    with open(f'reports/{report_name}', 'w', encoding='utf-8') as f:
-        f.write(report_html)
+    # レポートファイルの保存はバックグラウンドで実行
+    _report_writer.submit(_write_report, os.path.join(REPORTS_DIR, report_name), report_html)
     
     return jsonify({
         'success': True,
@@ -295,47 +542,36 @@ def generate_report():
         'message': 'レポートが生成されました'
     })
 
-@app.route('/view_report/<filename>')
+@app.route('/view_report/<path:filename>')
 def view_report(filename):
     """レポート表示"""
-    try:
-        with open(f'reports/{filename}', 'r', encoding='utf-8') as f:
-            content = f.read()
-        return content
-    except FileNotFoundError:
-        return "レポートが見つかりません", 404
+    return _send_report(filename)
 
-@app.route('/report/<filename>')
+@app.route('/report/<path:filename>')
 def download_report(filename):
     """レポートダウンロード"""
+    return _send_report(filename, as_attachment=True)
+
+def _send_report(filename, as_attachment=False):
+    """レポートファイルを送信（ファイル内容をPythonで読み込まずにsendfileで配信）
+    
+    ヘッダーの追加（ダウンロード指定など）も send_from_directory のオプションで行い、
+    ファイル内容を Python 側にコピーしない。
+    """
+    # ディレクトリトラバーサルを防止
+    if safe_join(REPORTS_DIR, filename) is None:
+        abort(404)
     try:
-        with open(f'reports/{filename}', 'r', encoding='utf-8') as f:
-            content = f.read()
-        return content
-    except FileNotFoundError:
+        return send_from_directory(REPORTS_DIR, filename, mimetype='text/html',
+                                   conditional=True, as_attachment=as_attachment)
+    except NotFound:
         return "レポートが見つかりません", 404
 
 @app.route('/settings')
+@etagged
 def settings():
     """設定ページ（デモ用）"""
-    demo_db_info = {
-        'questions_count': 1250,
-        'learning_records_count': 240,
-        'study_sessions_count': 15,
-        'file_size': 2048000,  # 2MB
-        'last_modified': datetime.now()
-    }
-    
-    demo_settings = {
-        'project_root': '/path/to/project',
-        'database_path': '/path/to/database.db',
-        'report_output_dir': '/path/to/reports',
-        'log_level': 'INFO'
-    }
-    
-    return render_template('web/settings.html',
-                         db_info=demo_db_info,
-                         settings_info=demo_settings)
+    return render_template('web/settings.html', **_SETTINGS_CTX)
 
 @app.route('/settings/fetch_data', methods=['POST'])
 def fetch_data():
@@ -378,74 +614,20 @@ def optimize_database():
 @app.route('/api/stats')
 def api_stats():
     """統計情報API（デモ用）"""
-    return jsonify({
-        'overall_statistics': sample_stats,
-        'category_statistics': [
-            {'category': 'テクノロジ系', 'correct_rate': 80.0, 'total_questions': 120},
-            {'category': 'マネジメント系', 'correct_rate': 65.0, 'total_questions': 80},
-            {'category': 'ストラテジ系', 'correct_rate': 80.0, 'total_questions': 40}
-        ]
-    })
+    return _json_response(_STATS_JSON)
 
 @app.route('/api/questions')
 def api_questions():
     """問題取得API（デモ用）"""
-    count = int(request.args.get('count', 20))
-    questions = sample_questions * (count // 2 + 1)
-    return jsonify(questions[:count])
+    count = _clamp_question_count(int(request.args.get('count', 20)))
+    return _json_response(_demo_questions_json(count))
 
 # 追加のテンプレートページ
 @app.route('/template_showcase')
+@etagged
 def template_showcase():
     """テンプレートショーケース"""
-    return '''
-    <html>
-    <head>
-        <title>テンプレートショーケース</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 20px; }
-            .template-link { 
-                display: block; 
-                margin: 10px 0; 
-                padding: 10px; 
-                background: #f0f0f0; 
-                text-decoration: none; 
-                border-radius: 5px;
-            }
-            .template-link:hover { background: #e0e0e0; }
-        </style>
-    </head>
-    <body>
-        <h1>🎯 情報技術者試験学習システム - テンプレートショーケース</h1>
-        
-        <h2>主要ページ</h2>
-        <a href="/" class="template-link">📊 ダッシュボード - 学習統計と概要</a>
-        <a href="/study" class="template-link">📚 学習ページ - セッション設定</a>
-        <a href="/demo_question" class="template-link">❓ 問題ページ - インタラクティブ問題</a>
-        <a href="/session_result" class="template-link">🎉 結果ページ - セッション結果</a>
-        <a href="/progress" class="template-link">📈 進捗ページ - 学習進捗分析</a>
-        <a href="/reports" class="template-link">📄 レポート一覧 - 生成済みレポート</a>
-        <a href="/settings" class="template-link">⚙️ 設定ページ - システム設定</a>
-        
-        <h2>API エンドポイント</h2>
-        <a href="/api/stats" class="template-link">📊 統計API - JSON形式の統計データ</a>
-        <a href="/api/questions" class="template-link">❓ 問題API - JSON形式の問題データ</a>
-        
-        <h2>特徴</h2>
-        <ul>
-            <li>✅ レスポンシブデザイン（PC・タブレット・スマホ対応）</li>
-            <li>✅ Bootstrap 5.1.3 を使用</li>
-            <li>✅ Font Awesome アイコン</li>
-            <li>✅ Chart.js によるグラフ表示</li>
-            <li>✅ インタラクティブな問題解答</li>
-            <li>✅ リアルタイムの結果フィードバック</li>
-            <li>✅ 美しいアニメーション効果</li>
-        </ul>
-        
-        <p><strong>注意:</strong> これはデモンストレーション用のサンプルデータです。実際の運用には完全なセットアップが必要です。</p>
-    </body>
-    </html>
-    '''
+    return Response(_SHOWCASE_HTML, mimetype='text/html')
 
 if __name__ == '__main__':
     print("🚀 情報技術者試験学習システム - デモサーバー起動")
@@ -11,15 +11,16 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from src.web.main import app
-from src.core.config import config
+# ディレクトリ作成・ログ設定は app.get_app() で1回だけ実行される
+from app import get_app
+
+app = get_app()
 
 if __name__ == '__main__':
-    # 必要なディレクトリを作成
-    config.create_directories()
-    
-    # セッション用ディレクトリを作成
-    os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
-    
-    # 開発サーバーを起動
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    # 開発サーバーを起動（デバッグモードは FLASK_DEBUG=1 の場合のみ）
+    app.run(
+        debug=os.environ.get('FLASK_DEBUG') == '1',
+        threaded=True,
+        host='0.0.0.0',
+        port=5001
+    )
\ No newline at end of file
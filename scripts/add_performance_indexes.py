@@ -14,6 +14,27 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.core.config import config
+from src.core.database import (
+    DatabaseManager, PERFORMANCE_INDEXES, apply_connection_pragmas,
+    create_performance_indexes, drop_performance_indexes
+)
+
+# 大量データ投入時の手順:
+#   1. drop_performance_indexes(conn) でインデックスを削除
+#   2. データを一括投入
+#   3. create_performance_indexes(conn) でインデックスを再作成（ANALYZE は1回のみ）
+# インデックスの削除は稼働中のリクエストの検索を遅くするため、この手順はオフライン作業
+# （--drop で削除 → 投入 → 本スクリプトで再作成）でのみ行い、Webのリクエスト内では行わない
+
+# 稼働中のWebアプリ（WAL書き込み）とロックが競合した場合の待機時間（ミリ秒）
+BUSY_TIMEOUT_MS = 10000
+
+def _connect(db_path, mode: str = 'rw') -> sqlite3.Connection:
+    """既存のデータベースを URI 形式で開く（mode=rw / ro。ファイルを新規作成しない）"""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode={mode}"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
 
 def add_performance_indexes():
     """パフォーマンス最適化インデックスを追加"""
@@ -27,50 +48,19 @@ def add_performance_indexes():
         print(f"データベースファイルが見つかりません: {db_path}")
         return False
     
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
+    # インデックス構築のソートをメモリ上で行う
+    apply_connection_pragmas(conn)
     cursor = conn.cursor()
     
     try:
-        # IMPROVEMENT_ROADMAP.mdで指定された必須インデックス
-        performance_indexes = [
-            # 学習記録の user_id + category_id のインデックス
-            """CREATE INDEX IF NOT EXISTS idx_learning_records_user_category 
-               ON learning_records(question_id, attempt_date)""",
-            
-            # 問題の category_id + difficulty_level のインデックス  
-            """CREATE INDEX IF NOT EXISTS idx_questions_category_difficulty 
-               ON questions(exam_category_id, category, difficulty_level)""",
-            
-            # 学習セッションの user_id + date のインデックス
-            """CREATE INDEX IF NOT EXISTS idx_study_sessions_date 
-               ON study_sessions(exam_category_id, created_at)""",
-            
-            # 学習統計の category 検索用
-            """CREATE INDEX IF NOT EXISTS idx_study_statistics_category 
-               ON study_statistics(exam_category_id, category, last_study_date)""",
-            
-            # 問題の年度検索用（頻繁に使用される）
-            """CREATE INDEX IF NOT EXISTS idx_questions_year_exam 
-               ON questions(year, exam_category_id)""",
-            
-            # 学習記録の正答率分析用
-            """CREATE INDEX IF NOT EXISTS idx_learning_records_correct 
-               ON learning_records(is_correct, study_mode, attempt_date)"""
-        ]
-        
+        # IMPROVEMENT_ROADMAP.mdで指定された必須インデックスを1トランザクションで作成
+        # （ANALYZE は全インデックス作成後に1回だけ実行）
         print("パフォーマンス最適化インデックスを追加中...")
-        
-        for i, index_sql in enumerate(performance_indexes, 1):
-            print(f"インデックス {i}/{len(performance_indexes)} を作成中...")
-            cursor.execute(index_sql)
-            print(f"✓ 完了")
-        
-        # インデックス統計を更新
-        print("インデックス統計を更新中...")
-        cursor.execute("ANALYZE")
-        
-        conn.commit()
-        print(f"✅ {len(performance_indexes)}個のパフォーマンス最適化インデックスを追加しました")
+        for i, (name, _, _) in enumerate(PERFORMANCE_INDEXES, 1):
+            print(f"インデックス {i}/{len(PERFORMANCE_INDEXES)}: {name}")
+        create_performance_indexes(conn)
+        print(f"✅ {len(PERFORMANCE_INDEXES)}個のパフォーマンス最適化インデックスを追加しました")
         
         # 追加されたインデックスを確認
         cursor.execute("""
@@ -94,49 +84,47 @@ def add_performance_indexes():
     finally:
         conn.close()
 
+def remove_performance_indexes():
+    """パフォーマンス最適化インデックスを削除（大量データ投入前に使用）"""
+    db_path = os.environ.get('DATABASE_PATH', config.DATABASE_PATH)
+    try:
+        conn = _connect(db_path)
+    except sqlite3.Error as e:
+        print(f"❌ データベースを開けません: {db_path} ({e})")
+        return False
+    apply_connection_pragmas(conn)
+    try:
+        drop_performance_indexes(conn)
+        print(f"✅ {len(PERFORMANCE_INDEXES)}個のパフォーマンス最適化インデックスを削除しました")
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ インデックス削除エラー: {e}")
+        return False
+    finally:
+        conn.close()
+
 def check_index_effectiveness():
     """インデックスの効果をチェック"""
     
     db_path = os.environ.get('DATABASE_PATH', config.DATABASE_PATH)
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    conn = _connect(db_path, mode='ro')
     
     try:
-        print("\n📊 インデックス効果のチェック:")
+        # DatabaseManager が実際に実行するクエリの実行計画を先にすべて取得・整形し、
+        # 結果は最後に1回でまとめて出力する
+        rendered = ["\n📊 インデックス効果のチェック:\n"]
+        for query_name, query in DatabaseManager.HOT_QUERIES.items():
+            # 実行計画の確認のみのため、パラメータはすべて NULL をバインドする
+            params = (None,) * query.count('?')
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            # 行は (id, parent, notused, detail)。SEARCH はインデックスによる検索
+            rendered.append(f"\n{query_name}:\n" + "".join(
+                f"  {'✅' if row[3].startswith('SEARCH') else '⚠️'} {row[3]}\n"
+                for row in plan
+            ))
         
-        # よく使われるクエリの実行計画をチェック
-        test_queries = [
-            ("問題カテゴリ検索", """
-                EXPLAIN QUERY PLAN 
-                SELECT * FROM questions 
-                WHERE exam_category_id = 1 AND category = 'ネットワーク'
-            """),
-            ("学習記録の統計", """
-                EXPLAIN QUERY PLAN
-                SELECT COUNT(*), AVG(CASE WHEN is_correct THEN 1.0 ELSE 0.0 END)
-                FROM learning_records 
-                WHERE question_id IN (
-                    SELECT id FROM questions WHERE exam_category_id = 1
-                )
-            """),
-            ("年度別問題検索", """
-                EXPLAIN QUERY PLAN
-                SELECT * FROM questions 
-                WHERE year = 2023 AND exam_category_id = 1
-                ORDER BY question_number
-            """)
-        ]
-        
-        for query_name, query in test_queries:
-            print(f"\n{query_name}:")
-            cursor.execute(query)
-            plan = cursor.fetchall()
-            for row in plan:
-                detail = ' | '.join(str(x) for x in row)
-                if 'USING INDEX' in detail:
-                    print(f"  ✅ {detail}")
-                else:
-                    print(f"  ⚠️ {detail}")
+        sys.stdout.write("".join(rendered))
+        sys.stdout.flush()
         
     except sqlite3.Error as e:
         print(f"❌ チェックエラー: {e}")
@@ -145,6 +133,9 @@ def check_index_effectiveness():
         conn.close()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--drop":
+        sys.exit(0 if remove_performance_indexes() else 1)
+    
     print("🚀 データベースパフォーマンス最適化を開始...")
     
     success = add_performance_indexes()
@@ -10,18 +10,67 @@ SQLiteデータベース自動バックアップシステム
 """
 
 import os
-import shutil
-import sqlite3
+import heapq
+import hashlib
 import json
-import subprocess
+import struct
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
-import gzip
+# sqlite3 / gzip / shutil / subprocess は使用する関数内でインポートする
+# （list・cleanup アクションの起動時に読み込まない）
+
+try:
+    import zstandard as zstd
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# Online Backup API で1ステップあたりにコピーするページ数
+BACKUP_PAGES_PER_STEP = 1024
+
+# ファイルコピー・展開時のバッファサイズ（1 MiB）
+COPY_BUFFER_SIZE = 1 << 20
+
+# gzip 圧縮レベル（バックアップは書き込み中心で読み出しは稀なため高速な1を既定とする）
+DEFAULT_COMPRESSLEVEL = 1
+
+# zstandard 圧縮レベル（zstandard がインストールされている場合は gzip の代わりに使用）
+ZSTD_LEVEL = 3
+
+# Linux の FICLONE ioctl（Btrfs/XFS 等でデータを複製せずにファイルを共有コピーする）
+FICLONE = 0x40049409
+
+# 圧縮バックアップの拡張子
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+# 差分バックアップ（基準の完全バックアップから変更されたページのみを保存）
+DIFF_MAGIC = b'SQLDIFF1'
+DIFF_HEADER = struct.Struct('>II')  # ページサイズ, 総ページ数
+DIFF_PAGE_NUMBER = struct.Struct('>I')
+# 同じ基準に対する差分がこの件数に達したら完全バックアップを作り直す
+DIFF_MAX_CHAIN = 24
+# 差分がDBイメージのこの割合を超えたら完全バックアップを作り直す
+DIFF_MAX_RATIO = 0.5
+
+# バックアップファイル名の接頭辞・拡張子（メタデータの .json は含まない）
+BACKUP_PREFIX = 'database_backup_'
+DIFF_EXTENSIONS = tuple(f'.diff{suffix}' for suffix in COMPRESSED_SUFFIXES)
+BACKUP_EXTENSIONS = ('.db',) + tuple(f'.db{suffix}' for suffix in COMPRESSED_SUFFIXES) + DIFF_EXTENSIONS
 
 class DatabaseBackupSystem:
-    def __init__(self, db_path=None, backup_dir=None):
+    def __init__(self, db_path=None, backup_dir=None, backup_pages=BACKUP_PAGES_PER_STEP,
+                 compresslevel=DEFAULT_COMPRESSLEVEL):
         """バックアップシステムの初期化"""
+        self.backup_pages = backup_pages
+        self.compresslevel = compresslevel
         self.project_root = Path(__file__).parent.parent
         self.db_path = Path(db_path) if db_path else self.project_root / "src" / "data" / "database.db"
         self.backup_dir = Path(backup_dir) if backup_dir else self.project_root / "backups"
@@ -38,8 +87,16 @@ class DatabaseBackupSystem:
         )
         self.logger = logging.getLogger(__name__)
         
-    def create_backup(self, compress=True):
-        """データベースのバックアップを作成"""
+    def create_backup(self, compress=True, skip_unchanged=False, differential=False):
+        """
+        データベースのバックアップを作成
+        
+        skip_unchanged 指定時、内容が最新のバックアップと同一なら新規作成せず
+        最新のバックアップのパスを返す。
+        differential 指定時（圧縮時のみ）、直近の完全バックアップからの変更ページだけを
+        差分バックアップ（.diff.zst / .diff.gz）として保存する。
+        """
+        import sqlite3
         try:
             if not self.db_path.exists():
                 self.logger.error(f"Database file not found: {self.db_path}")
@@ -50,20 +107,48 @@ class DatabaseBackupSystem:
             backup_filename = f"database_backup_{timestamp}.db"
             backup_path = self.backup_dir / backup_filename
             
-            # SQLiteファイルをコピー
-            shutil.copy2(self.db_path, backup_path)
-            
-            # 圧縮オプション
-            if compress:
-                compressed_path = backup_path.with_suffix('.db.gz')
-                with open(backup_path, 'rb') as f_in:
-                    with gzip.open(compressed_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                os.remove(backup_path)
-                backup_path = compressed_path
+            # SQLite Online Backup API で一貫したスナップショットを作成
+            # （読み取りトランザクション内でコピーするため、-wal の未反映分も含まれる）
+            src = sqlite3.connect(self.db_path)
+            try:
+                # メモリ上のDBへバックアップし、そのイメージを直接バックアップファイルへ書き込む
+                # （圧縮時も非圧縮の中間 .db ファイルを作らない）
+                mem = sqlite3.connect(':memory:')
+                try:
+                    src.backup(mem, pages=self.backup_pages)
+                    image = mem.serialize()
+                finally:
+                    mem.close()
+                
+                # 書き込み前に内容を比較し、変更がなければ圧縮・書き込みを省く
+                content_hash = self._content_hash(image)
+                if skip_unchanged:
+                    latest = self._find_unchanged_backup(content_hash)
+                    if latest:
+                        return latest
+                
+                diff = self._plan_differential(image) if differential and compress else None
+                if diff:
+                    diff_data, diff_info = diff
+                    backup_path = self._write_compressed(backup_path.with_suffix('.diff'), diff_data)
+                    del diff_data
+                elif compress:
+                    diff_info = {}
+                    backup_path = self._write_compressed(backup_path, image)
+                else:
+                    diff_info = {}
+                    with open(backup_path, 'wb') as f_out:
+                        f_out.write(image)
+                del image
+                
+                # メタデータ用のDB情報は同じ接続で取得
+                db_info = self._get_database_info(src)
+            finally:
+                src.close()
                 
             # バックアップメタデータを作成
-            metadata = self._create_backup_metadata(backup_path)
+            metadata = self._create_backup_metadata(backup_path, db_info, content_hash)
+            metadata.update(diff_info)
             metadata_path = backup_path.with_suffix('.json')
             
             with open(metadata_path, 'w') as f:
@@ -76,19 +161,216 @@ class DatabaseBackupSystem:
             self.logger.error(f"Backup creation failed: {e}")
             return None
             
-    def _create_backup_metadata(self, backup_path):
+    def _write_compressed(self, path, data):
+        """data を圧縮して書き込み、圧縮形式の拡張子を付けた保存先パスを返す
+        
+        圧縮結果はメモリに溜めずにファイルへ流し込み、入力も COPY_BUFFER_SIZE ずつ渡す
+        （ピークメモリをDBイメージ1つ分に抑える）。
+        """
+        import gzip
+        view = memoryview(data)
+        if HAS_ZSTD:
+            # zstandard（全コアを使用するマルチスレッド圧縮）
+            # 展開時に一括 decompress できるよう、元のサイズをフレームヘッダーに記録する
+            path = path.with_name(path.name + '.zst')
+            cctx = zstd.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+            with open(path, 'wb') as f_out, cctx.stream_writer(f_out, size=len(view)) as writer:
+                for offset in range(0, len(view), COPY_BUFFER_SIZE):
+                    writer.write(view[offset:offset + COPY_BUFFER_SIZE])
+        else:
+            path = path.with_name(path.name + '.gz')
+            with gzip.open(path, 'wb', compresslevel=self.compresslevel) as f_out:
+                for offset in range(0, len(view), COPY_BUFFER_SIZE):
+                    f_out.write(view[offset:offset + COPY_BUFFER_SIZE])
+        return path
+    
+    def _read_backup_image(self, backup_path):
+        """バックアップを展開してDBイメージを返す（差分は基準のイメージに適用する）"""
+        import gzip
+        with open(backup_path, 'rb') as f:
+            data = f.read()
+        
+        if backup_path.suffix == '.zst':
+            if not HAS_ZSTD:
+                raise RuntimeError("zstandard is required to read .zst backups")
+            data = zstd.ZstdDecompressor().decompress(data)
+        elif backup_path.suffix == '.gz':
+            data = gzip.decompress(data)
+        
+        if backup_path.name.endswith(DIFF_EXTENSIONS):
+            parent = self._read_metadata(backup_path)['parent_backup']
+            data = self._apply_page_diff(self._read_backup_image(backup_path.with_name(parent)), data)
+        return data
+    
+    def _plan_differential(self, image):
+        """
+        差分バックアップの内容を作成
+        
+        最新のバックアップの基準（完全バックアップ）とページ単位で比較し、
+        (差分データ, メタデータ追加項目) を返す。基準がない、差分が大きい、
+        差分の連続数が上限に達した場合は None（完全バックアップを作成する）。
+        """
+        latest = self._latest_backup()
+        if latest is None:
+            return None
+        
+        metadata = self._read_metadata(latest)
+        if metadata.get('backup_kind') == 'diff':
+            base_path = latest.with_name(metadata['parent_backup'])
+            sequence = metadata.get('diff_sequence', 0) + 1
+        else:
+            base_path = latest
+            sequence = 1
+        if sequence > DIFF_MAX_CHAIN or not base_path.exists():
+            return None
+        
+        diff_data = self._page_diff(self._read_backup_image(base_path), image)
+        if diff_data is None or len(diff_data) > len(image) * DIFF_MAX_RATIO:
+            return None
+        
+        return diff_data, {
+            'backup_kind': 'diff',
+            'parent_backup': base_path.name,
+            'parent_hash': self._read_metadata(base_path).get('content_hash'),
+            'diff_sequence': sequence
+        }
+    
+    @staticmethod
+    def _page_size(image):
+        """DBイメージのヘッダからページサイズを取得（1 は 65536 を表す）"""
+        page_size = int.from_bytes(image[16:18], 'big')
+        return 65536 if page_size == 1 else page_size
+    
+    def _page_diff(self, base, image):
+        """base から image への変更ページを差分形式にまとめる（ページサイズが異なる場合は None）"""
+        page_size = self._page_size(image)
+        if self._page_size(base) != page_size:
+            return None
+        
+        base_view, image_view = memoryview(base), memoryview(image)
+        parts = [DIFF_MAGIC, DIFF_HEADER.pack(page_size, len(image) // page_size)]
+        for offset in range(0, len(image), page_size):
+            page = image_view[offset:offset + page_size]
+            if base_view[offset:offset + page_size] != page:
+                parts.append(DIFF_PAGE_NUMBER.pack(offset // page_size))
+                parts.append(page)
+        return b''.join(parts)
+    
+    @staticmethod
+    def _apply_page_diff(base, diff_data):
+        """差分を基準のDBイメージに適用して復元後のイメージを返す"""
+        if not diff_data.startswith(DIFF_MAGIC):
+            raise ValueError("Invalid differential backup")
+        
+        page_size, page_count = DIFF_HEADER.unpack_from(diff_data, len(DIFF_MAGIC))
+        image = bytearray(base[:page_size * page_count])
+        image.extend(bytes(page_size * page_count - len(image)))
+        
+        pos = len(DIFF_MAGIC) + DIFF_HEADER.size
+        while pos < len(diff_data):
+            (page_number,) = DIFF_PAGE_NUMBER.unpack_from(diff_data, pos)
+            pos += DIFF_PAGE_NUMBER.size
+            offset = page_number * page_size
+            image[offset:offset + page_size] = diff_data[pos:pos + page_size]
+            pos += page_size
+        return bytes(image)
+    
+    def _read_metadata(self, backup_path):
+        """バックアップのメタデータを読み込む（読めない場合は空の辞書）"""
+        try:
+            with open(backup_path.with_suffix('.json'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    @staticmethod
+    def _content_hash(image):
+        """DBイメージの内容ハッシュ（同一内容のバックアップ判定用）"""
+        return hashlib.blake2b(image, digest_size=16).hexdigest()
+    
+    def _latest_backup(self):
+        """最新のバックアップファイルのパス（なければ None）"""
+        backups = self._scan_backups()
+        if not backups:
+            return None
+        return max(backups, key=lambda backup: backup[1].st_mtime)[0]
+    
+    def _find_unchanged_backup(self, content_hash):
+        """最新のバックアップが同じ内容ならそのパスを返す"""
+        latest = self._latest_backup()
+        if latest is None:
+            return None
+        
+        if self._read_metadata(latest).get('content_hash') != content_hash:
+            return None
+        
+        self.logger.info(f"Database unchanged since last backup, skipping: {latest}")
+        return latest
+            
+    def _checkpoint_wal(self, db_path=None):
+        """WALファイル（.db-wal）の内容をデータベース本体に書き戻し、WALを空にする"""
+        import sqlite3
+        conn = sqlite3.connect(str(db_path or self.db_path))
+        try:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        finally:
+            conn.close()
+            
+    @staticmethod
+    def _copy_file(src, dst):
+        """
+        ファイルをカーネル内でコピー（メタデータも含む）
+        
+        リフリンク（FICLONE）→ os.copy_file_range → バッファコピーの順に試行する。
+        WAL を含むDBは事前にチェックポイントしておくこと。
+        """
+        import shutil
+        with open(src, 'rb') as f_in, open(dst, 'wb') as f_out:
+            copied = False
+            if HAS_FCNTL:
+                try:
+                    fcntl.ioctl(f_out.fileno(), FICLONE, f_in.fileno())
+                    copied = True
+                except OSError:
+                    pass
+            
+            if not copied and hasattr(os, 'copy_file_range'):
+                try:
+                    remaining = os.fstat(f_in.fileno()).st_size
+                    while remaining > 0:
+                        copied_bytes = os.copy_file_range(f_in.fileno(), f_out.fileno(), remaining)
+                        if copied_bytes == 0:
+                            break
+                        remaining -= copied_bytes
+                    copied = remaining <= 0
+                except OSError:
+                    pass
+            
+            if not copied:
+                # 途中まで書き込んだ内容は破棄してバッファコピーでやり直す
+                f_in.seek(0)
+                f_out.seek(0)
+                f_out.truncate()
+                shutil.copyfileobj(f_in, f_out, length=COPY_BUFFER_SIZE)
+        
+        shutil.copystat(src, dst)
+            
+    def _create_backup_metadata(self, backup_path, db_info=None, content_hash=None):
         """バックアップメタデータを作成"""
         try:
-            # 元データベースの情報を取得
-            db_info = self._get_database_info()
+            # 元データベースの情報を取得（取得済みの場合は再接続しない）
+            if db_info is None:
+                db_info = self._get_database_info()
             
             metadata = {
                 'backup_time': datetime.now().isoformat(),
                 'original_db_path': str(self.db_path),
                 'backup_path': str(backup_path),
                 'file_size': os.path.getsize(backup_path),
-                'compressed': backup_path.suffix == '.gz',
+                'compressed': backup_path.suffix in COMPRESSED_SUFFIXES,
                 'database_info': db_info,
+                'content_hash': content_hash,
+                'backup_kind': 'full',
                 'backup_type': 'automatic',
                 'version': '1.0'
             }
@@ -99,26 +381,33 @@ class DatabaseBackupSystem:
             self.logger.error(f"Metadata creation failed: {e}")
             return {'error': str(e)}
             
-    def _get_database_info(self):
-        """データベース情報を取得"""
+    def _get_database_info(self, conn=None):
+        """データベース情報を取得（conn 指定時はその接続を再利用）"""
+        import sqlite3
+        own_conn = conn is None
         try:
-            conn = sqlite3.connect(self.db_path)
+            if own_conn:
+                conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
             # テーブル一覧
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
             tables = [row[0] for row in cursor.fetchall()]
             
-            # 各テーブルの行数
+            # 各テーブルの行数（UNION ALL で1クエリにまとめる）
             table_counts = {}
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table};")
-                table_counts[table] = cursor.fetchone()[0]
+            if tables:
+                query = " UNION ALL ".join(
+                    'SELECT ?, COUNT(*) FROM "{}"'.format(table.replace('"', '""'))
+                    for table in tables
+                )
+                table_counts = dict(cursor.execute(query, tables).fetchall())
                 
             # データベースサイズ
             db_size = os.path.getsize(self.db_path)
             
-            conn.close()
+            if own_conn:
+                conn.close()
             
             return {
                 'tables': tables,
@@ -132,20 +421,46 @@ class DatabaseBackupSystem:
             self.logger.error(f"Database info retrieval failed: {e}")
             return {'error': str(e)}
             
+    def _scan_backups(self):
+        """
+        バックアップファイルを列挙
+        
+        os.scandir の結果から stat を1回だけ取得し、(パス, stat結果) のリストを返す。
+        """
+        backups = []
+        with os.scandir(self.backup_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(BACKUP_PREFIX) and entry.name.endswith(BACKUP_EXTENSIONS):
+                    backups.append((Path(entry.path), entry.stat()))
+        return backups
+            
     def cleanup_old_backups(self, keep_days=30, keep_minimum=5):
         """古いバックアップファイルを削除"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=keep_days)
-            backup_files = list(self.backup_dir.glob("database_backup_*.db*"))
+            cutoff_timestamp = (datetime.now() - timedelta(days=keep_days)).timestamp()
+            backup_files = self._scan_backups()
+            if len(backup_files) <= keep_minimum:
+                return 0
             
-            # 日付でソート（新しい順）
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+            # 最新 keep_minimum 件だけを部分ソートで選んで保護する（全件ソートは不要）
+            newest = heapq.nlargest(keep_minimum, backup_files, key=lambda backup: backup[1].st_mtime)
+            protected = {backup_file for backup_file, _ in newest}
             
             # 最小保持数を超える古いファイルを削除
-            files_to_delete = []
-            for i, backup_file in enumerate(backup_files[keep_minimum:], keep_minimum):
-                if datetime.fromtimestamp(backup_file.stat().st_mtime) < cutoff_date:
-                    files_to_delete.append(backup_file)
+            files_to_delete = [
+                backup_file
+                for backup_file, stat in backup_files
+                if backup_file not in protected and stat.st_mtime < cutoff_timestamp
+            ]
+            
+            # 残す差分バックアップの基準となる完全バックアップは削除しない
+            deleting = set(files_to_delete)
+            parents = {
+                self._read_metadata(backup_file).get('parent_backup')
+                for backup_file, _ in backup_files
+                if backup_file not in deleting and backup_file.name.endswith(DIFF_EXTENSIONS)
+            }
+            files_to_delete = [backup_file for backup_file in files_to_delete if backup_file.name not in parents]
                     
             for backup_file in files_to_delete:
                 # メタデータファイルも削除
@@ -163,31 +478,28 @@ class DatabaseBackupSystem:
             
     def commit_to_git(self, backup_path):
         """バックアップをGitにコミット"""
+        import subprocess
         try:
-            os.chdir(self.project_root)
-            
-            # Gitステータス確認
-            result = subprocess.run(['git', 'status', '--porcelain'], 
-                                  capture_output=True, text=True)
+            # os.chdir はプロセス全体に影響するため、各コマンドに cwd を指定する
+            def git(*args):
+                subprocess.run(['git', *args], cwd=self.project_root, check=True)
             
-            # バックアップファイルをステージング
-            subprocess.run(['git', 'add', str(backup_path)], check=True)
-            
-            # メタデータファイルもステージング
+            # バックアップファイルとメタデータファイルを1回でステージング
+            paths = [str(backup_path)]
             metadata_file = backup_path.with_suffix('.json')
             if metadata_file.exists():
-                subprocess.run(['git', 'add', str(metadata_file)], check=True)
+                paths.append(str(metadata_file))
+            git('add', *paths)
                 
             # コミット
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             commit_message = f"Auto backup: Database backup created at {timestamp}"
             
-            subprocess.run(['git', 'commit', '-m', commit_message], check=True)
+            git('commit', '-m', commit_message)
             
             # プッシュ（オプション）
             if os.environ.get('AUTO_PUSH_BACKUPS', 'false').lower() == 'true':
-                subprocess.run(['git', 'push', 'origin', 'main'], check=True)
-                self.logger.info("Backup pushed to remote repository")
+                self._push_in_background()
             else:
                 self.logger.info("Backup committed locally (push disabled)")
                 
@@ -200,8 +512,48 @@ class DatabaseBackupSystem:
             self.logger.error(f"Git commit failed: {e}")
             return False
             
+    def _push_in_background(self):
+        """git push を切り離したプロセスで実行（ネットワーク待ちで呼び出し元を止めない）
+        
+        プッシュ中はロックファイルの flock を子プロセスが保持し、重なって起動した
+        バックアップでは git push を同時に実行せずスキップする。
+        """
+        import subprocess
+        log_dir = self.project_root / "logs"
+        log_dir.mkdir(parents=True, exist_ok=True)
+        push_log = log_dir / "backup_push.log"
+        
+        lock_fd = None
+        if HAS_FCNTL:
+            lock_fd = os.open(log_dir / "backup_push.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(lock_fd)
+                self.logger.info("Backup push skipped: another push is still running")
+                return
+        
+        try:
+            with open(push_log, 'ab') as log_file:
+                # ロックを保持したファイル記述子を子プロセスに引き継ぎ、プッシュ終了まで保持させる
+                process = subprocess.Popen(
+                    ['git', 'push', 'origin', 'main'],
+                    cwd=self.project_root,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                    pass_fds=(lock_fd,) if lock_fd is not None else ()
+                )
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+        self.logger.info(f"Backup push started in background (pid={process.pid}, log={push_log})")
+            
     def restore_backup(self, backup_path, target_path=None):
         """バックアップから復元"""
+        import gzip
+        import shutil
         try:
             backup_path = Path(backup_path)
             target_path = Path(target_path) if target_path else self.db_path
@@ -212,19 +564,37 @@ class DatabaseBackupSystem:
                 
             # 現在のデータベースをバックアップ（念のため）
             if target_path.exists():
+                # 古いWALが復元後のDBに再適用されないよう、先に書き戻して空にする
+                self._checkpoint_wal(target_path)
                 emergency_backup = target_path.with_suffix(f'.emergency_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.db')
-                shutil.copy2(target_path, emergency_backup)
+                self._copy_file(target_path, emergency_backup)
                 self.logger.info(f"Emergency backup created: {emergency_backup}")
                 
             # 復元実行
-            if backup_path.suffix == '.gz':
-                # 圧縮ファイルの場合
-                with gzip.open(backup_path, 'rb') as f_in:
+            if backup_path.name.endswith(DIFF_EXTENSIONS):
+                # 差分バックアップの場合（基準のイメージに差分を適用）
+                image = self._read_backup_image(backup_path)
+                with open(target_path, 'wb') as f_out:
+                    f_out.write(image)
+            elif backup_path.suffix == '.zst':
+                # zstandard 圧縮ファイルの場合
+                if not HAS_ZSTD:
+                    self.logger.error("zstandard is required to restore .zst backups")
+                    return False
+                with open(backup_path, 'rb') as f_in:
                     with open(target_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                        zstd.ZstdDecompressor().copy_stream(
+                            f_in, f_out,
+                            read_size=COPY_BUFFER_SIZE, write_size=COPY_BUFFER_SIZE
+                        )
+            elif backup_path.suffix == '.gz':
+                # gzip 圧縮ファイルの場合
+                with gzip.open(backup_path, 'rb') as f_in:
+                    with open(target_path, 'wb', buffering=COPY_BUFFER_SIZE) as f_out:
+                        shutil.copyfileobj(f_in, f_out, length=COPY_BUFFER_SIZE)
             else:
-                # 通常のファイルコピー
-                shutil.copy2(backup_path, target_path)
+                # 通常のファイルコピー（カーネル内コピー）
+                self._copy_file(backup_path, target_path)
                 
             self.logger.info(f"Database restored from: {backup_path}")
             return True
@@ -233,14 +603,18 @@ class DatabaseBackupSystem:
             self.logger.error(f"Restore failed: {e}")
             return False
             
-    def run_full_backup(self):
-        """完全バックアップの実行"""
+    def run_full_backup(self, differential=True):
+        """バックアップ処理一式の実行（differential 指定時は可能なら差分バックアップ）"""
         self.logger.info("Starting full backup process...")
         
-        # バックアップ作成
-        backup_path = self.create_backup(compress=True)
+        # バックアップ作成（前回から変更がなければ既存のバックアップを返す）
+        latest_backup = self._latest_backup()
+        backup_path = self.create_backup(compress=True, skip_unchanged=True, differential=differential)
         if not backup_path:
             return False
+        if backup_path == latest_backup:
+            self.logger.info("No changes since last backup, nothing to commit")
+            return True
             
         # 古いバックアップの削除
         deleted_count = self.cleanup_old_backups(keep_days=30, keep_minimum=5)
@@ -255,25 +629,17 @@ class DatabaseBackupSystem:
         self.logger.info("Full backup process completed")
         return True
         
-    def list_backups(self):
-        """利用可能なバックアップ一覧"""
+    def list_backups(self, include_metadata=False):
+        """利用可能なバックアップ一覧（メタデータは include_metadata 指定時のみ読み込む）"""
         backups = []
-        for backup_file in sorted(self.backup_dir.glob("database_backup_*.db*")):
-            metadata_file = backup_file.with_suffix('.json')
-            metadata = {}
-            
-            if metadata_file.exists():
-                try:
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                except:
-                    pass
+        for backup_file, stat in sorted(self._scan_backups()):
+            metadata = self._read_metadata(backup_file) if include_metadata else {}
                     
             backup_info = {
                 'file': str(backup_file),
-                'size': os.path.getsize(backup_file),
-                'created': datetime.fromtimestamp(backup_file.stat().st_mtime),
-                'compressed': backup_file.suffix == '.gz',
+                'size': stat.st_size,
+                'created': datetime.fromtimestamp(stat.st_mtime),
+                'compressed': backup_file.suffix in COMPRESSED_SUFFIXES,
                 'metadata': metadata
             }
             backups.append(backup_info)
@@ -293,14 +659,18 @@ def main():
     parser.add_argument('--backup-file', help='Backup file for restore')
     parser.add_argument('--compress', action='store_true', help='Compress backup files')
     parser.add_argument('--keep-days', type=int, default=30, help='Days to keep backups')
+    parser.add_argument('--full', action='store_true', help='Always create a full backup instead of a differential one')
+    parser.add_argument('--compress-level', type=int, default=DEFAULT_COMPRESSLEVEL,
+                       choices=range(1, 10), metavar='1-9', help='gzip compression level (used when zstandard is not installed)')
     
     args = parser.parse_args()
     
     # バックアップシステム初期化
-    backup_system = DatabaseBackupSystem(args.db_path, args.backup_dir)
+    backup_system = DatabaseBackupSystem(args.db_path, args.backup_dir,
+                                         compresslevel=args.compress_level)
     
     if args.action == 'backup':
-        success = backup_system.run_full_backup()
+        success = backup_system.run_full_backup(differential=not args.full)
         exit(0 if success else 1)
         
     elif args.action == 'restore':
@@ -312,11 +682,15 @@ def main():
         
     elif args.action == 'list':
         backups = backup_system.list_backups()
-        print(f"Found {len(backups)} backup(s):")
-        for backup in backups:
-            size_mb = backup['size'] / (1024 * 1024)
-            compressed = " (compressed)" if backup['compressed'] else ""
-            print(f"  {backup['file']} - {size_mb:.1f}MB - {backup['created']}{compressed}")
+        # 1行ずつ print せず、一覧全体を組み立ててから1回で書き出す
+        lines = [f"Found {len(backups)} backup(s):"]
+        lines.extend(
+            f"  {backup['file']} - {backup['size'] / (1024 * 1024):.1f}MB - {backup['created']}"
+            f"{' (compressed)' if backup['compressed'] else ''}"
+            for backup in backups
+        )
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
             
     elif args.action == 'cleanup':
         deleted = backup_system.cleanup_old_backups(keep_days=args.keep_days)
@@ -11,48 +11,182 @@ Claude Pro連携用ログ処理スクリプト
 import re
 import sys
 import json
+import mmap
 import argparse
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 import subprocess
 
+# mmap したログを小文字化して走査する際のブロックサイズ（行境界に揃える）
+LOG_SCAN_BLOCK_SIZE = 16 << 20
+
 class LogProcessor:
-    def __init__(self, log_file_path):
+    def __init__(self, log_file_path, use_mmap=True):
         self.log_file_path = Path(log_file_path)
+        self.use_mmap = use_mmap
         self.errors_found = []
+        # search() は行内を走査するため、前後の .* は不要
+        # 行を一度だけ小文字化して照合するため、パターンは小文字で記述する（IGNORECASE 不要）
         self.error_patterns = {
-            '500_errors': r'.*\s500\s.*',
-            'python_exceptions': r'.*Exception.*|.*Error.*|.*Traceback.*',
-            'database_errors': r'.*database.*error.*|.*connection.*failed.*',
-            'timeout_errors': r'.*timeout.*|.*timed out.*',
-            'memory_errors': r'.*OutOfMemory.*|.*MemoryError.*'
+            '500_errors': r'\s500\s',
+            'python_exceptions': r'exception|error|traceback',
+            'database_errors': r'database.*error|connection.*failed',
+            'timeout_errors': r'timeout|timed out',
+            'memory_errors': r'outofmemory|memoryerror'
         }
+        self._patterns = [
+            (error_type, re.compile(pattern))
+            for error_type, pattern in self.error_patterns.items()
+        ]
+        # 全パターンを1つの選択に結合し、エラーを含まない大半の行は1回の走査で除外する
+        self._fused = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.error_patterns.values())
+        )
+        # mmap したバイト列を直接走査するためのバイト版（パターンはすべてASCII）
+        self._fused_bytes = re.compile(self._fused.pattern.encode())
+    
+    def _match_types(self, line):
+        """行に一致するエラー種別を返す"""
+        line = line.lower()
+        match = self._fused.search(line)
+        if not match:
+            return []
+        # 一致した行のみ個別パターンで判定し、複数種別への一致を従来どおり全て拾う
+        return [error_type for error_type, pattern in self._patterns if pattern.search(line)]
     
     def extract_errors(self):
         """ログからエラーを抽出"""
         if not self.log_file_path.exists():
             raise FileNotFoundError(f"Log file not found: {self.log_file_path}")
         
-        with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+        with open(self.log_file_path, 'rb') as f:
+            if self.use_mmap:
+                try:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    # 空ファイルやパイプなど mmap できない場合は逐次読み込みに切り替える
+                    pass
+                else:
+                    with mm:
+                        self._scan_mapped(mm, context=3)
+                    return
+            self._scan_stream(f, context=3)
+    
+    def _scan_stream(self, f, context=3):
+        """
+        ログを1行ずつ逐次走査
+        
+        直前の文脈は deque、直後の文脈は未完了のエラーに追記して集めるため、
+        メモリ使用量はファイルサイズによらず文脈行数分で済む。
+        """
+        before = deque(maxlen=context)
+        pending = []
+        for i, raw_line in enumerate(f):
+            line = self._decode(raw_line)
+            stripped = line.strip()
+            
+            # 直後の文脈を待っているエラーに現在の行を追加
+            for error, _ in pending:
+                error['context'].append(stripped)
+            pending = [(error, remaining - 1) for error, remaining in pending if remaining > 1]
+            
+            for error_type in self._match_types(line):
+                error = {
+                    'type': error_type,
+                    'line_number': i + 1,
+                    'content': stripped,
+                    'context': [*before, stripped],
+                    'timestamp': self._extract_timestamp(line)
+                }
+                self.errors_found.append(error)
+                if context:
+                    pending.append((error, context))
+            
+            before.append(stripped)
+    
+    def _scan_mapped(self, mm, context=3):
+        """
+        メモリマップしたログを一括走査
         
-        for i, line in enumerate(lines):
-            for error_type, pattern in self.error_patterns.items():
-                if re.search(pattern, line, re.IGNORECASE):
-                    context_lines = self._get_context_lines(lines, i, context=3)
+        行ごとの文字列は作らず、正規表現の一致箇所の行と文脈だけをデコードする。
+        """
+        size = len(mm)
+        line_number = 1
+        block_start = 0
+        while block_start < size:
+            # 行境界で区切ったブロックごとに小文字化し、大文字小文字を無視した走査を避ける
+            block_end = self._block_end(mm, block_start)
+            block = mm[block_start:block_end].lower()
+            counted = 0
+            pos = 0
+            while True:
+                match = self._fused_bytes.search(block, pos)
+                if not match:
+                    break
+                
+                start = block.rfind(b'\n', 0, match.start()) + 1
+                end = block.find(b'\n', match.start())
+                end = len(block) if end == -1 else end + 1
+                line_number += block.count(b'\n', counted, start)
+                counted = start
+                
+                # 行単位で再判定（\s が改行をまたいで一致した場合はここで除外される）
+                line_start, line_end = block_start + start, block_start + end
+                line = self._decode(mm[line_start:line_end])
+                for error_type in self._match_types(line):
                     self.errors_found.append({
                         'type': error_type,
-                        'line_number': i + 1,
+                        'line_number': line_number,
                         'content': line.strip(),
-                        'context': context_lines,
+                        'context': self._get_context_lines(mm, line_start, line_end, context),
                         'timestamp': self._extract_timestamp(line)
                     })
+                pos = end
+            
+            line_number += block.count(b'\n', counted)
+            block_start = block_end
+    
+    @staticmethod
+    def _block_end(mm, block_start):
+        """block_start から LOG_SCAN_BLOCK_SIZE 程度で、行末に揃えたブロックの終端を返す"""
+        size = len(mm)
+        end = block_start + LOG_SCAN_BLOCK_SIZE
+        if end >= size:
+            return size
+        newline = mm.rfind(b'\n', block_start, end)
+        if newline == -1:
+            # ブロックより長い行は行末まで含める
+            newline = mm.find(b'\n', end)
+            return size if newline == -1 else newline + 1
+        return newline + 1
     
-    def _get_context_lines(self, lines, index, context=3):
-        """エラー行の前後の文脈を取得"""
-        start = max(0, index - context)
-        end = min(len(lines), index + context + 1)
-        return [line.strip() for line in lines[start:end]]
+    @staticmethod
+    def _decode(data):
+        """ログのバイト列を文字列に変換"""
+        return data.decode('utf-8', errors='ignore')
+    
+    def _get_context_lines(self, mm, start, end, context=3):
+        """エラー行（mm[start:end]）の前後の文脈を取得"""
+        size = len(mm)
+        context_start = start
+        for _ in range(context):
+            if context_start == 0:
+                break
+            context_start = mm.rfind(b'\n', 0, context_start - 1) + 1
+        
+        context_end = end
+        for _ in range(context):
+            if context_end >= size:
+                break
+            next_end = mm.find(b'\n', context_end)
+            context_end = size if next_end == -1 else next_end + 1
+        
+        chunk = mm[context_start:context_end]
+        lines = chunk.split(b'\n')
+        if chunk.endswith(b'\n'):
+            lines.pop()
+        return [self._decode(line).strip() for line in lines]
     
     def _extract_timestamp(self, line):
         """ログ行からタイムスタンプを抽出"""
@@ -190,11 +324,12 @@ def main():
     parser = argparse.ArgumentParser(description='Process logs for Claude Pro analysis')
     parser.add_argument('log_file', help='Path to the log file')
     parser.add_argument('--output-dir', default='claude_analysis', help='Output directory')
+    parser.add_argument('--no-mmap', action='store_true', help='Read the log line by line instead of memory-mapping it')
     
     args = parser.parse_args()
     
     try:
-        processor = LogProcessor(args.log_file)
+        processor = LogProcessor(args.log_file, use_mmap=not args.no_mmap)
         processor.extract_errors()
         
         if not processor.errors_found:
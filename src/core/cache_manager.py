@@ -1,12 +1,14 @@
 """
 Redisキャッシュマネージャー
 """
-import json
 import pickle
 import hashlib
-from datetime import datetime, timedelta
+import threading
+from fnmatch import fnmatchcase
+from time import monotonic
 from typing import Any, Optional, Dict, List, Union
 import logging
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +20,49 @@ except ImportError:
     HAS_REDIS = False
     logger.warning("Redis not available, using fallback cache")
 
+# orjson の遅延インポート（Redis に保存する値のシリアライズを高速化）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# xxhash の遅延インポート（キャッシュキーのハッシュ化を高速化）
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+# シリアライズ形式を示す先頭1バイト
+SERIALIZED_JSON = b'J'
+SERIALIZED_PICKLE = b'P'
+
+# datetime 等は JSON では文字列に変わってしまうため、例外にして pickle に回す
+if HAS_ORJSON:
+    ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME
+                      | orjson.OPT_PASSTHROUGH_DATACLASS
+                      | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+# キャッシュ未登録を None と区別するための番兵
+_MISSING = object()
+
 
 class CacheManager:
     """統一キャッシュ管理クラス"""
     
+    # メモリキャッシュの最大件数（超えた場合は最も長く使われていないものから削除）
+    MEMORY_CACHE_MAX_SIZE = 1000
+    # Redis の値をメモリキャッシュに昇格させる際の最大TTL（秒）
+    # 他ワーカーでの無効化はメモリキャッシュに届かないため、古い値を返しうる時間を短く抑える
+    MEMORY_PROMOTE_MAX_TTL = 10
+    
     def __init__(self, redis_url: str = None, default_ttl: int = 3600):
         self.default_ttl = default_ttl  # 1時間
-        self._memory_cache: Dict[str, tuple] = {}  # (value, expires_at)
+        # LRU順（末尾が最近使用）に保持する (value, expires_at: monotonic秒)
+        self._memory_cache: OrderedDict[str, tuple] = OrderedDict()
+        # gthread ワーカー等で複数スレッドから操作されるため、メモリキャッシュの操作はロックで保護する
+        self._memory_lock = threading.Lock()
         
         # Redis接続の試行
         self.redis_client = None
@@ -46,27 +84,56 @@ class CacheManager:
                 self.redis_client = None
     
     def get(self, key: str, default: Any = None) -> Any:
-        """キャッシュから値を取得"""
+        """キャッシュから値を取得（メモリ → Redis の順に参照）"""
         try:
-            # Redis から取得試行
-            if self.redis_client:
-                value = self.redis_client.get(self._format_key(key))
-                if value is not None:
-                    return pickle.loads(value)
-            
             # メモリキャッシュから取得
-            if key in self._memory_cache:
-                value, expires_at = self._memory_cache[key]
-                if datetime.now() < expires_at:
+            value = self._get_memory(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            
+            # Redis から取得試行（値と残りTTLを1往復で取得）
+            if self.redis_client:
+                formatted_key = self._format_key(key)
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(formatted_key)
+                pipe.ttl(formatted_key)
+                data, remaining_ttl = pipe.execute()
+                if data is not None:
+                    value = self._deserialize(data)
+                    self._promote(key, value, remaining_ttl)
                     return value
-                else:
-                    del self._memory_cache[key]
             
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {e}")
         
         return default
     
+    def mget(self, keys: List[str], default: Any = None) -> List[Any]:
+        """複数キーの値をまとめて取得（メモリにないキーは Redis から1往復で取得）"""
+        keys = list(keys)
+        try:
+            values = [self._get_memory(key, _MISSING) for key in keys]
+            misses = [i for i, value in enumerate(values) if value is _MISSING]
+            
+            if self.redis_client and misses:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for i in misses:
+                    formatted_key = self._format_key(keys[i])
+                    pipe.get(formatted_key)
+                    pipe.ttl(formatted_key)
+                replies = pipe.execute()
+                for i, data, remaining_ttl in zip(misses, replies[::2], replies[1::2]):
+                    if data is not None:
+                        values[i] = self._deserialize(data)
+                        self._promote(keys[i], values[i], remaining_ttl)
+            
+            return [default if value is _MISSING else value for value in values]
+            
+        except Exception as e:
+            logger.error(f"Cache mget error for keys {keys}: {e}")
+        
+        return [default] * len(keys)
+    
     def set(self, key: str, value: Any, ttl: int = None) -> bool:
         """値をキャッシュに保存"""
         if ttl is None:
@@ -75,27 +142,50 @@ class CacheManager:
         try:
             # Redis に保存
             if self.redis_client:
-                serialized = pickle.dumps(value)
+                serialized = self._serialize(value)
                 success = self.redis_client.setex(
                     self._format_key(key), 
                     ttl, 
                     serialized
                 )
                 if success:
+                    # 古い値がメモリに残らないよう削除（メモリへは書き込まない）
+                    with self._memory_lock:
+                        self._memory_cache.pop(key, None)
                     return True
             
             # メモリキャッシュに保存
-            expires_at = datetime.now() + timedelta(seconds=ttl)
-            self._memory_cache[key] = (value, expires_at)
+            self._set_memory(key, value, ttl)
+            return True
             
-            # メモリキャッシュのサイズ制限（1000アイテム）
-            if len(self._memory_cache) > 1000:
-                self._cleanup_memory_cache()
+        except Exception as e:
+            logger.error(f"Cache set error for key {key}: {e}")
+            return False
+    
+    def mset(self, mapping: Dict[str, Any], ttl: int = None) -> bool:
+        """複数の値をまとめて保存（Redis はパイプラインで1往復）"""
+        if ttl is None:
+            ttl = self.default_ttl
+        
+        try:
+            # Redis に保存（トランザクションは不要なため transaction=False）
+            if self.redis_client and mapping:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value in mapping.items():
+                    pipe.setex(self._format_key(key), ttl, self._serialize(value))
+                if all(pipe.execute()):
+                    with self._memory_lock:
+                        for key in mapping:
+                            self._memory_cache.pop(key, None)
+                    return True
             
+            # メモリキャッシュに保存
+            for key, value in mapping.items():
+                self._set_memory(key, value, ttl)
             return True
             
         except Exception as e:
-            logger.error(f"Cache set error for key {key}: {e}")
+            logger.error(f"Cache mset error for keys {list(mapping)}: {e}")
             return False
     
     def delete(self, key: str) -> bool:
@@ -109,9 +199,9 @@ class CacheManager:
                 deleted = result > 0
             
             # メモリキャッシュから削除
-            if key in self._memory_cache:
-                del self._memory_cache[key]
-                deleted = True
+            with self._memory_lock:
+                if self._memory_cache.pop(key, None) is not None:
+                    deleted = True
             
             return deleted
             
@@ -122,18 +212,18 @@ class CacheManager:
     def exists(self, key: str) -> bool:
         """キーの存在確認"""
         try:
+            # メモリキャッシュで確認
+            with self._memory_lock:
+                entry = self._memory_cache.get(key)
+                if entry is not None:
+                    if monotonic() < entry[1]:
+                        return True
+                    del self._memory_cache[key]
+            
             # Redis で確認
             if self.redis_client:
                 return bool(self.redis_client.exists(self._format_key(key)))
             
-            # メモリキャッシュで確認
-            if key in self._memory_cache:
-                _, expires_at = self._memory_cache[key]
-                if datetime.now() < expires_at:
-                    return True
-                else:
-                    del self._memory_cache[key]
-            
         except Exception as e:
             logger.error(f"Cache exists error for key {key}: {e}")
         
@@ -156,15 +246,16 @@ class CacheManager:
                     if keys:
                         cleared = self.redis_client.delete(*keys)
             
-            # メモリキャッシュクリア
-            if pattern:
-                memory_keys = [k for k in self._memory_cache.keys() if pattern in k]
-                for k in memory_keys:
-                    del self._memory_cache[k]
-                cleared += len(memory_keys)
-            else:
-                cleared += len(self._memory_cache)
-                self._memory_cache.clear()
+            # メモリキャッシュクリア（Redis の KEYS と同じくグロブ形式で照合）
+            with self._memory_lock:
+                if pattern:
+                    memory_keys = [k for k in self._memory_cache.keys() if fnmatchcase(k, pattern)]
+                    for k in memory_keys:
+                        del self._memory_cache[k]
+                    cleared += len(memory_keys)
+                else:
+                    cleared += len(self._memory_cache)
+                    self._memory_cache.clear()
                 
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
@@ -195,6 +286,63 @@ class CacheManager:
         
         return stats
     
+    @staticmethod
+    def _serialize(value: Any) -> bytes:
+        """
+        Redis 保存用にシリアライズ
+        
+        JSON で表せる値（dict/list/str/数値）は orjson、それ以外は pickle を使い、
+        先頭1バイトで形式を区別する。JSON ではタプルはリストとして復元される。
+        """
+        if HAS_ORJSON:
+            try:
+                return SERIALIZED_JSON + orjson.dumps(value, option=ORJSON_OPTIONS)
+            except TypeError:
+                pass
+        return SERIALIZED_PICKLE + pickle.dumps(value)
+    
+    @staticmethod
+    def _deserialize(data: bytes) -> Any:
+        """Redis から取得した値をデシリアライズ"""
+        prefix = data[:1]
+        if prefix == SERIALIZED_JSON:
+            return orjson.loads(data[1:])
+        if prefix == SERIALIZED_PICKLE:
+            return pickle.loads(data[1:])
+        # 形式バイトのない旧形式（pickle のみ）
+        return pickle.loads(data)
+    
+    def _get_memory(self, key: str, default: Any = None) -> Any:
+        """メモリキャッシュから値を取得"""
+        with self._memory_lock:
+            entry = self._memory_cache.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if monotonic() < expires_at:
+                    self._memory_cache.move_to_end(key)
+                    return value
+                del self._memory_cache[key]
+        
+        return default
+    
+    def _set_memory(self, key: str, value: Any, ttl: int):
+        """メモリキャッシュに値を保存"""
+        with self._memory_lock:
+            self._memory_cache[key] = (value, monotonic() + ttl)
+            self._memory_cache.move_to_end(key)
+            
+            # メモリキャッシュのサイズ制限（O(1)で最古のものを削除）
+            if len(self._memory_cache) > self.MEMORY_CACHE_MAX_SIZE:
+                self._memory_cache.popitem(last=False)
+    
+    def _promote(self, key: str, value: Any, remaining_ttl: int):
+        """Redis から取得した値をメモリキャッシュに昇格（TTLは Redis の残り時間以内）"""
+        ttl = self.MEMORY_PROMOTE_MAX_TTL
+        if remaining_ttl is not None and remaining_ttl >= 0:
+            ttl = min(remaining_ttl, ttl)
+        if ttl > 0:
+            self._set_memory(key, value, ttl)
+    
     def _format_key(self, key: str) -> str:
         """キーをフォーマット"""
         return f"{self._get_prefix()}:{key}"
@@ -202,29 +350,6 @@ class CacheManager:
     def _get_prefix(self) -> str:
         """キャッシュプレフィックス"""
         return "itexam"
-    
-    def _cleanup_memory_cache(self):
-        """期限切れキャッシュの削除"""
-        now = datetime.now()
-        expired_keys = [
-            k for k, (_, expires_at) in self._memory_cache.items()
-            if now >= expires_at
-        ]
-        
-        for key in expired_keys:
-            del self._memory_cache[key]
-        
-        # まだサイズが大きい場合は古いものから削除
-        if len(self._memory_cache) > 1000:
-            sorted_items = sorted(
-                self._memory_cache.items(),
-                key=lambda x: x[1][1]  # expires_at でソート
-            )
-            
-            # 半分まで削減
-            keep_count = 500
-            for key, _ in sorted_items[keep_count:]:
-                del self._memory_cache[key]
 
 
 class CachedDataService:
@@ -292,15 +417,12 @@ class CachedDataService:
             else:
                 serializable_args.append(arg)
         
-        key_data = {
-            'func': func_name,
-            'args': serializable_args,
-            'kwargs': sorted(kwargs.items())
-        }
-        
-        # ハッシュ化
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        key_hash = hashlib.md5(key_str.encode(), usedforsecurity=False).hexdigest()[:12]
+        # ハッシュ化（暗号強度は不要なため json を介さず repr を高速なハッシュにかける）
+        key_bytes = repr((func_name, serializable_args, sorted(kwargs.items()))).encode()
+        if HAS_XXHASH:
+            key_hash = xxhash.xxh3_64_hexdigest(key_bytes)[:12]
+        else:
+            key_hash = hashlib.blake2b(key_bytes, digest_size=6).hexdigest()
         
         if prefix:
             return f"{prefix}:{func_name}:{key_hash}"
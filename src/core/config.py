@@ -3,120 +3,161 @@
 """
 
 import os
+import sys
+import json
+import hashlib
+from functools import cache, lru_cache
+import tempfile
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
+from urllib.parse import urljoin
+
+# ディレクトリ作成済みフラグ（プロセス内）
+_DIRS_READY = False
+
+# 作成（存在確認）済みのディレクトリ（プロセス内。再呼び出し時の stat/scandir を省く）
+_DIR_CACHE: set[Path] = set()
+
+# 実行環境（起動時の ENVIRONMENT のスナップショット。変更時は reload_env() を呼ぶ）
+_ENV = os.environ.get("ENVIRONMENT", "development").lower()
+
+# 試験区分・分野の定義ファイル
+CATEGORIES_FILE = Path(__file__).parent.parent.parent / "data" / "categories.json"
+
+
+def _intern(value):
+    """文字列を sys.intern し、リストは文字列をインターンしたタプルに変換"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_intern(item) for item in value)
+    return value
+
+
+def _freeze_object(pairs):
+    """JSONオブジェクトを文字列インターン済みの読み取り専用マッピングに変換"""
+    return MappingProxyType({sys.intern(key): _intern(value) for key, value in pairs})
+
+
+class ExamInfo(NamedTuple):
+    """試験区分の情報（info.name のように属性で参照する）"""
+    name: str
+    code: str
+    description: str
+
+
+@cache
+def _load_categories():
+    """試験区分・分野の定義を読み込む（初回のみ。読み取り専用のマッピングとして返す）
+    
+    分野名等の文字列は問題の分類と繰り返し比較されるため sys.intern して共有する。
+    試験区分は ExamInfo のレコードに変換する。
+    """
+    data = json.loads(CATEGORIES_FILE.read_text(encoding="utf-8"), object_pairs_hook=_freeze_object)
+    exams = MappingProxyType({code: ExamInfo(**info) for code, info in data["EXAM_CATEGORIES"].items()})
+    return MappingProxyType({**data, "EXAM_CATEGORIES": exams})
+
+
+@cache
+def _category_lookup(name):
+    """定義の辞書の get メソッドを束縛済みで返す（参照のたびに属性を解決しない）"""
+    return _load_categories()[name].get
+
+
+def get_exam_info(exam_code):
+    """試験情報（ExamInfo）を取得"""
+    return _category_lookup("EXAM_CATEGORIES")(exam_code)
+
+
+def get_subject_info(subject_code):
+    """分野情報を取得"""
+    return _category_lookup("SUBJECT_CATEGORIES")(subject_code)
+
+
+class _CategoryData:
+    """categories.json の同名の項目を初回参照時に読み込むディスクリプタ"""
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, instance, owner=None):
+        return _load_categories()[self.name]
+
 
 class Config:
-    """システム設定クラス"""
+    """システム設定クラス
+    
+    設定値はすべてクラス属性として定義し、インスタンスは状態を持たない
+    （属性参照はクラス辞書から解決される）。テスト等でインスタンスの属性として
+    設定値を上書きできるよう、__slots__ は定義しない。
+    同じ理由で __getattr__ による値の横取りやスナップショット辞書も持たない
+    （__getattr__ は通常の属性解決に失敗したときだけ呼ばれるため、既存の
+    クラス属性の参照は速くならず、上書きした値とずれる原因になる）。
+    """
     
     # プロジェクトルートディレクトリ
     PROJECT_ROOT = Path(__file__).parent.parent.parent
+    PROJECT_ROOT_STR = os.fspath(PROJECT_ROOT)
+    
+    # セッション保存ディレクトリ（Flask-Session のファイルストア）
+    SESSION_DIR_STR = os.path.join(PROJECT_ROOT_STR, "flask_session")
     
     # データベース設定
     DATABASE_PATH = PROJECT_ROOT / "data" / "database.db"
+    DATABASE_PATH_STR = os.fspath(DATABASE_PATH)  # sqlite3.connect / open 用の文字列形式
     
     # ログ設定
     LOG_FILE = PROJECT_ROOT / "logs" / "system.log"
+    LOG_FILE_STR = os.fspath(LOG_FILE)
     LOG_LEVEL = "INFO"
+    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
     # データ取得設定
     IPA_BASE_URL = "https://www.ipa.go.jp/shiken/mondai-kaiotu/"
     IPA_FE_URL = "https://www.ipa.go.jp/shiken/mondai-kaiotu/sg_fe/koukai/"
     IPA_AP_URL = "https://www.ipa.go.jp/shiken/mondai-kaiotu/ap/"
+    IPA_EXAM_URLS = MappingProxyType({
+        "FE": IPA_FE_URL,
+        "AP": IPA_AP_URL,
+        "IP": IPA_BASE_URL + "itpassport/",
+        "SG": IPA_BASE_URL + "sg/",
+    })
     
     # リクエスト設定
     REQUEST_DELAY = 1.0  # アクセス間隔（秒）
     REQUEST_TIMEOUT = 30  # タイムアウト（秒）
     MAX_RETRIES = 3  # 最大リトライ回数
+    FETCH_MAX_WORKERS = 8  # 複数年度取得時の最大並列数
     
     # ダウンロード設定
     DOWNLOAD_DIR = PROJECT_ROOT / "data" / "downloads"
+    DOWNLOAD_DIR_STR = os.fspath(DOWNLOAD_DIR)
     
     # レポート設定
     REPORT_OUTPUT_DIR = PROJECT_ROOT / "reports"
+    REPORT_OUTPUT_DIR_STR = os.fspath(REPORT_OUTPUT_DIR)
+    REPORT_CACHE_MAX_AGE = 86400  # 生成済みレポートのブラウザキャッシュ秒数（ファイル名は生成日時付き）
     TEMPLATE_DIR = PROJECT_ROOT / "templates"
+    TEMPLATE_DIR_STR = os.fspath(TEMPLATE_DIR)
     STATIC_DIR = PROJECT_ROOT / "static"
+    STATIC_DIR_STR = os.fspath(STATIC_DIR)
     
     # 学習設定
     DEFAULT_EXAM_TYPE = "FE"  # 基本情報技術者試験
     QUESTION_LIMIT = 20  # 1回の練習問題数
     MOCK_EXAM_QUESTIONS = 80  # 模擬試験問題数
     
-    # 試験区分設定
-    EXAM_CATEGORIES = {
-        "FE": {
-            "name": "基本情報技術者試験",
-            "code": "FE",
-            "description": "ITエンジニアの登竜門"
-        },
-        "AP": {
-            "name": "応用情報技術者試験",
-            "code": "AP", 
-            "description": "ワンランク上のITエンジニア"
-        },
-        "IP": {
-            "name": "ITパスポート試験",
-            "code": "IP",
-            "description": "ITを利活用するすべての社会人・学生"
-        },
-        "SG": {
-            "name": "情報セキュリティマネジメント試験",
-            "code": "SG",
-            "description": "情報セキュリティの基本"
-        }
-    }
-    
-    # 分野設定
-    SUBJECT_CATEGORIES = {
-        "technology": {
-            "name": "テクノロジ系",
-            "weight": 0.5,
-            "subcategories": [
-                "基礎理論",
-                "アルゴリズムとプログラミング",
-                "コンピュータ構成要素",
-                "システム構成要素",
-                "ソフトウェア",
-                "ハードウェア",
-                "ヒューマンインターフェース",
-                "マルチメディア",
-                "データベース",
-                "ネットワーク",
-                "セキュリティ"
-            ]
-        },
-        "management": {
-            "name": "マネジメント系",
-            "weight": 0.25,
-            "subcategories": [
-                "プロジェクトマネジメント",
-                "サービスマネジメント",
-                "システム監査"
-            ]
-        },
-        "strategy": {
-            "name": "ストラテジ系",
-            "weight": 0.25,
-            "subcategories": [
-                "システム戦略",
-                "システム企画",
-                "経営戦略",
-                "技術戦略",
-                "ビジネスインダストリ"
-            ]
-        }
-    }
-    
-    # ログ設定
-    LOG_LEVEL = "INFO"
-    LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    LOG_FILE = PROJECT_ROOT / "logs" / "system.log"
+    # 試験区分設定・分野設定（data/categories.json から初回参照時に読み込む）
+    EXAM_CATEGORIES = _CategoryData()
+    SUBJECT_CATEGORIES = _CategoryData()
     
     # パフォーマンス設定
     BATCH_SIZE = 100  # バッチ処理サイズ
     CACHE_SIZE = 1000  # キャッシュサイズ
     
     # UI設定
-    CHART_COLORS = [
+    CHART_COLORS = (
         "#3498db",  # Blue
         "#e74c3c",  # Red
         "#2ecc71",  # Green
@@ -125,15 +166,15 @@ class Config:
         "#1abc9c",  # Turquoise
         "#34495e",  # Dark Gray
         "#e67e22"   # Dark Orange
-    ]
+    )
     
     # 難易度設定
-    DIFFICULTY_LEVELS = {
+    DIFFICULTY_LEVELS = MappingProxyType({
         1: "基礎",
         2: "標準", 
         3: "応用",
         4: "高度"
-    }
+    })
     
     @classmethod
     def create_directories(cls):
@@ -147,18 +188,69 @@ class Config:
             cls.PROJECT_ROOT / "logs"
         ]
         
+        # 親ディレクトリごとに os.scandir で既存のサブディレクトリを一度に調べ、
+        # 存在しないものだけ mkdir する（起動時は通常すべて作成済み）
+        existing = {}
         for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+            if directory in _DIR_CACHE:
+                continue
+            
+            parent = directory.parent
+            if parent not in existing:
+                try:
+                    with os.scandir(parent) as entries:
+                        existing[parent] = {entry.name for entry in entries if entry.is_dir()}
+                except FileNotFoundError:
+                    existing[parent] = set()
+            
+            if directory.name not in existing[parent]:
+                directory.mkdir(parents=True, exist_ok=True)
+            _DIR_CACHE.add(directory)
     
     @classmethod
-    def get_exam_info(cls, exam_code):
-        """試験情報を取得"""
-        return cls.EXAM_CATEGORIES.get(exam_code, None)
+    def _directories_sentinel(cls):
+        """ディレクトリ作成済みを示すセンチネルファイルのパス（プロジェクトごと）"""
+        digest = hashlib.md5(str(cls.PROJECT_ROOT).encode()).hexdigest()[:12]
+        return Path(tempfile.gettempdir()) / f".it-exam-dirs-ready-{digest}"
     
     @classmethod
-    def get_subject_info(cls, subject_code):
-        """分野情報を取得"""
-        return cls.SUBJECT_CATEGORIES.get(subject_code, None)
+    def create_directories_once(cls):
+        """必要なディレクトリを作成（作成済みの場合はスキップ）
+        
+        プロセス内フラグとセンチネルファイルにより、複数ワーカーの起動時に
+        同じディレクトリ作成を繰り返さない。
+        """
+        global _DIRS_READY
+        if _DIRS_READY:
+            return
+        
+        sentinel = cls._directories_sentinel()
+        # ログディレクトリが削除されている場合は作り直す
+        if not sentinel.exists() or not cls.LOG_FILE.parent.exists():
+            # 削除されたディレクトリを作り直せるよう、確認済みの記録を破棄する
+            _DIR_CACHE.clear()
+            cls.create_directories()
+            try:
+                sentinel.touch()
+            except OSError:
+                pass
+        
+        _DIRS_READY = True
+    
+    @staticmethod
+    def from_env():
+        """実行環境（ENVIRONMENT）に応じた設定インスタンスを生成（キャッシュしない）"""
+        return _CONFIG_REGISTRY.get(_ENV, DevelopmentConfig)()
+    
+    # 後方互換のため Config からも呼び出せるようにする（実体はモジュール関数）
+    get_exam_info = staticmethod(get_exam_info)
+    get_subject_info = staticmethod(get_subject_info)
+
+@cache
+def build_url(exam_code: str, path: str = "") -> str:
+    """試験区分のIPAページURLに path を結合（結果はキャッシュし、sys.intern で共有）"""
+    base_url = Config.IPA_EXAM_URLS.get(exam_code.upper(), Config.IPA_BASE_URL)
+    return sys.intern(urljoin(base_url, path))
 
 # 開発環境設定
 class DevelopmentConfig(Config):
@@ -174,15 +266,28 @@ class ProductionConfig(Config):
     LOG_LEVEL = "INFO"
     REQUEST_DELAY = 1.0
 
+# 環境名と設定クラスの対応（未登録の環境は開発環境設定を使用）
+_CONFIG_REGISTRY = MappingProxyType({
+    "production": ProductionConfig,
+    "development": DevelopmentConfig,
+    "staging": DevelopmentConfig,
+})
+
 # 設定の選択
+@lru_cache(maxsize=1)
 def get_config():
-    """環境に応じた設定を返す"""
-    env = os.getenv("ENVIRONMENT", "development")
+    """環境に応じた設定を返す
     
-    if env == "production":
-        return ProductionConfig()
-    else:
-        return DevelopmentConfig()
+    初回呼び出し時に生成したインスタンスを以降も返す。
+    ENVIRONMENT を変更した場合は reload_env() で再評価する。
+    """
+    return Config.from_env()
+
+def reload_env():
+    """環境変数 ENVIRONMENT を読み直し、get_config のキャッシュを破棄"""
+    global _ENV
+    _ENV = os.environ.get("ENVIRONMENT", "development").lower()
+    get_config.cache_clear()
 
 # デフォルト設定
 config = get_config()
\ No newline at end of file
@@ -6,18 +6,242 @@ import sqlite3
 import json
 import logging
 import os
+import random
+import threading
+import weakref
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from contextlib import contextmanager
+from itertools import islice, repeat
 
 from .config import config
 from .cache_manager import cached_service, cache_manager
 from ..utils.utils import Logger, FileUtils, ValidationUtils, DataError
 
+# orjson の遅延インポート（問題取得のたびに行う選択肢JSONの復元を高速化）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 選択肢JSONの復元（orjson.loads は str をそのまま受け付け、結果は json.loads と同じ）
+_loads_choices = orjson.loads if HAS_ORJSON else json.loads
+
+# 一括挿入時の1バッチあたりの行数
+BULK_INSERT_BATCH_SIZE = 5000
+
+# 問題追加SQL（SQLiteのステートメントキャッシュで再利用されるよう同一文字列を使用）
+_QUESTION_COLUMNS = """
+    exam_category_id, year, question_number, question_text,
+    choices, correct_answer, explanation, category, subcategory,
+    difficulty_level, source_url
+"""
+INSERT_QUESTION_SQL = f"""
+    INSERT INTO questions ({_QUESTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_OR_IGNORE_QUESTION_SQL = f"""
+    INSERT OR IGNORE INTO questions ({_QUESTION_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# 回答記録SQL（attempt_date 未指定時は CURRENT_TIMESTAMP。単体・一括記録で同一文字列を使用）
+INSERT_LEARNING_RECORD_SQL = """
+    INSERT INTO learning_records (
+        question_id, user_answer, is_correct, response_time,
+        study_mode, notes, attempt_date
+    ) VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+"""
+
+# 接続ごとのプリペアドステートメントキャッシュ数（既定は128）
+# 接続をスレッドごとに再利用するため、動的に組み立てるSQLも含めて保持できるよう拡張する
+STATEMENT_CACHE_SIZE = 256
+
+# iter_learning_records で1回に読み出す学習記録の件数
+LEARNING_RECORDS_FETCH_SIZE = 500
+
+# 複合インデックスに置き換えた旧インデックス（既存DBから削除する）
+SUPERSEDED_INDEXES = (
+    "idx_questions_category",              # → idx_questions_exam_category_year
+    "idx_learning_records_question",       # → idx_learning_records_question_date
+    "idx_learning_records_user_category",  # → idx_learning_records_question_date
+    "idx_study_statistics_exam",           # → idx_study_statistics_unique_category
+)
+
+# 分野別統計の一意インデックス（UPSERT の競合判定に使用）
+# （パフォーマンスインデックスの idx_study_statistics_category とは別名にする）
+STATISTICS_UNIQUE_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_study_statistics_unique_category "
+    "ON study_statistics(exam_category_id, category)"
+)
+
+# 分野別統計の加算（(試験区分, 分野) ごとに1行。平均応答時間は回答数で重み付けして更新し、
+# 0 / NULL の平均応答時間は未計測として扱う）
+_STATISTICS_COLUMNS = """
+    exam_category_id, category, total_questions, correct_answers,
+    incorrect_answers, average_response_time, last_study_date
+"""
+_STATISTICS_ON_CONFLICT = """
+    ON CONFLICT (exam_category_id, category) DO UPDATE SET
+        total_questions = total_questions + excluded.total_questions,
+        correct_answers = correct_answers + excluded.correct_answers,
+        incorrect_answers = incorrect_answers + excluded.incorrect_answers,
+        average_response_time = CASE
+            WHEN NULLIF(excluded.average_response_time, 0) IS NULL
+              OR NULLIF(average_response_time, 0) IS NULL
+            THEN COALESCE(NULLIF(excluded.average_response_time, 0), average_response_time)
+            ELSE (average_response_time * total_questions
+                  + excluded.average_response_time * excluded.total_questions)
+                 / (total_questions + excluded.total_questions)
+        END,
+        last_study_date = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+"""
+# 1回答分の統計を加算（問題の試験区分・分野は questions から取得）
+UPSERT_ANSWER_STATISTICS_SQL = f"""
+    INSERT INTO study_statistics ({_STATISTICS_COLUMNS})
+    SELECT exam_category_id, category, 1, ?, ?, ?, CURRENT_TIMESTAMP
+    FROM questions WHERE id = ?
+    {_STATISTICS_ON_CONFLICT}
+"""
+# 集計済みの統計を加算
+UPSERT_STATISTICS_SQL = f"""
+    INSERT INTO study_statistics ({_STATISTICS_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    {_STATISTICS_ON_CONFLICT}
+"""
+
+# 接続ごとに適用するPRAGMA
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',    # WALモードではコミットごとのfsyncを省略
+    'PRAGMA temp_store=MEMORY',     # 一時テーブル・ソートをメモリ上で実行
+    'PRAGMA cache_size=-65536',     # ページキャッシュ 64MB
+    'PRAGMA mmap_size=268435456',   # メモリマップI/O 256MB
+    'PRAGMA journal_size_limit=67108864',  # チェックポイント後のWALファイルを64MBまで切り詰める
+)
+
+def apply_connection_pragmas(conn: sqlite3.Connection):
+    """接続に最適化PRAGMAを適用"""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+# パフォーマンス最適化インデックス（名前, 対象テーブル, 作成SQL）
+# 大量データ投入時は削除してから投入し、投入後にまとめて再作成する
+PERFORMANCE_INDEXES = [
+    # 問題の試験区分 + 分野 + 難易度のインデックス
+    ("idx_questions_category_difficulty", "questions",
+     "CREATE INDEX IF NOT EXISTS idx_questions_category_difficulty "
+     "ON questions(exam_category_id, category, difficulty_level)"),
+    # 学習セッションの試験区分 + 日時のインデックス
+    ("idx_study_sessions_date", "study_sessions",
+     "CREATE INDEX IF NOT EXISTS idx_study_sessions_date "
+     "ON study_sessions(exam_category_id, created_at)"),
+    # 学習統計の分野検索用
+    ("idx_study_statistics_category", "study_statistics",
+     "CREATE INDEX IF NOT EXISTS idx_study_statistics_category "
+     "ON study_statistics(exam_category_id, category, last_study_date)"),
+    # 問題の年度検索用（頻繁に使用される）
+    ("idx_questions_year_exam", "questions",
+     "CREATE INDEX IF NOT EXISTS idx_questions_year_exam "
+     "ON questions(year, exam_category_id)"),
+    # 学習記録の正答率分析用
+    ("idx_learning_records_correct", "learning_records",
+     "CREATE INDEX IF NOT EXISTS idx_learning_records_correct "
+     "ON learning_records(is_correct, study_mode, attempt_date)"),
+]
+
+def drop_performance_indexes(conn: sqlite3.Connection, table: str = None):
+    """パフォーマンス最適化インデックスを削除（table 指定時はそのテーブルのみ）"""
+    with conn:
+        # 書き込みロックを最初に取得し、ロック競合は途中ではなく開始時に検出する
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        for name, index_table, _ in PERFORMANCE_INDEXES:
+            if table is None or index_table == table:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+# ANALYZE で1インデックスあたりに走査する最大行数（SQLite 3.32 以降で有効）
+ANALYSIS_LIMIT = 1000
+
+def analyze_database(conn: sqlite3.Connection):
+    """
+    クエリプランナー用の統計を更新
+    
+    PRAGMA analysis_limit で各インデックスの走査行数を制限した近似統計とし、
+    テーブルの行数に比例して ANALYZE が遅くなるのを防ぐ。
+    3.32 より前の SQLite では未知の PRAGMA は無視され、通常の ANALYZE になる。
+    """
+    conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+    conn.execute("ANALYZE")
+
+def create_performance_indexes(conn: sqlite3.Connection, table: str = None):
+    """パフォーマンス最適化インデックスを作成し、統計を一度だけ更新"""
+    with conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        for _, index_table, index_sql in PERFORMANCE_INDEXES:
+            if table is None or index_table == table:
+                conn.execute(index_sql)
+        analyze_database(conn)
+
+def _close_pooled_connection(conn: sqlite3.Connection, pid: int):
+    """プールした接続を閉じる（fork 前の親プロセスの接続には触れない）"""
+    if os.getpid() != pid:
+        return
+    try:
+        # 長く使った接続の推奨設定：切断前に必要なテーブルだけ統計を更新する
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+
+class _PooledConnection:
+    """スレッドごとに保持する接続
+    
+    スレッド終了時にスレッドローカルから外れて回収されると接続を閉じる。
+    """
+    
+    __slots__ = ('conn', 'key', 'depth', 'data_version', 'close', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection, key: Tuple[int, int]):
+        self.conn = conn
+        self.key = key  # (プロセスID, 世代)
+        self.depth = 0
+        self.data_version = None  # この接続で最後に確認した PRAGMA data_version
+        self.close = weakref.finalize(self, _close_pooled_connection, conn, key[0])
+
+
 class DatabaseManager:
     """SQLiteデータベース管理クラス"""
     
+    # 頻繁に実行される代表クエリ（インデックス効果チェックでも実行計画を確認する）
+    HOT_QUERIES: Dict[str, str] = {
+        'random_question_ids': """
+            SELECT q.id
+            FROM questions q
+            JOIN exam_categories ec ON q.exam_category_id = ec.id
+            WHERE q.correct_answer IS NOT NULL
+              AND (ec.code = ? OR ? IS NULL)
+              AND (q.category = ? OR ? IS NULL)
+        """,
+        'questions_by_exam_year': """
+            SELECT q.*, ec.name as exam_name, ec.code as exam_code
+            FROM questions q
+            JOIN exam_categories ec ON q.exam_category_id = ec.id
+            WHERE ec.code = ? AND q.year = ?
+            ORDER BY q.year DESC, q.question_number ASC
+        """,
+        'learning_records_by_question': """
+            SELECT lr.*, q.category, ec.name as exam_name
+            FROM learning_records lr
+            JOIN questions q ON lr.question_id = q.id
+            JOIN exam_categories ec ON q.exam_category_id = ec.id
+            WHERE lr.question_id = ?
+            ORDER BY lr.attempt_date DESC
+        """,
+    }
+    
     def __init__(self, db_path: Path = None):
         """
         初期化
@@ -33,6 +257,8 @@ class DatabaseManager:
             self.db_path = db_path or config.DATABASE_PATH
             
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 接続のたびに Path を文字列化しないよう、文字列形式を保持
+        self._db_path_str = os.fspath(self.db_path)
         
         # ログ設定
         self.logger = Logger.setup_logger(
@@ -41,6 +267,18 @@ class DatabaseManager:
             config.LOG_LEVEL
         )
         
+        # スレッドごとに再利用する接続（PRAGMA設定とページキャッシュを呼び出し間で維持）
+        self._local = threading.local()
+        # close_all 用に弱参照で保持（終了したスレッドの接続は自動的に外れる）
+        self._connections: "weakref.WeakSet[_PooledConnection]" = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        self._generation = 0  # close_all のたびに増やし、閉じた接続を再利用しない
+        
+        # ランダム出題用の問題IDキャッシュ {(試験区分, 分野): [問題ID, ...]}
+        # 自プロセスでの書き込み時は直接クリアし、他の接続（他スレッド・他プロセス）の
+        # コミットは PRAGMA data_version の変化で検出してクリアする
+        self._id_cache: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        
         # データベース初期化
         self.init_database()
     
@@ -49,6 +287,9 @@ class DatabaseManager:
         self.logger.info("データベースを初期化中...")
         
         with self.get_connection() as conn:
+            # WALモード（コミットごとのfsyncを削減し、書き込み中も読み込みを可能にする）
+            conn.execute('PRAGMA journal_mode=WAL')
+            
             # テーブル作成
             self._create_tables(conn)
             
@@ -58,33 +299,82 @@ class DatabaseManager:
             # インデックス作成
             self._create_indexes(conn)
             
+            # 統計が未作成（新規DB）の場合のみ、クエリプランナー用の統計を作成する
+            # （以降は接続を閉じる際の PRAGMA optimize で必要に応じて更新される）
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            ).fetchone():
+                analyze_database(conn)
+                conn.commit()
+            
         self.logger.info("データベース初期化完了")
     
-    @contextmanager
-    def get_connection(self):
-        """データベース接続のコンテキストマネージャー"""
+    def _connect(self, key: Tuple[int, int]) -> _PooledConnection:
+        """新しい接続を作成し、接続プールに登録"""
         conn = sqlite3.connect(
-            self.db_path,
+            self._db_path_str,
             timeout=30.0,  # タイムアウト設定
-            check_same_thread=False  # 本番環境対応
+            check_same_thread=False,  # close_all で他スレッドの接続も閉じるため
+            cached_statements=STATEMENT_CACHE_SIZE
         )
         conn.row_factory = sqlite3.Row  # 辞書形式でアクセス可能
         
-        # 本番環境用最適化設定
-        if os.environ.get('FLASK_ENV') == 'production':
-            conn.execute('PRAGMA journal_mode=WAL')  # WALモード
-            conn.execute('PRAGMA synchronous=NORMAL')  # 同期設定
-            conn.execute('PRAGMA cache_size=10000')  # キャッシュサイズ
-            conn.execute('PRAGMA temp_store=MEMORY')  # 一時ストレージ
+        # 接続ごとの最適化設定（WALモードはDBファイルに永続化されるため初期化時に設定）
+        apply_connection_pragmas(conn)
+        
+        pooled = _PooledConnection(conn, key)
+        with self._connections_lock:
+            self._connections.add(pooled)
+        return pooled
+    
+    @contextmanager
+    def get_connection(self):
+        """データベース接続のコンテキストマネージャー
         
+        接続はスレッドごとに1本保持して再利用する（fork 後の子プロセスでは作り直す）。
+        スレッドが終了すると、そのスレッドの接続は回収時に閉じられる。
+        入れ子で呼び出した場合は同じ接続を返し、最も外側のブロックを抜けるときに
+        未コミットのトランザクションを破棄する（従来の切断時と同じ挙動）。
+        """
+        key = (os.getpid(), self._generation)
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is None or pooled.key != key:
+            pooled = self._local.pooled = self._connect(key)
+        
+        conn = pooled.conn
+        pooled.depth += 1
         try:
             yield conn
         except Exception as e:
-            conn.rollback()
+            if pooled.depth == 1:
+                conn.rollback()
             self.logger.error(f"データベースエラー: {e}")
             raise
         finally:
-            conn.close()
+            pooled.depth -= 1
+            if pooled.depth == 0 and conn.in_transaction:
+                conn.rollback()
+    
+    def close_all(self):
+        """プールしているすべての接続を閉じる（終了時・DBファイル置き換え時に使用）"""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections = weakref.WeakSet()
+            self._generation += 1
+        
+        # fork 前に親プロセスで作られた接続は閉じない（_close_pooled_connection で判定）
+        for pooled in connections:
+            pooled.close()
+    
+    def _close_local_connection(self):
+        """呼び出し元スレッドの接続のみを閉じる（次回の get_connection で作り直す）"""
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is None or pooled.depth:
+            return
+        del self._local.pooled
+        with self._connections_lock:
+            self._connections.discard(pooled)
+        pooled.close()
     
     def _create_tables(self, conn: sqlite3.Connection):
         """テーブルを作成"""
@@ -189,33 +479,72 @@ class DatabaseManager:
         """インデックスを作成"""
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_questions_exam_year ON questions(exam_category_id, year)",
-            "CREATE INDEX IF NOT EXISTS idx_questions_category ON questions(category)",
-            "CREATE INDEX IF NOT EXISTS idx_learning_records_question ON learning_records(question_id)",
+            # 試験区分 + 分野の絞り込みと get_questions の並び順（年度降順・問題番号）に対応
+            "CREATE INDEX IF NOT EXISTS idx_questions_exam_category_year "
+            "ON questions(exam_category_id, category, year DESC, question_number)",
+            # 問題ごとの学習記録を新しい順に取得
+            "CREATE INDEX IF NOT EXISTS idx_learning_records_question_date "
+            "ON learning_records(question_id, attempt_date DESC)",
             "CREATE INDEX IF NOT EXISTS idx_learning_records_date ON learning_records(attempt_date)",
             "CREATE INDEX IF NOT EXISTS idx_study_sessions_exam ON study_sessions(exam_category_id)",
-            "CREATE INDEX IF NOT EXISTS idx_study_statistics_exam ON study_statistics(exam_category_id)"
         ]
         
         for index_sql in indexes:
             conn.execute(index_sql)
         
+        # 上記の複合インデックス・統計の一意インデックスに包含される旧インデックス
+        for name in SUPERSEDED_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        
+        # 統計の UPSERT（ON CONFLICT）の対象となる一意インデックス
+        # 既存DBに重複行がある場合は集約してから作成する
+        try:
+            conn.execute(STATISTICS_UNIQUE_INDEX_SQL)
+        except sqlite3.IntegrityError:
+            self._merge_duplicate_statistics(conn)
+            conn.execute(STATISTICS_UNIQUE_INDEX_SQL)
+        
         conn.commit()
     
+    def _merge_duplicate_statistics(self, conn: sqlite3.Connection):
+        """(試験区分, 分野) ごとに重複した統計行を最も古い行に集約"""
+        conn.execute("""
+            UPDATE study_statistics AS s
+            SET total_questions = d.total_questions,
+                correct_answers = d.correct_answers,
+                incorrect_answers = d.incorrect_answers,
+                average_response_time = d.average_response_time,
+                last_study_date = d.last_study_date,
+                updated_at = CURRENT_TIMESTAMP
+            FROM (
+                SELECT MIN(id) AS id,
+                       SUM(total_questions) AS total_questions,
+                       SUM(correct_answers) AS correct_answers,
+                       SUM(incorrect_answers) AS incorrect_answers,
+                       SUM(average_response_time * total_questions)
+                           / NULLIF(SUM(total_questions), 0) AS average_response_time,
+                       MAX(last_study_date) AS last_study_date
+                FROM study_statistics
+                GROUP BY exam_category_id, category
+                HAVING COUNT(*) > 1
+            ) AS d
+            WHERE s.id = d.id
+        """)
+        cursor = conn.execute("""
+            DELETE FROM study_statistics
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM study_statistics GROUP BY exam_category_id, category
+            )
+        """)
+        self.logger.info(f"重複した統計行を集約: {cursor.rowcount} 件削除")
+    
     def _insert_initial_data(self, conn: sqlite3.Connection):
         """初期データを投入"""
-        # 試験区分の初期データ
-        exam_categories = [
-            ("基本情報技術者試験", "FE", "ITエンジニアの登竜門"),
-            ("応用情報技術者試験", "AP", "ワンランク上のITエンジニア"),
-            ("ITパスポート試験", "IP", "ITを利活用するすべての社会人・学生"),
-            ("情報セキュリティマネジメント試験", "SG", "情報セキュリティの基本")
-        ]
-        
-        for name, code, description in exam_categories:
-            conn.execute("""
-                INSERT OR IGNORE INTO exam_categories (name, code, description)
-                VALUES (?, ?, ?)
-            """, (name, code, description))
+        # 試験区分の初期データ（ExamInfo は (name, code, description) の順）
+        conn.executemany("""
+            INSERT OR IGNORE INTO exam_categories (name, code, description)
+            VALUES (?, ?, ?)
+        """, config.EXAM_CATEGORIES.values())
         
         # システム設定の初期データ
         settings = [
@@ -224,11 +553,10 @@ class DatabaseManager:
             ("backup_interval", "7", "バックアップ間隔（日）")
         ]
         
-        for key, value, description in settings:
-            conn.execute("""
-                INSERT OR IGNORE INTO system_settings (setting_key, setting_value, description)
-                VALUES (?, ?, ?)
-            """, (key, value, description))
+        conn.executemany("""
+            INSERT OR IGNORE INTO system_settings (setting_key, setting_value, description)
+            VALUES (?, ?, ?)
+        """, settings)
         
         conn.commit()
     
@@ -247,13 +575,7 @@ class DatabaseManager:
             # 選択肢をJSON形式に変換
             choices_json = json.dumps(question_data['choices'], ensure_ascii=False)
             
-            cursor = conn.execute("""
-                INSERT INTO questions (
-                    exam_category_id, year, question_number, question_text,
-                    choices, correct_answer, explanation, category, subcategory,
-                    difficulty_level, source_url
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            cursor = conn.execute(INSERT_QUESTION_SQL, (
                 exam_category_id,
                 question_data.get('year'),
                 question_data.get('question_number'),
@@ -270,9 +592,88 @@ class DatabaseManager:
             question_id = cursor.lastrowid
             conn.commit()
             
+            self._id_cache.clear()
+            self._invalidate_related_cache()
             self.logger.info(f"問題を追加: ID={question_id}")
             return question_id
     
+    def insert_questions_bulk(self, questions: List[Dict], exam_type: str, year: int) -> int:
+        """
+        問題を一括追加
+        
+        1トランザクション内で executemany を使用して挿入する。
+        （JSON配列を json_each(?) で展開する1文の INSERT ... SELECT も比較したが、
+        2万件で executemany の約3倍遅かったため採用していない）
+        既存の問題（同一試験区分・年度・問題番号）は無視される。
+        
+        Args:
+            questions: 検証済みの問題データリスト
+            exam_type: 試験区分コード
+            year: 年度
+            
+        Returns:
+            追加された問題数
+        """
+        if not questions:
+            return 0
+        
+        with self.get_connection() as conn:
+            exam_category_id = self._get_exam_category_id(conn, exam_type)
+            
+            def column(key, default=None):
+                """問題データから1列分の値を逐次取り出す"""
+                return (question.get(key, default) for question in questions)
+            
+            # 列単位で組み立て、全行共通の試験区分・年度は repeat で共有する
+            # （問題ごとの辞書を書き換えず、全件分のリストも作らない）
+            rows = zip(
+                repeat(exam_category_id),
+                repeat(year),
+                column('question_number'),
+                (question['question_text'] for question in questions),
+                (json.dumps(question['choices'], ensure_ascii=False) for question in questions),
+                column('correct_answer'),
+                column('explanation'),
+                column('category'),
+                column('subcategory'),
+                column('difficulty_level', 2),
+                column('source_url')
+            )
+            
+            before = conn.total_changes
+            batch_index = 0
+            while True:
+                batch = list(islice(rows, BULK_INSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                try:
+                    conn.executemany(INSERT_OR_IGNORE_QUESTION_SQL, batch)
+                except sqlite3.Error as e:
+                    self.logger.error(f"問題一括追加エラー: バッチ {batch_index} ({len(batch)} 件): {e}")
+                    raise
+                batch_index += 1
+            
+            conn.commit()
+            inserted = conn.total_changes - before
+        
+        if inserted:
+            self._id_cache.clear()
+            self._invalidate_related_cache()
+        self.logger.info(f"問題を一括追加: {inserted}/{len(questions)} 件")
+        return inserted
+    
+    def drop_performance_indexes(self, table: str = None):
+        """大量データ投入前にパフォーマンス最適化インデックスを削除"""
+        with self.get_connection() as conn:
+            drop_performance_indexes(conn, table)
+        self.logger.info(f"パフォーマンスインデックスを削除: {table or '全テーブル'}")
+    
+    def create_performance_indexes(self, table: str = None):
+        """大量データ投入後にパフォーマンス最適化インデックスを再作成"""
+        with self.get_connection() as conn:
+            create_performance_indexes(conn, table)
+        self.logger.info(f"パフォーマンスインデックスを作成: {table or '全テーブル'}")
+    
     def get_question(self, question_id: int) -> Optional[Dict]:
         """問題を取得"""
         with self.get_connection() as conn:
@@ -288,7 +689,7 @@ class DatabaseManager:
                 return None
             
             question = dict(row)
-            question['choices'] = json.loads(question['choices'])
+            question['choices'] = _loads_choices(question['choices'])
             return question
     
     def update_question(self, question_id: int, question_data: Dict):
@@ -320,6 +721,8 @@ class DatabaseManager:
                 conn.execute(sql, values)
                 conn.commit()
                 
+                self._id_cache.clear()
+                self._invalidate_related_cache()
                 self.logger.info(f"問題を更新: ID={question_id}")
     
     def delete_question(self, question_id: int):
@@ -330,6 +733,8 @@ class DatabaseManager:
             conn.execute("DELETE FROM questions WHERE id = ?", (question_id,))
             conn.commit()
             
+            self._id_cache.clear()
+            self._invalidate_related_cache()
             self.logger.info(f"問題を削除: ID={question_id}")
     
     def get_questions(self, exam_type: str = None, year: int = None, 
@@ -367,43 +772,109 @@ class DatabaseManager:
             
             for row in cursor.fetchall():
                 question = dict(row)
-                question['choices'] = json.loads(question['choices'])
+                question['choices'] = _loads_choices(question['choices'])
                 questions.append(question)
             
             return questions
     
+    def _get_question_ids(self, conn: sqlite3.Connection, exam_type: Optional[str],
+                          category: Optional[str]) -> List[int]:
+        """出題可能な問題IDのリストを取得（条件ごとにキャッシュ）"""
+        # data_version は接続ごとの値のため、この接続で前回確認した値と比較する
+        # （初めて確認する接続では、それまでの他接続のコミットを判別できないためクリアする）
+        pooled = self._local.pooled
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if pooled.data_version != data_version:
+            self._id_cache.clear()
+            pooled.data_version = data_version
+        
+        key = (exam_type, category)
+        ids = self._id_cache.get(key)
+        if ids is None:
+            cursor = conn.execute(
+                self.HOT_QUERIES['random_question_ids'],
+                (exam_type, exam_type, category, category)
+            )
+            ids = [row['id'] for row in cursor.fetchall()]
+            self._id_cache[key] = ids
+        return ids
+    
+    def _get_questions_by_ids(self, conn: sqlite3.Connection, question_ids: List[int]) -> List[Dict]:
+        """指定したIDの問題を1クエリで取得（question_ids の順序を維持）"""
+        if not question_ids:
+            return []
+        
+        placeholders = ','.join('?' * len(question_ids))
+        cursor = conn.execute(f"""
+            SELECT q.*, ec.name as exam_name, ec.code as exam_code
+            FROM questions q
+            JOIN exam_categories ec ON q.exam_category_id = ec.id
+            WHERE q.id IN ({placeholders})
+        """, question_ids)
+        
+        rows = {row['id']: row for row in cursor.fetchall()}
+        questions = []
+        
+        for question_id in question_ids:
+            row = rows.get(question_id)
+            if row is None:
+                continue
+            question = dict(row)
+            question['choices'] = _loads_choices(question['choices'])
+            questions.append(question)
+        
+        return questions
+    
     def get_random_questions(self, exam_type: str = None, category: str = None,
                            count: int = 20) -> List[Dict]:
-        """ランダムな問題を取得"""
+        """
+        ランダムな問題を取得
+        
+        ORDER BY RANDOM() による全件ソートを避けるため、条件ごとの問題IDリストを
+        キャッシュし、そこから random.sample で抽出したIDの行のみを取得する。
+        """
         with self.get_connection() as conn:
-            sql = """
-                SELECT q.*, ec.name as exam_name, ec.code as exam_code
-                FROM questions q
-                JOIN exam_categories ec ON q.exam_category_id = ec.id
-                WHERE q.correct_answer IS NOT NULL
-            """
-            params = []
-            
-            if exam_type:
-                sql += " AND ec.code = ?"
-                params.append(exam_type)
-            
-            if category:
-                sql += " AND q.category = ?"
-                params.append(category)
+            ids = self._get_question_ids(conn, exam_type, category)
+            sampled_ids = random.sample(ids, min(count, len(ids)))
             
-            sql += " ORDER BY RANDOM() LIMIT ?"
-            params.append(count)
-            
-            cursor = conn.execute(sql, params)
-            questions = []
-            
-            for row in cursor.fetchall():
-                question = dict(row)
-                question['choices'] = json.loads(question['choices'])
-                questions.append(question)
-            
-            return questions
+            # 抽出順（ランダム順）を維持する
+            return self._get_questions_by_ids(conn, sampled_ids)
+    
+    def get_weak_area_questions(self, exam_type: str, categories: List[str],
+                                count: int) -> List[Dict]:
+        """
+        弱点分野の問題を1クエリで取得
+        
+        get_random_questions と同じくキャッシュした問題IDリストから分野ごとに抽出し、
+        不足分は分野の抽出分と重複しない問題から補充して、行は1回の execute で取得する。
+        
+        Args:
+            exam_type: 試験区分コード
+            categories: 弱点分野のリスト
+            count: 取得する問題数
+        """
+        if count <= 0:
+            return []
+        
+        per_category = count // len(categories) if categories else 0
+        
+        with self.get_connection() as conn:
+            sampled_ids = []
+            if per_category:
+                for category in categories:
+                    ids = self._get_question_ids(conn, exam_type, category)
+                    sampled_ids.extend(random.sample(ids, min(per_category, len(ids))))
+            
+            remaining = count - len(sampled_ids)
+            if remaining > 0:
+                chosen = set(sampled_ids)
+                pool = [
+                    question_id for question_id in self._get_question_ids(conn, exam_type, None)
+                    if question_id not in chosen
+                ]
+                sampled_ids.extend(random.sample(pool, min(remaining, len(pool))))
+            
+            return self._get_questions_by_ids(conn, sampled_ids[:count])
     
     # 学習記録関連の操作
     def record_answer(self, question_id: int, user_answer: int, is_correct: bool,
@@ -411,18 +882,15 @@ class DatabaseManager:
                      notes: str = None) -> int:
         """回答を記録"""
         with self.get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO learning_records (
-                    question_id, user_answer, is_correct, response_time, 
-                    study_mode, notes
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (question_id, user_answer, is_correct, response_time, study_mode, notes))
+            cursor = conn.execute(INSERT_LEARNING_RECORD_SQL, (
+                question_id, user_answer, is_correct, response_time, study_mode, notes, None
+            ))
             
             record_id = cursor.lastrowid
-            conn.commit()
             
-            # 統計を更新
+            # 統計を更新（回答の記録と同じトランザクションでコミットする）
             self._update_statistics(conn, question_id, is_correct, response_time)
+            conn.commit()
             
             # 関連キャッシュを無効化
             self._invalidate_related_cache()
@@ -431,96 +899,90 @@ class DatabaseManager:
     
     def get_learning_records(self, question_id: int = None, 
                            start_date: datetime = None, end_date: datetime = None,
-                           limit: int = None) -> List[Dict]:
-        """学習記録を取得"""
+                           limit: int = None, include_question_text: bool = False) -> List[Dict]:
+        """
+        学習記録を取得
+        
+        問題文は最近の活動表示や集計では使わないため、include_question_text=True の
+        場合のみ取得する（既定では問題の行から分野のみを読む）。
+        """
+        sql, params = self._learning_records_query(
+            question_id, start_date, end_date, limit, include_question_text
+        )
         with self.get_connection() as conn:
-            sql = """
-                SELECT lr.*, q.question_text, q.category, ec.name as exam_name
-                FROM learning_records lr
-                JOIN questions q ON lr.question_id = q.id
-                JOIN exam_categories ec ON q.exam_category_id = ec.id
-                WHERE 1=1
-            """
-            params = []
-            
-            if question_id:
-                sql += " AND lr.question_id = ?"
-                params.append(question_id)
-            
-            if start_date:
-                sql += " AND lr.attempt_date >= ?"
-                params.append(start_date)
-            
-            if end_date:
-                sql += " AND lr.attempt_date <= ?"
-                params.append(end_date)
-            
-            sql += " ORDER BY lr.attempt_date DESC"
-            
-            if limit:
-                sql += " LIMIT ?"
-                params.append(limit)
-            
             cursor = conn.execute(sql, params)
             return [dict(row) for row in cursor.fetchall()]
     
-    def _update_statistics(self, conn: sqlite3.Connection, question_id: int,
-                          is_correct: bool, response_time: int = None):
-        """統計情報を更新"""
-        # 問題の情報を取得
-        cursor = conn.execute("""
-            SELECT q.category, q.exam_category_id
-            FROM questions q
-            WHERE q.id = ?
-        """, (question_id,))
+    def iter_learning_records(self, question_id: int = None,
+                              start_date: datetime = None, end_date: datetime = None,
+                              limit: int = None, include_question_text: bool = False) -> Iterator[Dict]:
+        """
+        学習記録を1件ずつ取得（新しい順）
         
-        row = cursor.fetchone()
-        if not row:
-            return
+        fetchall で全件のリストを作らず、LEARNING_RECORDS_FETCH_SIZE 件ずつ読み出した行を順に返す。
+        呼び出し側で絞り込みや集計をしながら読む場合に使用する。
+        読み出しには専用の接続を使うため、途中で中断しても、読み出しの合間に同じスレッドで
+        get_connection を使ってもプールした接続のトランザクションには影響しない。
+        """
+        sql, params = self._learning_records_query(
+            question_id, start_date, end_date, limit, include_question_text
+        )
+        conn = sqlite3.connect(self._db_path_str, timeout=30.0, check_same_thread=False)
+        try:
+            conn.row_factory = sqlite3.Row
+            apply_connection_pragmas(conn)
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(LEARNING_RECORDS_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _learning_records_query(question_id: int = None,
+                                start_date: datetime = None, end_date: datetime = None,
+                                limit: int = None,
+                                include_question_text: bool = False) -> Tuple[str, List]:
+        """学習記録取得のSQLとパラメータを組み立てる"""
+        question_text = ", q.question_text" if include_question_text else ""
+        sql = f"""
+            SELECT lr.*, q.category, ec.name as exam_name{question_text}
+            FROM learning_records lr
+            JOIN questions q ON lr.question_id = q.id
+            JOIN exam_categories ec ON q.exam_category_id = ec.id
+            WHERE 1=1
+        """
+        params = []
         
-        category = row['category']
-        exam_category_id = row['exam_category_id']
+        if question_id:
+            sql += " AND lr.question_id = ?"
+            params.append(question_id)
         
-        # 統計レコードを取得または作成
-        cursor = conn.execute("""
-            SELECT id, total_questions, correct_answers, incorrect_answers, average_response_time
-            FROM study_statistics
-            WHERE exam_category_id = ? AND category = ?
-        """, (exam_category_id, category))
+        if start_date:
+            sql += " AND lr.attempt_date >= ?"
+            params.append(start_date)
         
-        stat_row = cursor.fetchone()
+        if end_date:
+            sql += " AND lr.attempt_date <= ?"
+            params.append(end_date)
         
-        if stat_row:
-            # 既存の統計を更新
-            stats_id = stat_row['id']
-            total_questions = stat_row['total_questions'] + 1
-            correct_answers = stat_row['correct_answers'] + (1 if is_correct else 0)
-            incorrect_answers = stat_row['incorrect_answers'] + (0 if is_correct else 1)
-            
-            # 平均応答時間を計算
-            if response_time and stat_row['average_response_time']:
-                avg_time = (stat_row['average_response_time'] * stat_row['total_questions'] + response_time) / total_questions
-            else:
-                avg_time = response_time or stat_row['average_response_time']
-            
-            conn.execute("""
-                UPDATE study_statistics
-                SET total_questions = ?, correct_answers = ?, incorrect_answers = ?,
-                    average_response_time = ?, last_study_date = CURRENT_TIMESTAMP,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (total_questions, correct_answers, incorrect_answers, avg_time, stats_id))
-        else:
-            # 新しい統計レコードを作成
-            conn.execute("""
-                INSERT INTO study_statistics (
-                    exam_category_id, category, total_questions, correct_answers,
-                    incorrect_answers, average_response_time, last_study_date
-                ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (exam_category_id, category, 1, 1 if is_correct else 0,
-                  0 if is_correct else 1, response_time))
+        sql += " ORDER BY lr.attempt_date DESC"
         
-        conn.commit()
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        return sql, params
+    
+    def _update_statistics(self, conn: sqlite3.Connection, question_id: int,
+                          is_correct: bool, response_time: int = None):
+        """統計情報を更新（コミットは呼び出し元で行う）"""
+        conn.execute(UPSERT_ANSWER_STATISTICS_SQL, (
+            1 if is_correct else 0, 0 if is_correct else 1, response_time, question_id
+        ))
     
     # 学習セッション管理
     def create_study_session(self, session_name: str, exam_type: str,
@@ -631,9 +1093,10 @@ class DatabaseManager:
                 FROM learning_records lr
                 JOIN questions q ON lr.question_id = q.id
                 JOIN exam_categories ec ON q.exam_category_id = ec.id
-                WHERE lr.attempt_date >= datetime('now', '-{} days')
-            """.format(days)
-            params = []
+                WHERE lr.attempt_date >= datetime('now', ?)
+            """
+            # 日数はパラメータで渡し、days の値に関わらず同じSQL文（ステートメントキャッシュ）を使う
+            params = [f"-{int(days)} days"]
             
             if exam_type:
                 sql += " AND ec.code = ?"
@@ -650,6 +1113,8 @@ class DatabaseManager:
             cached_service.invalidate_cache("stats:*")
             cached_service.invalidate_cache("weak:*") 
             cached_service.invalidate_cache("progress:*")
+            cached_service.invalidate_cache("dbinfo:*")
+            cached_service.invalidate_cache("overall:*")
             self.logger.debug("関連キャッシュを無効化しました")
         except Exception as e:
             self.logger.warning(f"キャッシュ無効化に失敗: {e}")
@@ -683,6 +1148,11 @@ class DatabaseManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = self.db_path.parent / f"backup_{timestamp}.db"
         
+        # WALモードでは未反映の変更が -wal ファイルに残っているため、
+        # コピー前にチェックポイントを実行して本体ファイルへ書き戻す
+        with self.get_connection() as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        
         import shutil
         shutil.copy2(self.db_path, backup_path)
         
@@ -694,13 +1164,25 @@ class DatabaseManager:
         if not backup_path.exists():
             raise DataError(f"バックアップファイルが見つかりません: {backup_path}")
         
-        import shutil
-        shutil.copy2(backup_path, self.db_path)
+        # ファイルを置き換えず Online Backup API で現在のDBへ書き戻す
+        # （WALモードのため、他スレッド・他プロセスの接続は -wal/-shm を通じて復元後の内容を参照する）
+        source = sqlite3.connect(f"{backup_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            with self.get_connection() as conn:
+                source.backup(conn)
+        finally:
+            source.close()
+        
+        # 復元に使った呼び出し元スレッドの接続のみ作り直す（他スレッドの接続は使用中の可能性がある）
+        self._close_local_connection()
         
+        self._id_cache.clear()
+        self.clear_all_cache()
         self.logger.info(f"データベースを復元: {backup_path}")
     
+    @cached_service.cached_method(ttl=60, key_prefix="dbinfo")  # 1分キャッシュ
     def get_database_info(self) -> Dict:
-        """データベース情報を取得"""
+        """データベース情報を取得（キャッシュ機能付き）"""
         with self.get_connection() as conn:
             info = {}
             
@@ -750,12 +1232,8 @@ class DatabaseManager:
             # インデックスの再構築
             conn.execute("REINDEX")
             
-            # プラグマ設定でパフォーマンス向上
+            # 統計情報の更新（接続ごとのPRAGMAは get_connection、WALモードは init_database で設定済み）
             conn.execute("PRAGMA optimize")
-            conn.execute("PRAGMA cache_size = 10000")
-            conn.execute("PRAGMA temp_store = MEMORY")
-            conn.execute("PRAGMA journal_mode = WAL")
-            conn.execute("PRAGMA synchronous = NORMAL")
             
             conn.commit()
         
@@ -867,7 +1345,7 @@ class DatabaseManager:
                 # JSONの選択肢を配列に変換
                 if question['choices']:
                     try:
-                        question['choices'] = json.loads(question['choices'])
+                        question['choices'] = _loads_choices(question['choices'])
                     except json.JSONDecodeError:
                         question['choices'] = []
                 questions.append(question)
@@ -886,18 +1364,14 @@ class DatabaseManager:
                 # 回答記録を一括挿入
                 record_ids = []
                 for record in answer_records:
-                    cursor = conn.execute("""
-                        INSERT INTO learning_records (
-                            question_id, user_answer, is_correct, response_time, 
-                            study_mode, notes
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
+                    cursor = conn.execute(INSERT_LEARNING_RECORD_SQL, (
                         record['question_id'],
                         record['user_answer'], 
                         record['is_correct'],
                         record.get('response_time'),
                         record.get('study_mode', 'practice'),
-                        record.get('notes')
+                        record.get('notes'),
+                        record.get('attempt_date')
                     ))
                     record_ids.append(cursor.lastrowid)
                 
@@ -905,6 +1379,9 @@ class DatabaseManager:
                 self._batch_update_statistics(conn, answer_records)
                 
                 conn.execute("COMMIT")
+                
+                # 関連キャッシュを無効化
+                self._invalidate_related_cache()
                 return record_ids
                 
             except Exception as e:
@@ -958,123 +1435,14 @@ class DatabaseManager:
                 stats['count'] += 1
         
         # 統計テーブルを更新
+        rows = []
         for (exam_category_id, category), updates in stats_updates.items():
             avg_response_time = None
             if updates['count'] > 0:
                 avg_response_time = updates['total_response_time'] / updates['count']
-            
-            # 既存レコードを更新または新規作成
-            cursor = conn.execute("""
-                SELECT id, total_questions, correct_answers, incorrect_answers, average_response_time
-                FROM study_statistics
-                WHERE exam_category_id = ? AND category = ?
-            """, (exam_category_id, category))
-            
-            existing = cursor.fetchone()
-            if existing:
-                # 既存レコードを更新
-                new_total = existing['total_questions'] + updates['total_questions']
-                new_correct = existing['correct_answers'] + updates['correct_answers']
-                new_incorrect = existing['incorrect_answers'] + updates['incorrect_answers']
-                
-                # 平均応答時間を再計算
-                if avg_response_time and existing['average_response_time']:
-                    weighted_avg = (
-                        existing['average_response_time'] * existing['total_questions'] +
-                        avg_response_time * updates['total_questions']
-                    ) / new_total
-                else:
-                    weighted_avg = avg_response_time or existing['average_response_time']
-                
-                conn.execute("""
-                    UPDATE study_statistics
-                    SET total_questions = ?, correct_answers = ?, incorrect_answers = ?,
-                        average_response_time = ?, last_study_date = CURRENT_TIMESTAMP,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (new_total, new_correct, new_incorrect, weighted_avg, existing['id']))
-            else:
-                # 新規レコードを作成
-                conn.execute("""
-                    INSERT INTO study_statistics (
-                        exam_category_id, category, total_questions, correct_answers,
-                        incorrect_answers, average_response_time, last_study_date
-                    ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (exam_category_id, category, updates['total_questions'],
-                      updates['correct_answers'], updates['incorrect_answers'],
-                      avg_response_time))
-    
-    # 学習セッション管理
-    def create_study_session(self, session_name: str, exam_type: str, study_mode: str, total_questions: int) -> int:
-        """学習セッションを作成"""
-        with self.get_connection() as conn:
-            cursor = conn.execute("""
-                INSERT INTO study_sessions (
-                    session_name, exam_type, study_mode, total_questions, 
-                    start_time, status
-                ) VALUES (?, ?, ?, ?, ?, 'active')
-            """, (session_name, exam_type, study_mode, total_questions, datetime.now()))
-            
-            session_id = cursor.lastrowid
-            conn.commit()
-            
-            self.logger.info(f"学習セッションを作成: {session_name} (ID: {session_id})")
-            return session_id
-    
-    def end_study_session(self, session_id: int, correct_count: int):
-        """学習セッションを終了"""
-        with self.get_connection() as conn:
-            conn.execute("""
-                UPDATE study_sessions 
-                SET end_time = ?, correct_count = ?, status = 'completed'
-                WHERE id = ?
-            """, (datetime.now(), correct_count, session_id))
-            
-            conn.commit()
-            self.logger.info(f"学習セッションを終了: ID {session_id}")
-    
-    def get_random_questions(self, exam_type: str, category: str = None, count: int = 20) -> List[Dict]:
-        """ランダムに問題を取得"""
-        with self.get_connection() as conn:
-            if category:
-                cursor = conn.execute("""
-                    SELECT id, exam_type, year, question_number, question_text, 
-                           choices, correct_answer, explanation, category, subcategory, difficulty_level
-                    FROM questions 
-                    WHERE exam_type = ? AND category = ?
-                    ORDER BY RANDOM() 
-                    LIMIT ?
-                """, (exam_type, category, count))
-            else:
-                cursor = conn.execute("""
-                    SELECT id, exam_type, year, question_number, question_text, 
-                           choices, correct_answer, explanation, category, subcategory, difficulty_level
-                    FROM questions 
-                    WHERE exam_type = ?
-                    ORDER BY RANDOM() 
-                    LIMIT ?
-                """, (exam_type, count))
-            
-            questions = []
-            for row in cursor.fetchall():
-                question = dict(row)
-                # JSONの選択肢を配列に変換
-                if question['choices']:
-                    try:
-                        question['choices'] = json.loads(question['choices'])
-                    except json.JSONDecodeError:
-                        question['choices'] = []
-                questions.append(question)
-            
-            return questions
-    
-    def record_answer(self, question_id: int, user_answer: int, is_correct: bool, study_mode: str):
-        """回答を記録"""
-        with self.get_connection() as conn:
-            conn.execute("""
-                INSERT INTO learning_records (
-                    question_id, user_answer, is_correct, study_mode, attempt_date
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (question_id, user_answer, is_correct, study_mode, datetime.now()))
-            
-            conn.commit()
\ No newline at end of file
+            rows.append((
+                exam_category_id, category, updates['total_questions'],
+                updates['correct_answers'], updates['incorrect_answers'], avg_response_time
+            ))
+        
+        conn.executemany(UPSERT_STATISTICS_SQL, rows)
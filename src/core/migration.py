@@ -13,6 +13,7 @@ from typing import Dict, List, Optional, Callable
 from contextlib import contextmanager
 
 from .config import config
+from .database import SUPERSEDED_INDEXES, analyze_database
 
 
 class DatabaseMigration:
@@ -291,8 +292,8 @@ class PredefinedMigrations:
             for index_sql in indexes:
                 conn.execute(index_sql)
             
-            # インデックス統計を更新
-            conn.execute("ANALYZE")
+            # インデックス統計を更新（走査行数を制限した近似統計）
+            analyze_database(conn)
         
         def down(conn):
             """パフォーマンス最適化インデックスを削除"""
@@ -309,67 +310,127 @@ class PredefinedMigrations:
                 conn.execute(index_sql)
         
         return up, down
+    
+    @staticmethod
+    def drop_superseded_indexes_migration():
+        """複合インデックスに置き換えた旧インデックス削除のマイグレーション"""
+        def up(conn):
+            """複合インデックスで代替済みの旧インデックスを削除"""
+            for index_name in SUPERSEDED_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+            
+            # インデックス統計を更新（走査行数を制限した近似統計）
+            analyze_database(conn)
+        
+        def down(conn):
+            """旧インデックスを再作成"""
+            indexes = [
+                "CREATE INDEX IF NOT EXISTS idx_questions_category ON questions(category)",
+                "CREATE INDEX IF NOT EXISTS idx_learning_records_question ON learning_records(question_id)",
+                "CREATE INDEX IF NOT EXISTS idx_learning_records_user_category ON learning_records(question_id, attempt_date)",
+                "CREATE INDEX IF NOT EXISTS idx_study_statistics_exam ON study_statistics(exam_category_id)"
+            ]
+            
+            for index_sql in indexes:
+                conn.execute(index_sql)
+        
+        return up, down
 
 
-def run_migration_cli():
-    """CLI形式でマイグレーションを実行"""
-    import sys
+def _cmd_status(migration: DatabaseMigration, args):
+    """status: 現在のマイグレーション状態を表示"""
+    current_version = migration.get_current_version()
+    applied_migrations = migration.get_applied_migrations()
     
-    migration = DatabaseMigration()
+    print(f"現在のバージョン: {current_version}")
+    print(f"適用済みマイグレーション: {len(applied_migrations)}件")
     
-    if len(sys.argv) < 2:
-        print("使用法: python -m src.core.migration <command> [args]")
-        print("コマンド:")
-        print("  status    - 現在のマイグレーション状態を表示")
-        print("  migrate   - 最新バージョンまでマイグレーション")
-        print("  rollback <version> - 指定バージョンを取り消し")
-        print("  create_performance_migration - パフォーマンス最適化マイグレーションを作成")
-        return
+    for m in applied_migrations:
+        print(f"  {m['version']:03d} - {m['name']} ({m['applied_at']})")
+
+
+def _cmd_migrate(migration: DatabaseMigration, args):
+    """migrate: 最新バージョンまでマイグレーション"""
+    print("マイグレーション開始...")
+    backup_path = migration.create_backup()
     
-    command = sys.argv[1]
+    if migration.migrate_to_latest():
+        print("✅ マイグレーション完了")
+    else:
+        print("❌ マイグレーション失敗")
+        print(f"バックアップファイル: {backup_path}")
+
+
+def _cmd_rollback(migration: DatabaseMigration, args):
+    """rollback: 指定バージョンを取り消し"""
+    print(f"マイグレーション取り消し: version {args.version}")
     
-    if command == "status":
-        current_version = migration.get_current_version()
-        applied_migrations = migration.get_applied_migrations()
-        
-        print(f"現在のバージョン: {current_version}")
-        print(f"適用済みマイグレーション: {len(applied_migrations)}件")
-        
-        for m in applied_migrations:
-            print(f"  {m['version']:03d} - {m['name']} ({m['applied_at']})")
+    if migration.rollback_migration(args.version):
+        print("✅ 取り消し完了")
+    else:
+        print("❌ 取り消し失敗")
+
+
+def _cmd_create_performance_migration(migration: DatabaseMigration, args):
+    """create_performance_migration: パフォーマンス最適化マイグレーションを作成"""
+    up_func, down_func = PredefinedMigrations.create_performance_indexes_migration()
+    migration.register_migration(
+        version=1,
+        name="add_performance_indexes",
+        up_func=up_func,
+        down_func=down_func,
+        description="パフォーマンス最適化のためのインデックス追加"
+    )
+    print("✅ パフォーマンス最適化マイグレーションを作成しました")
+
+
+def _cmd_create_superseded_index_migration(migration: DatabaseMigration, args):
+    """create_superseded_index_migration: 旧インデックス削除マイグレーションを作成"""
+    up_func, down_func = PredefinedMigrations.drop_superseded_indexes_migration()
+    migration.register_migration(
+        version=2,
+        name="drop_superseded_indexes",
+        up_func=up_func,
+        down_func=down_func,
+        description="複合インデックスに置き換えた旧インデックスの削除"
+    )
+    print("✅ 旧インデックス削除マイグレーションを作成しました")
+
+
+def run_migration_cli(argv: List[str] = None):
+    """CLI形式でマイグレーションを実行"""
+    import argparse
     
-    elif command == "migrate":
-        print("マイグレーション開始...")
-        backup_path = migration.create_backup()
-        
-        if migration.migrate_to_latest():
-            print("✅ マイグレーション完了")
-        else:
-            print("❌ マイグレーション失敗")
-            print(f"バックアップファイル: {backup_path}")
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.migration",
+        description="データベースマイグレーション管理"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
     
-    elif command == "rollback" and len(sys.argv) > 2:
-        version = int(sys.argv[2])
-        print(f"マイグレーション取り消し: version {version}")
-        
-        if migration.rollback_migration(version):
-            print("✅ 取り消し完了")
-        else:
-            print("❌ 取り消し失敗")
+    subparsers.add_parser(
+        "status", help="現在のマイグレーション状態を表示"
+    ).set_defaults(handler=_cmd_status)
+    subparsers.add_parser(
+        "migrate", help="最新バージョンまでマイグレーション"
+    ).set_defaults(handler=_cmd_migrate)
+    rollback_parser = subparsers.add_parser("rollback", help="指定バージョンを取り消し")
+    rollback_parser.add_argument("version", type=int, help="取り消すバージョン")
+    rollback_parser.set_defaults(handler=_cmd_rollback)
+    subparsers.add_parser(
+        "create_performance_migration", help="パフォーマンス最適化マイグレーションを作成"
+    ).set_defaults(handler=_cmd_create_performance_migration)
+    subparsers.add_parser(
+        "create_superseded_index_migration", help="旧インデックス削除マイグレーションを作成"
+    ).set_defaults(handler=_cmd_create_superseded_index_migration)
     
-    elif command == "create_performance_migration":
-        up_func, down_func = PredefinedMigrations.create_performance_indexes_migration()
-        migration.register_migration(
-            version=1,
-            name="add_performance_indexes",
-            up_func=up_func,
-            down_func=down_func,
-            description="パフォーマンス最適化のためのインデックス追加"
-        )
-        print("✅ パフォーマンス最適化マイグレーションを作成しました")
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return
     
-    else:
-        print(f"不明なコマンド: {command}")
+    # 引数の解析が済んでからDB接続（マイグレーションテーブルの初期化）を行う
+    migration = DatabaseMigration()
+    args.handler(migration, args)
 
 
 if __name__ == "__main__":
@@ -2,8 +2,12 @@
 情報技術者試験学習システム - 学習進捗管理モジュール
 """
 
+import atexit
 import math
 import statistics
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
@@ -11,6 +15,7 @@ from enum import Enum
 
 from .config import config
 from .database import DatabaseManager
+from .cache_manager import cached_service
 from ..utils.utils import Logger, DataUtils, StatisticsUtils
 
 class StudyMode(Enum):
@@ -44,9 +49,24 @@ class SessionSummary:
     weak_areas: List[str]
     achievements: List[str]
 
+# 終了時に未記録の回答を書き込む対象（回収されたトラッカーは自動的に外れる）
+_live_trackers: "weakref.WeakSet[ProgressTracker]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_at_exit():
+    """プロセス終了時に、生存中の全トラッカーのバッファ中の回答を書き込む"""
+    for tracker in list(_live_trackers):
+        try:
+            tracker.flush_answers()
+        except Exception as e:
+            tracker.logger.error(f"終了時の回答記録に失敗: {e}")
+
 class ProgressTracker:
     """学習進捗追跡クラス"""
     
+    # セッション中の回答はこの件数ごとにまとめてDBへ書き込む
+    ANSWER_FLUSH_SIZE = 20
+    
     def __init__(self, db_manager: DatabaseManager = None):
         """
         初期化
@@ -67,6 +87,15 @@ class ProgressTracker:
         self.current_session_id = None
         self.current_session_results = []
         self.session_start_time = None
+        
+        # DB未書き込みの回答（bulk_record_answers 形式）
+        # 複数スレッドから記録されるためロックで保護し、終了時に残りを書き込む
+        self._pending_answers: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        _live_trackers.add(self)
+        
+        # 回答時刻は monotonic_ns で取得し、書き込み時にこの基準で実時刻へ換算する
+        self._clock_base = (time.time(), time.monotonic_ns())
     
     def start_study_session(self, session_name: str, exam_type: str = "FE",
                            study_mode: StudyMode = StudyMode.PRACTICE,
@@ -120,15 +149,21 @@ class ProgressTracker:
         """
         is_correct = user_answer == correct_answer
         
-        # データベースに記録
-        self.db.record_answer(
-            question_id=question_id,
-            user_answer=user_answer,
-            is_correct=is_correct,
-            response_time=response_time,
-            study_mode=self._get_current_study_mode(),
-            notes=notes
-        )
+        # 回答はバッファに溜め、一定件数ごと（またはセッション終了時）にまとめて記録
+        answer = {
+            'question_id': question_id,
+            'user_answer': user_answer,
+            'is_correct': is_correct,
+            'response_time': response_time,
+            'study_mode': self._get_current_study_mode(),
+            'notes': notes,
+            'answered_ns': time.monotonic_ns()
+        }
+        with self._pending_lock:
+            self._pending_answers.append(answer)
+            pending_count = len(self._pending_answers)
+        if not self.current_session_id or pending_count >= self.ANSWER_FLUSH_SIZE:
+            self.flush_answers()
         
         # 問題情報を取得
         question = self.db.get_question(question_id)
@@ -154,6 +189,36 @@ class ProgressTracker:
         
         return result
     
+    def flush_answers(self) -> int:
+        """
+        バッファ中の回答を1トランザクションでデータベースに記録
+        
+        Returns:
+            int: 記録した回答数
+        """
+        with self._pending_lock:
+            pending, self._pending_answers = self._pending_answers, []
+        if not pending:
+            return 0
+        
+        # 回答時刻をまとめてUTC（CURRENT_TIMESTAMP と同じ形式）に変換
+        base_wall, base_mono = self._clock_base
+        for answer in pending:
+            if 'attempt_date' not in answer:
+                epoch = base_wall + (answer['answered_ns'] - base_mono) / 1e9
+                answer['attempt_date'] = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+        
+        try:
+            self.db.bulk_record_answers(pending)
+        except Exception:
+            # 失敗した回答は次回の書き込みで再試行する
+            with self._pending_lock:
+                self._pending_answers = pending + self._pending_answers
+            raise
+        
+        self.logger.info(f"回答を一括記録: {len(pending)} 件")
+        return len(pending)
+    
     def end_study_session(self) -> SessionSummary:
         """
         学習セッションを終了
@@ -166,6 +231,9 @@ class ProgressTracker:
         
         self.logger.info(f"学習セッション終了: {self.current_session_id}")
         
+        # 未記録の回答を書き込む
+        self.flush_answers()
+        
         # セッション統計を計算
         summary = self._calculate_session_summary()
         
@@ -310,10 +378,11 @@ class ProgressTracker:
         
         return max_streak
     
+    @cached_service.cached_method(ttl=60, key_prefix="overall")  # 1分キャッシュ
     def get_overall_progress(self, exam_type: str = None, 
                            days: int = 30) -> Dict[str, Any]:
         """
-        全体的な学習進捗を取得
+        全体的な学習進捗を取得（キャッシュ機能付き。回答記録時に無効化）
         
         Args:
             exam_type: 試験種別
@@ -408,19 +477,14 @@ class ProgressTracker:
         """
         self.logger.info(f"詳細分析: {exam_type}, {category}")
         
-        # 学習記録を取得
-        records = self.db.get_learning_records()
-        
-        if exam_type or category:
-            # フィルタリング
-            filtered_records = []
-            for record in records:
-                if exam_type and record['exam_name'] != exam_type:
-                    continue
-                if category and record['category'] != category:
-                    continue
-                filtered_records.append(record)
-            records = filtered_records
+        # 学習記録を取得（読み出しながら絞り込み、対象の記録のみリストに保持する）
+        records = []
+        for record in self.db.iter_learning_records():
+            if exam_type and record['exam_name'] != exam_type:
+                continue
+            if category and record['category'] != category:
+                continue
+            records.append(record)
         
         if not records:
             return {'error': 'データが見つかりません'}
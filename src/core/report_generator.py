@@ -450,7 +450,7 @@ class ReportGenerator:
         
         # Jinja2環境設定
         self.jinja_env = Environment(
-            loader=FileSystemLoader(config.TEMPLATE_DIR),
+            loader=FileSystemLoader(config.TEMPLATE_DIR_STR),
             autoescape=True
         )
         
@@ -6,10 +6,13 @@ import re
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from collections import Counter
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 # Heavy dependencies with fallbacks
 try:
@@ -24,6 +27,12 @@ try:
 except ImportError:
     HAS_PDFPLUMBER = False
 
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 try:
     from tqdm import tqdm
     HAS_TQDM = True
@@ -33,7 +42,7 @@ except ImportError:
     def tqdm(iterable, *args, **kwargs):
         return iterable
 
-from ..core.config import config
+from ..core.config import build_url, config
 from ..utils.utils import (
     Logger, FileUtils, WebUtils, DataUtils, ValidationUtils,
     SystemError, NetworkError, DataError
@@ -59,8 +68,12 @@ class IPADataFetcher:
             config.LOG_LEVEL
         )
         
-        # セッション設定
+        # セッション設定（並列取得時もTCP/TLS接続を再利用）
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config.FETCH_MAX_WORKERS,
+                              pool_maxsize=config.FETCH_MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -89,7 +102,8 @@ class IPADataFetcher:
                 base_url,
                 delay=config.REQUEST_DELAY,
                 timeout=config.REQUEST_TIMEOUT,
-                max_retries=config.MAX_RETRIES
+                max_retries=config.MAX_RETRIES,
+                session=self.session
             )
             
             if not response:
@@ -108,14 +122,7 @@ class IPADataFetcher:
     
     def _get_base_url(self, exam_type: str) -> str:
         """試験種別に応じたベースURLを取得"""
-        url_mapping = {
-            "FE": config.IPA_FE_URL,
-            "AP": config.IPA_AP_URL,
-            "IP": config.IPA_BASE_URL + "itpassport/",
-            "SG": config.IPA_BASE_URL + "sg/",
-        }
-        
-        return url_mapping.get(exam_type.upper(), config.IPA_BASE_URL)
+        return build_url(exam_type)
     
     def _extract_exam_links(self, html: str, base_url: str) -> List[Dict]:
         """HTMLから過去問題リンクを抽出"""
@@ -179,7 +186,8 @@ class IPADataFetcher:
                 url,
                 delay=config.REQUEST_DELAY,
                 timeout=config.REQUEST_TIMEOUT,
-                max_retries=config.MAX_RETRIES
+                max_retries=config.MAX_RETRIES,
+                session=self.session
             )
             
             if not response:
@@ -350,7 +358,8 @@ class IPADataFetcher:
                 answer_url,
                 delay=config.REQUEST_DELAY,
                 timeout=config.REQUEST_TIMEOUT,
-                max_retries=config.MAX_RETRIES
+                max_retries=config.MAX_RETRIES,
+                session=self.session
             )
             
             if not response:
@@ -371,8 +380,7 @@ class IPADataFetcher:
         """解答ページのURLを取得"""
         # 年度とexam_typeに基づいてURLを構築
         # 実際のIPAサイトの構造に合わせて調整が必要
-        base_url = self._get_base_url(exam_type)
-        return f"{base_url}{year}/answer.html"
+        return build_url(exam_type, f"{year}/answer.html")
     
     def _extract_answers(self, html: str) -> Dict[int, int]:
         """HTMLから解答を抽出"""
@@ -472,6 +480,55 @@ class IPADataFetcher:
             result['error'] = str(e)
         
         return result
+    
+    def process_exam_years(self, years: List[int], exam_type: str = "FE",
+                           max_workers: int = None) -> Iterator[Dict]:
+        """
+        複数年度の試験データを並列に処理
+        
+        ネットワーク待ちを重ねるため年度ごとにスレッドで処理し、完了した順に結果を返す。
+        結果のDB保存は呼び出し側のスレッドで行うこと。
+        
+        Args:
+            years: 年度リスト
+            exam_type: 試験種別
+            max_workers: 最大並列数（省略時は config.FETCH_MAX_WORKERS）
+            
+        Yields:
+            Dict: 年度ごとの処理結果（process_exam_year と同じ形式）
+        """
+        if not years:
+            return
+        
+        max_workers = min(max_workers or config.FETCH_MAX_WORKERS, len(years))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.process_exam_year, year, exam_type): year
+                for year in years
+            }
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def _build_keyword_finder(keywords: List[str]) -> Callable[[str], Set[str]]:
+    """
+    文字列中に含まれるキーワードの集合を返す関数を構築
+    
+    pyahocorasick があれば Aho-Corasick オートマトンで、なければ全キーワードを
+    1つにまとめた正規表現（先読みで重なりも検出）で、本文を1回走査して判定する。
+    """
+    if HAS_AHOCORASICK:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(text)}
+    
+    pattern = re.compile(
+        '(?=(' + '|'.join(map(re.escape, sorted(keywords, key=len, reverse=True))) + '))'
+    )
+    return lambda text: set(pattern.findall(text))
+
 
 class DataProcessor:
     """データ処理・正規化クラス"""
@@ -483,60 +540,52 @@ class DataProcessor:
             config.LOG_LEVEL
         )
     
+    # 分野分類のキーワード辞書
+    CATEGORY_KEYWORDS = {
+        'テクノロジ系': {
+            'アルゴリズム': ['アルゴリズム', '計算量', 'ソート', '探索'],
+            'データ構造': ['配列', 'リスト', 'スタック', 'キュー', 'ツリー'],
+            'プログラミング': ['プログラム', 'コーディング', '変数', '関数'],
+            'コンピュータ構成': ['CPU', 'メモリ', 'キャッシュ', 'アーキテクチャ'],
+            'ネットワーク': ['TCP', 'IP', 'HTTP', 'LAN', 'WAN'],
+            'データベース': ['SQL', 'テーブル', 'リレーション', 'データベース'],
+            'セキュリティ': ['暗号', '認証', '脆弱性', 'セキュリティ']
+        },
+        'マネジメント系': {
+            'プロジェクト管理': ['プロジェクト', 'WBS', 'PERT', 'CPM'],
+            'サービス管理': ['ITIL', 'SLA', 'サービスレベル'],
+            'システム監査': ['監査', 'コントロール', 'リスク']
+        },
+        'ストラテジ系': {
+            'システム戦略': ['システム化', 'EA', 'SOA'],
+            '経営戦略': ['経営', 'マーケティング', 'SCM'],
+            '法務': ['知的財産', '個人情報', 'コンプライアンス']
+        }
+    }
+    
+    # キーワード → 分野の対応と、全キーワードの一括検索関数（クラス読み込み時に1回だけ構築）
+    KEYWORD_CATEGORY = {
+        keyword: main_category
+        for main_category, subcategories in CATEGORY_KEYWORDS.items()
+        for keywords in subcategories.values()
+        for keyword in keywords
+    }
+    _find_keywords = staticmethod(_build_keyword_finder(list(KEYWORD_CATEGORY)))
+    
     def categorize_questions(self, questions: List[Dict]) -> List[Dict]:
         """問題を分野別に分類"""
         self.logger.info("問題の分野分類を開始")
         
-        # 分野分類のキーワード辞書
-        category_keywords = {
-            'テクノロジ系': {
-                'アルゴリズム': ['アルゴリズム', '計算量', 'ソート', '探索'],
-                'データ構造': ['配列', 'リスト', 'スタック', 'キュー', 'ツリー'],
-                'プログラミング': ['プログラム', 'コーディング', '変数', '関数'],
-                'コンピュータ構成': ['CPU', 'メモリ', 'キャッシュ', 'アーキテクチャ'],
-                'ネットワーク': ['TCP', 'IP', 'HTTP', 'LAN', 'WAN'],
-                'データベース': ['SQL', 'テーブル', 'リレーション', 'データベース'],
-                'セキュリティ': ['暗号', '認証', '脆弱性', 'セキュリティ']
-            },
-            'マネジメント系': {
-                'プロジェクト管理': ['プロジェクト', 'WBS', 'PERT', 'CPM'],
-                'サービス管理': ['ITIL', 'SLA', 'サービスレベル'],
-                'システム監査': ['監査', 'コントロール', 'リスク']
-            },
-            'ストラテジ系': {
-                'システム戦略': ['システム化', 'EA', 'SOA'],
-                '経営戦略': ['経営', 'マーケティング', 'SCM'],
-                '法務': ['知的財産', '個人情報', 'コンプライアンス']
-            }
-        }
-        
+        main_categories = list(self.CATEGORY_KEYWORDS)
         for question in questions:
-            question['category'] = self._classify_question(
-                question['question_text'], 
-                category_keywords
-            )
+            found = self._find_keywords(question['question_text'] or '')
+            scores = Counter(self.KEYWORD_CATEGORY[keyword] for keyword in found)
+            # 同点の場合は先に定義された分野を採用
+            question['category'] = max(main_categories, key=scores.__getitem__)
         
         self.logger.info("分野分類完了")
         return questions
     
-    def _classify_question(self, question_text: str, category_keywords: Dict) -> str:
-        """個別の問題を分野分類"""
-        scores = {}
-        
-        for main_category, subcategories in category_keywords.items():
-            scores[main_category] = 0
-            
-            for subcategory, keywords in subcategories.items():
-                for keyword in keywords:
-                    if keyword in question_text:
-                        scores[main_category] += 1
-        
-        # 最も高いスコアの分野を返す
-        if scores:
-            return max(scores.items(), key=lambda x: x[1])[0]
-        else:
-            return "その他"
-    
     def validate_question_data(self, questions: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
         """問題データの検証"""
         self.logger.info("問題データの検証を開始")
@@ -555,4 +604,4 @@ class DataProcessor:
         
         self.logger.info(f"検証完了: 有効{len(valid_questions)}問、無効{len(invalid_questions)}問")
         
-        return valid_questions, invalid_questions
\ No newline at end of file
+        return valid_questions, invalid_questions
@@ -101,8 +101,9 @@ class WebUtils:
     
     @staticmethod
     def safe_request(url: str, delay: float = 1.0, timeout: int = 30, 
-                    max_retries: int = 3) -> Optional[requests.Response]:
-        """安全なHTTPリクエスト"""
+                    max_retries: int = 3,
+                    session: Optional[requests.Session] = None) -> Optional[requests.Response]:
+        """安全なHTTPリクエスト（session 指定時は接続を再利用）"""
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -112,7 +113,7 @@ class WebUtils:
                 if delay > 0:
                     time.sleep(delay)
                 
-                response = requests.get(url, headers=headers, timeout=timeout)
+                response = (session or requests).get(url, headers=headers, timeout=timeout)
                 response.raise_for_status()
                 return response
                 
@@ -261,7 +262,9 @@ class ValidationUtils:
         if "correct_answer" in question_data and "choices" in question_data:
             correct_answer = question_data["correct_answer"]
             choices_count = len(question_data["choices"])
-            if not (1 <= correct_answer <= choices_count):
+            if not isinstance(correct_answer, int) or isinstance(correct_answer, bool):
+                errors.append("正答番号は整数で指定してください")
+            elif not (1 <= correct_answer <= choices_count):
                 errors.append(f"正答番号は1から{choices_count}の範囲で指定してください")
         
         return len(errors) == 0, errors
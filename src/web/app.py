@@ -8,6 +8,7 @@
 """
 
 import os
+import atexit
 import logging
 from pathlib import Path
 from flask import Flask
@@ -31,6 +32,7 @@ from src.core.database import DatabaseManager
 from src.data.data_fetcher import IPADataFetcher, DataProcessor
 from src.core.progress_tracker import ProgressTracker
 from src.core.report_generator import ReportGenerator
+from src.web.utils.config_manager import WebConfigManager, SESSION_FILE_THRESHOLD
 
 # サービス層
 from src.web.services.study_service import StudyService
@@ -84,10 +86,9 @@ class ApplicationFactory:
         app.config['SESSION_TYPE'] = 'filesystem'
         app.config['SESSION_PERMANENT'] = False
         app.config['SESSION_USE_SIGNER'] = True
-        app.config['SESSION_FILE_DIR'] = os.environ.get(
-            'SESSION_FILE_DIR', 
-            str(config.PROJECT_ROOT / 'flask_session')
-        )
+        app.config['SESSION_FILE_DIR'] = WebConfigManager.get_session_dir(config.SESSION_DIR_STR)
+        app.config['SESSION_FILE_THRESHOLD'] = SESSION_FILE_THRESHOLD
+        os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
         
         # セッション設定
         Session(app)
@@ -95,6 +96,9 @@ class ApplicationFactory:
         # 静的ファイルキャッシュ設定
         if os.environ.get('FLASK_ENV') == 'production':
             app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # 1年
+            # テンプレートの更新チェック（stat）を行わず、コンパイル済みテンプレートを保持する
+            app.config['TEMPLATES_AUTO_RELOAD'] = False
+            app.jinja_options = {**app.jinja_options, 'cache_size': 500, 'auto_reload': False}
             
             @app.after_request
             def after_request(response):
@@ -133,7 +137,7 @@ class ApplicationFactory:
             level=logging.INFO,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             handlers=[
-                logging.FileHandler(config.LOG_FILE),
+                logging.FileHandler(config.LOG_FILE_STR),
                 logging.StreamHandler()
             ]
         )
@@ -145,6 +149,7 @@ class ApplicationFactory:
         try:
             # コアコンポーネント
             db = DatabaseManager()
+            atexit.register(db.close_all)  # 終了時にプールした接続を閉じる
             fetcher = IPADataFetcher()
             processor = DataProcessor()
             tracker = ProgressTracker(db)
@@ -5,12 +5,14 @@
 
 import os
 import json
+import atexit
 import logging
+import functools
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, send_from_directory
 from flask_session import Session
 from flask_wtf.csrf import CSRFProtect
 from flask_talisman import Talisman
@@ -28,19 +30,21 @@ sys.path.insert(0, str(project_root))
 
 from src.core.config import config
 from src.core.database import DatabaseManager
-from src.data.data_fetcher import IPADataFetcher, DataProcessor
 from src.core.progress_tracker import ProgressTracker, StudyMode
-from src.core.report_generator import ReportGenerator
 from src.utils.utils import Logger, SystemError, ValidationError
+from src.web.utils.config_manager import WebConfigManager, SESSION_FILE_THRESHOLD
 
 # Flaskアプリケーションの初期化
 app = Flask(__name__, 
             template_folder='templates',
             static_folder='static')
 
-# 静的ファイルキャッシュ設定（本番環境のみ）
+# 静的ファイルキャッシュ・テンプレートキャッシュ設定（本番環境のみ）
 if os.environ.get('FLASK_ENV') == 'production':
     app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000  # 1年
+    # テンプレートの更新チェック（stat）を行わず、コンパイル済みテンプレートを保持する
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_options = {**app.jinja_options, 'cache_size': 500, 'auto_reload': False}
 
 @app.after_request
 def after_request(response):
@@ -54,7 +58,9 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(16))
 app.config['SESSION_TYPE'] = 'filesystem'
 app.config['SESSION_PERMANENT'] = False
 app.config['SESSION_USE_SIGNER'] = True
-app.config['SESSION_FILE_DIR'] = os.environ.get('SESSION_FILE_DIR', str(config.PROJECT_ROOT / 'flask_session'))
+app.config['SESSION_FILE_DIR'] = WebConfigManager.get_session_dir(config.SESSION_DIR_STR)
+app.config['SESSION_FILE_THRESHOLD'] = SESSION_FILE_THRESHOLD
+os.makedirs(app.config['SESSION_FILE_DIR'], exist_ok=True)
 
 # セッション設定
 Session(app)
@@ -83,7 +89,7 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler(config.LOG_FILE),
+        logging.FileHandler(config.LOG_FILE_STR),
         logging.StreamHandler()
     ]
 )
@@ -92,15 +98,33 @@ logger = logging.getLogger(__name__)
 # システムコンポーネント
 try:
     db = DatabaseManager()
-    fetcher = IPADataFetcher()
-    processor = DataProcessor()
+    atexit.register(db.close_all)  # 終了時にプールした接続を閉じる
     tracker = ProgressTracker(db)
-    report_generator = ReportGenerator(db, tracker)
     logger.info("システムコンポーネント初期化完了")
 except Exception as e:
     logger.error(f"システム初期化エラー: {e}")
     raise
 
+# データ取得・レポート生成は一部の画面でしか使わないため、
+# モジュールの読み込みとインスタンス生成を初回利用時まで遅延する
+@functools.cache
+def get_fetcher():
+    """IPAデータ取得クラスを取得（初回呼び出し時に生成）"""
+    from src.data.data_fetcher import IPADataFetcher
+    return IPADataFetcher()
+
+@functools.cache
+def get_processor():
+    """データ処理クラスを取得（初回呼び出し時に生成）"""
+    from src.data.data_fetcher import DataProcessor
+    return DataProcessor()
+
+@functools.cache
+def get_report_generator():
+    """レポート生成クラスを取得（初回呼び出し時に生成）"""
+    from src.core.report_generator import ReportGenerator
+    return ReportGenerator(db, tracker)
+
 # テンプレートフィルター
 @app.template_filter('percentage')
 def percentage_filter(value):
@@ -229,6 +253,7 @@ def start_session():
         session['current_question'] = 0
         session['answers'] = []
         session['start_time'] = datetime.now().isoformat()
+        session['study_mode'] = mode
         
         return redirect(url_for('question'))
         
@@ -283,6 +308,7 @@ def answer():
         # 回答を記録
         correct_answer = current_question.get('correct_answer', 1)
         is_correct = user_answer == correct_answer
+        study_mode = session.get('study_mode', 'practice')
         
         # データベースに記録（問題IDがない場合は0を使用）
         question_id = current_question.get('id', 0)
@@ -291,7 +317,7 @@ def answer():
                 question_id=question_id,
                 user_answer=user_answer,
                 is_correct=is_correct,
-                study_mode='practice'
+                study_mode=study_mode
             )
         
         # セッション情報を更新
@@ -309,7 +335,9 @@ def answer():
             'is_correct': is_correct,
             'correct_answer': correct_answer,
             'explanation': current_question.get('explanation', ''),
-            'is_last_question': current_idx + 1 >= len(questions)
+            'is_last_question': current_idx + 1 >= len(questions),
+            # 模擬試験モードでは解答ごとの結果表示で止めず、次の問題へ進む
+            'skip_review': study_mode == 'mock_exam'
         })
         
     except Exception as e:
@@ -352,6 +380,7 @@ def session_result():
         session.pop('current_question', None)
         session.pop('answers', None)
         session.pop('start_time', None)
+        session.pop('study_mode', None)
         
         return render_template('session_result.html',
                              summary=summary)
@@ -435,7 +464,7 @@ def generate_report():
             return redirect(url_for('reports'))
         
         # レポート生成
-        report_path = report_generator.generate_comprehensive_report(
+        report_path = get_report_generator().generate_comprehensive_report(
             exam_type=exam_type,
             days=days
         )
@@ -457,7 +486,11 @@ def view_report(filename):
             flash('レポートファイルが見つかりません。', 'error')
             return redirect(url_for('reports'))
         
-        return send_file(report_path)
+        # safe_join でレポートディレクトリ外へのアクセスを防ぎ、条件付きリクエストにも対応
+        return send_from_directory(
+            config.REPORT_OUTPUT_DIR, filename,
+            max_age=config.REPORT_CACHE_MAX_AGE
+        )
         
     except Exception as e:
         logger.error(f"レポート表示エラー: {e}")
@@ -479,9 +512,9 @@ def settings():
         
         # 設定情報
         settings_info = {
-            'project_root': str(config.PROJECT_ROOT),
-            'database_path': str(config.DATABASE_PATH),
-            'report_output_dir': str(config.REPORT_OUTPUT_DIR),
+            'project_root': config.PROJECT_ROOT_STR,
+            'database_path': config.DATABASE_PATH_STR,
+            'report_output_dir': config.REPORT_OUTPUT_DIR_STR,
             'log_level': config.LOG_LEVEL
         }
         
@@ -516,7 +549,7 @@ def fetch_data():
         
         # データ取得処理（非同期で実行すべきだが、簡単のため同期実行）
         if year:
-            result = fetcher.process_exam_year(year, exam_type)
+            result = get_fetcher().process_exam_year(year, exam_type)
             if result['status'] == 'success':
                 _save_questions_to_db(result['questions'], exam_type, year)
                 flash(f'{year}年度のデータを取得しました。', 'success')
@@ -525,17 +558,20 @@ def fetch_data():
         else:
             # 全年度取得（時間がかかるため、実際の運用では非同期処理が必要）
             flash('全年度のデータ取得を開始しました。時間がかかる場合があります。', 'info')
-            exam_list = fetcher.fetch_exam_list(exam_type)
+            exam_list = get_fetcher().fetch_exam_list(exam_type)
             success_count = 0
             
-            for exam in exam_list[:3]:  # 最新3年度のみ
+            # 最新3年度のみ。取得は並列に行い、DB保存はこのスレッドで順に実行
+            # （インデックスは他のリクエストが使用中のため削除しない。大量投入時の削除・再作成は
+            # scripts/add_performance_indexes.py --drop によるオフライン作業で行う）
+            years = [exam['year'] for exam in exam_list[:3]]
+            for result in get_fetcher().process_exam_years(years, exam_type):
                 try:
-                    result = fetcher.process_exam_year(exam['year'], exam_type)
                     if result['status'] == 'success':
-                        _save_questions_to_db(result['questions'], exam_type, exam['year'])
+                        _save_questions_to_db(result['questions'], exam_type, result['year'])
                         success_count += 1
                 except Exception as e:
-                    logger.error(f"{exam['year']}年度処理エラー: {e}")
+                    logger.error(f"{result['year']}年度処理エラー: {e}")
                     continue
             
             flash(f'{success_count}年度のデータを取得しました。', 'success')
@@ -614,22 +650,8 @@ def _get_weak_area_questions(exam_type: str, count: int) -> List[Dict]:
     if not weak_areas:
         return db.get_random_questions(exam_type, None, count)
     
-    questions = []
-    questions_per_area = count // len(weak_areas)
-    
-    for area in weak_areas:
-        area_questions = db.get_random_questions(
-            exam_type, area['category'], questions_per_area
-        )
-        questions.extend(area_questions)
-    
-    # 不足分を補う
-    remaining = count - len(questions)
-    if remaining > 0:
-        additional = db.get_random_questions(exam_type, None, remaining)
-        questions.extend(additional)
-    
-    return questions[:count]
+    categories = [area['category'] for area in weak_areas]
+    return db.get_weak_area_questions(exam_type, categories, count)
 
 def _generate_demo_questions(exam_type: str, count: int) -> List[Dict]:
     """デモ用問題を生成"""
@@ -693,22 +715,16 @@ def _save_questions_to_db(questions: List[Dict], exam_type: str, year: int):
     """問題をデータベースに保存"""
     try:
         # 分野分類を実行
+        processor = get_processor()
         questions = processor.categorize_questions(questions)
         
         # データ検証
         valid_questions, invalid_questions = processor.validate_question_data(questions)
         
-        # データベースに保存
-        for question in valid_questions:
-            question['exam_type'] = exam_type
-            question['year'] = year
-            try:
-                db.insert_question(question)
-            except Exception as e:
-                logger.error(f"問題保存エラー: {e}")
-                continue
-        
-        logger.info(f"データベース保存完了: {len(valid_questions)} 問題")
+        # データベースに一括保存（重複する問題はスキップ）
+        inserted = db.insert_questions_bulk(valid_questions, exam_type, year)
+        
+        logger.info(f"データベース保存完了: {inserted}/{len(valid_questions)} 問題")
         
     except Exception as e:
         logger.error(f"データベース保存エラー: {e}")
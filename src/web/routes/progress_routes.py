@@ -6,7 +6,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_from_directory
 
 from ..services.progress_service import ProgressService
 from ...core.config import config
@@ -96,7 +96,11 @@ def view_report(filename):
             flash('レポートファイルが見つかりません。', 'error')
             return redirect(url_for('progress.reports'))
         
-        return send_file(report_path)
+        # safe_join でレポートディレクトリ外へのアクセスを防ぎ、条件付きリクエストにも対応
+        return send_from_directory(
+            config.REPORT_OUTPUT_DIR, filename,
+            max_age=config.REPORT_CACHE_MAX_AGE
+        )
         
     except Exception as e:
         logger.error(f"レポート表示エラー: {e}")
@@ -58,6 +58,7 @@ class SessionService:
         session['current_question'] = 0
         session['answers'] = []
         session['start_time'] = datetime.now().isoformat()
+        session['study_mode'] = mode
         
         logger.info(f"学習セッション開始: {session_name}")
         return session_id
@@ -71,6 +72,7 @@ class SessionService:
         # 回答を記録
         correct_answer = current_question.get('correct_answer', 1)
         is_correct = user_answer == correct_answer
+        study_mode = session.get('study_mode', 'practice')
         
         # データベースに記録（問題IDがない場合は0を使用）
         question_id = current_question.get('id', 0)
@@ -79,7 +81,7 @@ class SessionService:
                 question_id=question_id,
                 user_answer=user_answer,
                 is_correct=is_correct,
-                study_mode='practice'
+                study_mode=study_mode
             )
         
         # セッション情報を更新
@@ -97,7 +99,9 @@ class SessionService:
             'is_correct': is_correct,
             'correct_answer': correct_answer,
             'explanation': current_question.get('explanation', ''),
-            'is_last_question': current_idx + 1 >= len(questions)
+            'is_last_question': current_idx + 1 >= len(questions),
+            # 模擬試験モードでは解答ごとの結果表示で止めず、次の問題へ進む
+            'skip_review': study_mode == 'mock_exam'
         }
     
     def calculate_session_result(self) -> Dict:
@@ -132,6 +136,7 @@ class SessionService:
         session.pop('current_question', None)
         session.pop('answers', None)
         session.pop('start_time', None)
+        session.pop('study_mode', None)
     
     def _calculate_session_duration(self) -> int:
         """セッション時間を計算"""
@@ -150,22 +155,8 @@ class SessionService:
         if not weak_areas:
             return self.db.get_random_questions(exam_type, None, count)
         
-        questions = []
-        questions_per_area = count // len(weak_areas)
-        
-        for area in weak_areas:
-            area_questions = self.db.get_random_questions(
-                exam_type, area['category'], questions_per_area
-            )
-            questions.extend(area_questions)
-        
-        # 不足分を補う
-        remaining = count - len(questions)
-        if remaining > 0:
-            additional = self.db.get_random_questions(exam_type, None, remaining)
-            questions.extend(additional)
-        
-        return questions[:count]
+        categories = [area['category'] for area in weak_areas]
+        return self.db.get_weak_area_questions(exam_type, categories, count)
     
     def _generate_demo_questions(self, exam_type: str, count: int) -> List[Dict]:
         """デモ用問題を生成"""
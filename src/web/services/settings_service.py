@@ -33,9 +33,9 @@ class SettingsService:
             
             # 設定情報
             settings_info = {
-                'project_root': str(config.PROJECT_ROOT),
-                'database_path': str(config.DATABASE_PATH),
-                'report_output_dir': str(config.REPORT_OUTPUT_DIR),
+                'project_root': config.PROJECT_ROOT_STR,
+                'database_path': config.DATABASE_PATH_STR,
+                'report_output_dir': config.REPORT_OUTPUT_DIR_STR,
                 'log_level': config.LOG_LEVEL
             }
             
@@ -75,14 +75,16 @@ class SettingsService:
                 exam_list = self.fetcher.fetch_exam_list(exam_type)
                 success_count = 0
                 
-                for exam in exam_list[:3]:
+                # 取得は並列に行い、DB保存はこのスレッドで順に実行
+                # （インデックスは他のリクエストが使用中のため、リクエスト内では削除・再作成しない）
+                years = [exam['year'] for exam in exam_list[:3]]
+                for result in self.fetcher.process_exam_years(years, exam_type):
                     try:
-                        result = self.fetcher.process_exam_year(exam['year'], exam_type)
                         if result['status'] == 'success':
-                            self._save_questions_to_db(result['questions'], exam_type, exam['year'])
+                            self._save_questions_to_db(result['questions'], exam_type, result['year'])
                             success_count += 1
                     except Exception as e:
-                        logger.error(f"{exam['year']}年度処理エラー: {e}")
+                        logger.error(f"{result['year']}年度処理エラー: {e}")
                         continue
                 
                 return {
@@ -110,17 +112,10 @@ class SettingsService:
             # データ検証
             valid_questions, invalid_questions = self.processor.validate_question_data(questions)
             
-            # データベースに保存
-            for question in valid_questions:
-                question['exam_type'] = exam_type
-                question['year'] = year
-                try:
-                    self.db.insert_question(question)
-                except Exception as e:
-                    logger.error(f"問題保存エラー: {e}")
-                    continue
+            # データベースに一括保存（重複する問題はスキップ）
+            inserted = self.db.insert_questions_bulk(valid_questions, exam_type, year)
             
-            logger.info(f"データベース保存完了: {len(valid_questions)} 問題")
+            logger.info(f"データベース保存完了: {inserted}/{len(valid_questions)} 問題")
             
         except Exception as e:
             logger.error(f"データベース保存エラー: {e}")
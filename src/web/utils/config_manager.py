@@ -5,6 +5,12 @@ Web設定管理ユーティリティ
 import os
 from typing import Dict, Any
 
+# RAM上のファイルシステム（tmpfs）
+SHM_DIR = '/dev/shm'
+
+# セッションファイル数の上限（超えると古いものから削除）
+SESSION_FILE_THRESHOLD = 1000
+
 class WebConfigManager:
     """Web設定管理クラス"""
     
@@ -17,6 +23,7 @@ class WebConfigManager:
             'SESSION_PERMANENT': False,
             'SESSION_USE_SIGNER': True,
             'SESSION_FILE_DIR': WebConfigManager._get_session_dir(),
+            'SESSION_FILE_THRESHOLD': SESSION_FILE_THRESHOLD,
             'SEND_FILE_MAX_AGE_DEFAULT': WebConfigManager._get_cache_max_age(),
         }
     
@@ -74,11 +81,25 @@ class WebConfigManager:
             print(f"WARNING: Using generated SECRET_KEY: {secret_key}")
         return secret_key
     
+    @staticmethod
+    def get_session_dir(default_dir: str = './flask_session') -> str:
+        """セッションディレクトリを取得
+        
+        本番環境では環境変数で指定がなければ tmpfs（/dev/shm）を使用し、
+        セッションの読み書きをメモリ上で行う。/dev/shm がマウントされていない場合は default_dir を使用する。
+        """
+        session_dir = os.environ.get('SESSION_FILE_DIR')
+        if session_dir:
+            return session_dir
+        if WebConfigManager.is_production() and os.path.ismount(SHM_DIR):
+            return os.path.join(SHM_DIR, 'flask_session')
+        return default_dir
+    
     @staticmethod
     def _get_session_dir() -> str:
         """セッションディレクトリを取得"""
         default_dir = '/tmp/flask_session' if WebConfigManager.is_production() else './flask_session'
-        return os.environ.get('SESSION_FILE_DIR', default_dir)
+        return WebConfigManager.get_session_dir(default_dir)
     
     @staticmethod
     def _get_cache_max_age() -> int:
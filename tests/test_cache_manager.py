@@ -0,0 +1,139 @@
+"""
+CacheManager のテスト
+"""
+import pickle
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core import cache_manager as cache_module
+from src.core.cache_manager import CacheManager, CachedDataService
+
+
+class TestCacheManager:
+    """CacheManager のテスト（メモリキャッシュ）"""
+
+    @pytest.fixture
+    def cache(self):
+        """Redisを使わないキャッシュマネージャー"""
+        return CacheManager()
+
+    def test_set_and_get(self, cache):
+        """保存した値を取得できることのテスト"""
+        assert cache.set('key', {'value': 1}, ttl=60)
+
+        assert cache.get('key') == {'value': 1}
+        assert cache.exists('key')
+        assert cache.get('missing', 'default') == 'default'
+
+    def test_expired_entry(self, cache, monkeypatch):
+        """TTLを過ぎた値は取得できないことのテスト"""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module, 'monotonic', lambda: now[0])
+        cache.set('key', 'value', ttl=10)
+
+        now[0] += 9
+        assert cache.get('key') == 'value'
+
+        now[0] += 1
+        assert cache.get('key') is None
+        assert not cache.exists('key')
+
+    def test_lru_eviction(self, cache, monkeypatch):
+        """上限を超えると最も長く使われていないキーから削除されることのテスト"""
+        monkeypatch.setattr(CacheManager, 'MEMORY_CACHE_MAX_SIZE', 3)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key, ttl=60)
+        cache.get('a')
+
+        cache.set('d', 'd', ttl=60)
+
+        assert not cache.exists('b')
+        assert [cache.get(key) for key in ('a', 'c', 'd')] == ['a', 'c', 'd']
+
+    def test_clear_with_glob_pattern(self, cache):
+        """グロブ形式のパターンに一致するキーのみ削除されることのテスト"""
+        cache.mset({'dbinfo:f:1': 1, 'dbinfo:f:2': 2, 'stats:f:1': 3}, ttl=60)
+
+        assert cache.clear('dbinfo:*') == 2
+
+        assert list(cache._memory_cache) == ['stats:f:1']
+
+    def test_concurrent_access(self, cache, monkeypatch):
+        """複数スレッドからの同時操作でメモリキャッシュが壊れないことのテスト"""
+        monkeypatch.setattr(CacheManager, 'MEMORY_CACHE_MAX_SIZE', 50)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(2000):
+                    key = f'k{(n * 7 + i) % 80}'
+                    cache.set(key, i, ttl=60)
+                    cache.get(key)
+                    if i % 100 == 0:
+                        cache.clear('k1*')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert len(cache._memory_cache) <= 50
+
+    def test_mset_and_mget(self, cache):
+        """複数キーの一括保存・取得のテスト"""
+        assert cache.mset({'a': 1, 'b': [2]}, ttl=60)
+
+        assert cache.mget(['a', 'missing', 'b'], default=0) == [1, 0, [2]]
+
+    def test_redis_values_promoted_to_memory(self, cache):
+        """Redis の値はパイプライン1往復で取得し、メモリキャッシュに昇格することのテスト"""
+        cache.redis_client = MagicMock()
+        pipe = cache.redis_client.pipeline.return_value
+        pipe.execute.side_effect = [
+            [True, True],
+            [CacheManager._serialize(1), 300, None, -2],
+        ]
+
+        assert cache.mset({'a': 1, 'b': 2}, ttl=60)
+        assert not cache._memory_cache
+        assert cache.mget(['a', 'b']) == [1, None]
+
+        cache.redis_client.pipeline.assert_called_with(transaction=False)
+        assert pipe.setex.call_count == 2
+        assert pipe.execute.call_count == 2
+        assert list(cache._memory_cache) == ['a']
+
+        assert cache.get('a') == 1
+        assert pipe.execute.call_count == 2
+
+    def test_serialize_round_trip(self):
+        """シリアライズ形式の判定と復元のテスト"""
+        value = {'total': 10, 'rows': [{'category': 'テクノロジ系', 'rate': 0.5}]}
+        dated = {'at': datetime(2024, 1, 1, 9, 0)}
+
+        assert CacheManager._deserialize(CacheManager._serialize(value)) == value
+        assert CacheManager._serialize(dated)[:1] == cache_module.SERIALIZED_PICKLE
+        assert CacheManager._deserialize(CacheManager._serialize(dated)) == dated
+        assert CacheManager._deserialize(pickle.dumps(value)) == value
+
+
+class TestCachedDataService:
+    """CachedDataService のテスト"""
+
+    def test_generate_cache_key(self):
+        """引数ごとに一定のキャッシュキーが生成されることのテスト"""
+        service = CachedDataService(CacheManager())
+
+        key = service._generate_cache_key('get_statistics', (object(), 'FE'), {'days': 30}, 'stats')
+
+        assert key.startswith('stats:get_statistics:')
+        assert len(key.rsplit(':', 1)[1]) == 12
+        assert key == service._generate_cache_key('get_statistics', (None, 'FE'), {'days': 30}, 'stats')
+        assert key != service._generate_cache_key('get_statistics', (None, 'AP'), {'days': 30}, 'stats')
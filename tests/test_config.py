@@ -0,0 +1,163 @@
+"""
+設定管理モジュールのテスト
+"""
+import sys
+
+import pytest
+
+from src.core import config as config_module
+from src.core.config import (
+    Config, DevelopmentConfig, ExamInfo, ProductionConfig, build_url, get_config, get_exam_info,
+    get_subject_info, reload_env
+)
+
+
+class TestGetConfig:
+    """get_config のテスト"""
+
+    @pytest.fixture(autouse=True)
+    def clear_config_cache(self):
+        """テスト前後で設定のキャッシュと実行環境を元に戻す"""
+        env = config_module._ENV
+        get_config.cache_clear()
+        yield
+        config_module._ENV = env
+        get_config.cache_clear()
+
+    def test_returns_same_instance(self, monkeypatch):
+        """同じ設定インスタンスを返すことのテスト"""
+        monkeypatch.setenv('ENVIRONMENT', 'development')
+        reload_env()
+
+        assert get_config() is get_config()
+        assert isinstance(get_config(), DevelopmentConfig)
+
+    @pytest.mark.parametrize('env, expected', [
+        ('production', ProductionConfig),
+        ('PRODUCTION', ProductionConfig),
+        ('staging', DevelopmentConfig),
+        ('unknown', DevelopmentConfig),
+    ])
+    def test_selects_config_by_environment(self, monkeypatch, env, expected):
+        """ENVIRONMENT に応じた設定クラスを選択することのテスト"""
+        monkeypatch.setenv('ENVIRONMENT', env)
+        reload_env()
+
+        assert type(get_config()) is expected
+
+    def test_from_env_creates_new_instance(self, monkeypatch):
+        """from_env は呼び出しごとに新しいインスタンスを生成することのテスト"""
+        monkeypatch.setenv('ENVIRONMENT', 'production')
+        reload_env()
+        first = Config.from_env()
+
+        assert isinstance(first, ProductionConfig)
+        assert Config.from_env() is not first
+
+    def test_instance_override_takes_precedence(self, monkeypatch):
+        """インスタンス属性による上書きがクラス属性より優先されることのテスト"""
+        settings = get_config()
+        monkeypatch.setattr(settings, 'QUESTION_LIMIT', 5)
+
+        assert settings.QUESTION_LIMIT == 5
+        assert type(settings).QUESTION_LIMIT == Config.QUESTION_LIMIT
+
+    def test_reload_env_rereads_environment(self, monkeypatch):
+        """reload_env 後は環境変数を再評価することのテスト"""
+        monkeypatch.setenv('ENVIRONMENT', 'development')
+        reload_env()
+        assert isinstance(get_config(), DevelopmentConfig)
+
+        monkeypatch.setenv('ENVIRONMENT', 'production')
+        get_config.cache_clear()
+        assert isinstance(get_config(), DevelopmentConfig)
+
+        reload_env()
+        assert isinstance(get_config(), ProductionConfig)
+
+
+class TestCategories:
+    """試験区分・分野定義のテスト"""
+
+    def test_categories_loaded_from_file(self):
+        """categories.json の定義を参照できることのテスト"""
+        assert set(Config.EXAM_CATEGORIES) == {'FE', 'AP', 'IP', 'SG'}
+        assert Config.get_exam_info('FE').name == '基本情報技術者試験'
+        assert Config.get_subject_info('technology')['weight'] == 0.5
+        assert Config.get_exam_info('XX') is None
+        assert get_exam_info('AP') is Config.EXAM_CATEGORIES['AP']
+        assert get_subject_info('strategy')['name'] == 'ストラテジ系'
+
+    def test_exam_info_record(self):
+        """試験区分が ExamInfo のレコードであることのテスト"""
+        info = get_exam_info('SG')
+
+        assert isinstance(info, ExamInfo)
+        assert info.code == 'SG'
+        assert info._asdict().keys() == {'name', 'code', 'description'}
+
+    def test_categories_are_read_only(self):
+        """定義が読み取り専用であることのテスト"""
+        with pytest.raises(TypeError):
+            Config.EXAM_CATEGORIES['XX'] = {}
+        with pytest.raises(TypeError):
+            Config.EXAM_CATEGORIES['FE']['name'] = '変更'
+        with pytest.raises(TypeError):
+            Config.DIFFICULTY_LEVELS[5] = '最難関'
+
+    def test_category_strings_interned(self):
+        """分野の文字列がインターンされ、サブ分野がタプルであることのテスト"""
+        subcategories = Config.get_subject_info('technology')['subcategories']
+
+        assert isinstance(subcategories, tuple)
+        assert all(s is sys.intern(''.join(s)) for s in subcategories)
+        assert Config.get_exam_info('FE').name is sys.intern(''.join('基本情報技術者試験'))
+
+
+class TestCreateDirectories:
+    """create_directories のテスト"""
+
+    @pytest.fixture
+    def project_root(self, tmp_path, monkeypatch):
+        """一時ディレクトリをプロジェクトルートとする設定"""
+        monkeypatch.setattr(Config, 'PROJECT_ROOT', tmp_path)
+        monkeypatch.setattr(Config, 'DOWNLOAD_DIR', tmp_path / 'data' / 'downloads')
+        monkeypatch.setattr(Config, 'REPORT_OUTPUT_DIR', tmp_path / 'reports')
+        monkeypatch.setattr(Config, 'TEMPLATE_DIR', tmp_path / 'templates')
+        monkeypatch.setattr(Config, 'STATIC_DIR', tmp_path / 'static')
+        return tmp_path
+
+    def test_creates_missing_directories(self, project_root):
+        """存在しないディレクトリのみ作成されることのテスト"""
+        tmp_path = project_root
+        (tmp_path / 'reports').mkdir()
+        (tmp_path / 'reports' / 'keep.html').write_text('report')
+
+        Config.create_directories()
+
+        for name in ('data', 'data/downloads', 'reports', 'templates', 'static', 'logs'):
+            assert (tmp_path / name).is_dir()
+        assert (tmp_path / 'reports' / 'keep.html').exists()
+
+    def test_repeated_call_skips_known_directories(self, project_root, monkeypatch):
+        """作成済みのディレクトリは再呼び出し時に確認しないことのテスト"""
+        Config.create_directories()
+
+        def fail_scandir(path):
+            raise AssertionError(f'unexpected scandir: {path}')
+
+        monkeypatch.setattr(config_module.os, 'scandir', fail_scandir)
+        Config.create_directories()
+
+        assert (project_root / 'logs').is_dir()
+
+
+class TestBuildUrl:
+    """build_url のテスト"""
+
+    def test_build_url(self):
+        """試験区分ごとのURL結合のテスト"""
+        assert build_url('fe') == Config.IPA_FE_URL
+        assert build_url('AP', '2024/answer.html') == Config.IPA_AP_URL + '2024/answer.html'
+        assert build_url('XX') == Config.IPA_BASE_URL
+        assert build_url('SG', 'a.pdf') is build_url('SG', 'a.pdf')
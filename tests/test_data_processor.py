@@ -0,0 +1,70 @@
+"""
+DataProcessor のテスト
+"""
+import pytest
+
+from src.data.data_fetcher import DataProcessor
+
+
+def classify_question(question_text, category_keywords):
+    """分野分類の参照実装（キーワードを1つずつ検索し、一致数が最も多い分野を返す）"""
+    scores = {}
+
+    for main_category, subcategories in category_keywords.items():
+        scores[main_category] = 0
+
+        for keywords in subcategories.values():
+            for keyword in keywords:
+                if keyword in question_text:
+                    scores[main_category] += 1
+
+    return max(scores.items(), key=lambda x: x[1])[0]
+
+
+class TestDataProcessor:
+    """DataProcessor のテスト"""
+
+    @pytest.fixture
+    def processor(self):
+        """テスト用DataProcessor"""
+        return DataProcessor()
+
+    def test_categorize_questions(self, processor):
+        """分野分類が問題ごとの判定と一致することのテスト"""
+        texts = [
+            'TCP/IPのプロトコルとして正しいものはどれか。',
+            'プロジェクトのWBSを作成する目的はどれか。',
+            '経営戦略におけるSCMの説明はどれか。',
+            'SQLでテーブルを結合し、プロジェクトの監査結果を集計する。',
+            'キーワードを含まない問題文'
+        ]
+        questions = [{'question_text': text} for text in texts]
+
+        result = processor.categorize_questions(questions)
+
+        expected = [
+            classify_question(text, processor.CATEGORY_KEYWORDS)
+            for text in texts
+        ]
+        assert [q['category'] for q in result] == expected
+        assert expected[:3] == ['テクノロジ系', 'マネジメント系', 'ストラテジ系']
+
+    def test_validate_question_data(self, processor):
+        """問題データ検証のテスト"""
+        valid = {'question_text': '問題', 'choices': ['A', 'B', 'C', 'D'], 'correct_answer': 4}
+        no_text = {'question_text': '', 'choices': ['A', 'B'], 'correct_answer': 1}
+        few_choices = {'question_text': '問題', 'choices': ['A'], 'correct_answer': 1}
+        out_of_range = {'question_text': '問題', 'choices': ['A', 'B'], 'correct_answer': 3}
+        string_answer = {'question_text': '問題', 'choices': ['A', 'B'], 'correct_answer': '2'}
+        bool_answer = {'question_text': '問題', 'choices': ['A', 'B'], 'correct_answer': True}
+        missing_answer = {'question_text': '問題', 'choices': ['A', 'B'], 'correct_answer': None}
+
+        valid_questions, invalid_questions = processor.validate_question_data(
+            [valid, no_text, few_choices, out_of_range, string_answer, bool_answer, missing_answer]
+        )
+
+        assert valid_questions == [valid]
+        assert invalid_questions == [
+            no_text, few_choices, out_of_range, string_answer, bool_answer, missing_answer
+        ]
+        assert all(q['validation_errors'] for q in invalid_questions)
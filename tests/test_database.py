@@ -0,0 +1,446 @@
+"""
+DatabaseManager のテスト
+"""
+import gc
+import json
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from src.core import database as database_module
+from src.core.database import DatabaseManager
+
+
+class TestDatabaseManager:
+    """DatabaseManager のテスト"""
+
+    @pytest.fixture
+    def db_manager(self, tmp_path, monkeypatch):
+        """一時ファイルを使用するDBマネージャー"""
+        monkeypatch.setenv('DATABASE_PATH', str(tmp_path / 'test.db'))
+        return DatabaseManager()
+
+    @pytest.fixture
+    def questions(self):
+        """テスト用問題データ"""
+        return [
+            {
+                'question_number': i,
+                'question_text': f'テスト問題{i}',
+                'choices': ['選択肢1', '選択肢2', '選択肢3', '選択肢4'],
+                'correct_answer': 1,
+                'explanation': f'テスト解説{i}',
+                'category': 'テクノロジ系'
+            }
+            for i in range(1, 11)
+        ]
+
+    def test_insert_questions_bulk(self, db_manager, questions):
+        """問題の一括追加テスト"""
+        inserted = db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        assert inserted == 10
+        saved = db_manager.get_questions(exam_type='FE', year=2024)
+        assert len(saved) == 10
+        assert saved[0]['choices'] == ['選択肢1', '選択肢2', '選択肢3', '選択肢4']
+
+    def test_insert_questions_bulk_skips_duplicates(self, db_manager, questions):
+        """重複する問題は一括追加でスキップされることのテスト"""
+        db_manager.insert_questions_bulk(questions[:5], 'FE', 2024)
+
+        inserted = db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        assert inserted == 5
+        assert len(db_manager.get_questions(exam_type='FE', year=2024)) == 10
+
+    def test_insert_questions_bulk_empty(self, db_manager):
+        """空リストの一括追加テスト"""
+        assert db_manager.insert_questions_bulk([], 'FE', 2024) == 0
+
+    def test_drop_and_create_performance_indexes(self, db_manager):
+        """パフォーマンスインデックスの削除・再作成テスト"""
+        def index_names():
+            with db_manager.get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'questions'"
+                ).fetchall()
+            return {row['name'] for row in rows}
+
+        db_manager.create_performance_indexes('questions')
+        assert {'idx_questions_category_difficulty', 'idx_questions_year_exam'} <= index_names()
+
+        db_manager.drop_performance_indexes('questions')
+        assert not {'idx_questions_category_difficulty', 'idx_questions_year_exam'} & index_names()
+
+    def test_statistics_upsert_with_performance_indexes(self, db_manager, questions):
+        """パフォーマンスインデックス作成・削除後も統計の UPSERT が動作することのテスト"""
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+
+        db_manager.create_performance_indexes()
+        db_manager.record_answer(question_id, 1, True)
+        db_manager.drop_performance_indexes()
+        db_manager.record_answer(question_id, 1, True)
+
+        with db_manager.get_connection() as conn:
+            totals = conn.execute("SELECT total_questions FROM study_statistics").fetchall()
+        assert [row[0] for row in totals] == [2]
+
+    def test_drop_superseded_indexes_migration(self, db_manager):
+        """旧インデックス削除マイグレーションの適用・取り消しテスト"""
+        from src.core.migration import PredefinedMigrations
+
+        def index_names():
+            with db_manager.get_connection() as conn:
+                rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+            return {row['name'] for row in rows}
+
+        up, down = PredefinedMigrations.drop_superseded_indexes_migration()
+        with db_manager.get_connection() as conn:
+            down(conn)
+        assert set(database_module.SUPERSEDED_INDEXES) <= index_names()
+
+        with db_manager.get_connection() as conn:
+            up(conn)
+        assert not set(database_module.SUPERSEDED_INDEXES) & index_names()
+
+    def test_query_plans_use_composite_indexes(self, db_manager):
+        """問題・学習記録の取得が複合インデックスを使用し、一時ソートを行わないことのテスト"""
+        def plan(sql, params):
+            with db_manager.get_connection() as conn:
+                return ' '.join(row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+        questions_plan = plan(
+            "SELECT * FROM questions WHERE exam_category_id = ? AND category = ? "
+            "ORDER BY year DESC, question_number ASC", (1, 'テクノロジ系')
+        )
+        records_plan = plan(
+            "SELECT * FROM learning_records WHERE question_id = ? ORDER BY attempt_date DESC", (1,)
+        )
+
+        assert 'idx_questions_exam_category_year' in questions_plan
+        assert 'idx_learning_records_question_date' in records_plan
+        assert 'TEMP B-TREE' not in questions_plan + records_plan
+
+    def test_get_random_questions(self, db_manager, questions):
+        """キャッシュしたIDリストからのランダム取得テスト"""
+        db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        sampled = db_manager.get_random_questions('FE', 'テクノロジ系', 5)
+
+        assert len(sampled) == 5
+        assert len({q['id'] for q in sampled}) == 5
+        assert all(q['exam_code'] == 'FE' for q in sampled)
+        assert db_manager.get_random_questions('AP', None, 5) == []
+
+    def test_get_random_questions_cache_invalidated_on_insert(self, db_manager, questions):
+        """一括追加後に問題IDキャッシュが無効化されることのテスト"""
+        db_manager.insert_questions_bulk(questions[:3], 'FE', 2024)
+        assert len(db_manager.get_random_questions('FE', None, 20)) == 3
+
+        db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        assert len(db_manager.get_random_questions('FE', None, 20)) == 10
+
+    def test_get_random_questions_cache_refreshed_after_other_process_insert(self, db_manager, questions):
+        """別のワーカー（別インスタンス）での追加後に問題IDキャッシュを作り直すことのテスト"""
+        db_manager.insert_questions_bulk(questions[:3], 'FE', 2024)
+        assert len(db_manager.get_random_questions('FE', None, 20)) == 3
+
+        DatabaseManager(db_manager.db_path).insert_questions_bulk(questions, 'FE', 2024)
+
+        assert len(db_manager.get_random_questions('FE', None, 20)) == 10
+
+    def test_get_random_questions_cache_refreshed_after_other_process_update(self, db_manager, questions):
+        """別のワーカーで分野が変更された問題をキャッシュから出題しないことのテスト"""
+        db_manager.insert_questions_bulk(questions[:3], 'FE', 2024)
+        assert len(db_manager.get_random_questions('FE', 'テクノロジ系', 20)) == 3
+        moved_id = db_manager.get_questions(exam_type='FE')[0]['id']
+
+        DatabaseManager(db_manager.db_path).update_question(moved_id, {'category': 'ストラテジ系'})
+
+        sampled = db_manager.get_random_questions('FE', 'テクノロジ系', 20)
+        assert moved_id not in {q['id'] for q in sampled}
+        assert all(q['category'] == 'テクノロジ系' for q in sampled)
+
+    def test_cached_info_refreshed_after_write(self, db_manager, questions):
+        """書き込み後のキャッシュ付き取得が最新の値を返すことのテスト"""
+        database_module.cache_manager.clear()
+        assert db_manager.get_database_info()['questions_count'] == 0
+
+        db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        assert db_manager.get_database_info()['questions_count'] == len(questions)
+
+    def test_get_weak_area_questions(self, db_manager, questions):
+        """弱点分野の問題を1クエリで取得するテスト"""
+        for i, question in enumerate(questions):
+            question['category'] = 'テクノロジ系' if i < 3 else 'ストラテジ系'
+        db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        result = db_manager.get_weak_area_questions('FE', ['テクノロジ系'], 6)
+
+        assert len(result) == 6
+        assert len({q['id'] for q in result}) == 6
+        assert [q['category'] for q in result[:3]] == ['テクノロジ系'] * 3
+        assert 'is_fill' not in result[0]
+        assert {('FE', 'テクノロジ系'), ('FE', None)} <= db_manager._id_cache.keys()
+
+    def test_connection_reused_per_thread(self, db_manager):
+        """同一スレッドでは接続を再利用し、スレッドごとに別の接続を使うことのテスト"""
+        with db_manager.get_connection() as first:
+            with db_manager.get_connection() as nested:
+                assert nested is first
+        with db_manager.get_connection() as again:
+            assert again is first
+
+        other = []
+
+        def use_connection():
+            with db_manager.get_connection() as conn:
+                other.append(conn)
+
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        thread.join()
+        assert other[0] is not first
+
+    def test_connections_closed_when_threads_end(self, db_manager):
+        """短命なスレッドの接続はスレッド終了後に閉じられ、プールに残らないことのテスト"""
+        used = []
+
+        def use_connection():
+            with db_manager.get_connection() as conn:
+                conn.execute("SELECT 1")
+                used.append(conn)
+
+        for _ in range(20):
+            thread = threading.Thread(target=use_connection)
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        assert len(db_manager._connections) <= 1  # 初期化したメインスレッドの接続のみ
+        for conn in used:
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+
+    def test_close_all_skips_connections_of_other_process(self, db_manager, monkeypatch):
+        """close_all は別プロセス（fork 前の親）の接続を閉じないことのテスト"""
+        with db_manager.get_connection() as conn:
+            pass
+        parent_pid = os.getpid()
+
+        monkeypatch.setattr(os, 'getpid', lambda: parent_pid + 1)
+        db_manager.close_all()
+        monkeypatch.undo()
+
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+        conn.close()
+
+    def test_uncommitted_changes_discarded(self, db_manager):
+        """コミットしなかった変更は最も外側のブロックを抜けるときに破棄されることのテスト"""
+        with db_manager.get_connection() as conn:
+            conn.execute("INSERT INTO exam_categories (code, name) VALUES ('ZZ', 'テスト')")
+            with db_manager.get_connection():
+                pass
+            assert conn.in_transaction
+
+        with db_manager.get_connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT 1 FROM exam_categories WHERE code = 'ZZ'").fetchone() is None
+
+    def test_close_all_reconnects(self, db_manager):
+        """close_all 後は新しい接続を作成することのテスト"""
+        with db_manager.get_connection() as conn:
+            pass
+
+        db_manager.close_all()
+
+        with db_manager.get_connection() as reconnected:
+            assert reconnected is not conn
+            assert reconnected.execute("SELECT COUNT(*) FROM exam_categories").fetchone()[0] > 0
+
+    def test_restore_database_keeps_other_thread_connections(self, db_manager, questions, tmp_path):
+        """復元後も他スレッドの接続を使い続けられ、復元した内容を参照することのテスト"""
+        db_manager.insert_questions_bulk(questions[:3], 'FE', 2024)
+        backup_path = db_manager.backup_database(tmp_path / 'backup.db')
+        db_manager.insert_questions_bulk(questions, 'FE', 2024)
+
+        started, restored, counts = threading.Event(), threading.Event(), []
+
+        def reader():
+            with db_manager.get_connection() as conn:
+                started.set()
+                restored.wait()
+                counts.append(conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0])
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        started.wait()
+        db_manager.restore_database(backup_path)
+        restored.set()
+        thread.join()
+
+        assert counts == [3]
+        assert len(db_manager.get_questions(exam_type='FE')) == 3
+
+    def test_record_answer_updates_statistics(self, db_manager, questions):
+        """回答の記録と統計の更新が行われることのテスト"""
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+
+        db_manager.record_answer(question_id, 1, True, response_time=10)
+        db_manager.record_answer(question_id, 2, False, response_time=20)
+
+        records = db_manager.get_learning_records(question_id=question_id)
+        assert len(records) == 2
+        assert all(record['attempt_date'] for record in records)
+        with db_manager.get_connection() as conn:
+            stats = conn.execute(
+                "SELECT total_questions, correct_answers, incorrect_answers, average_response_time "
+                "FROM study_statistics WHERE category = 'テクノロジ系'"
+            ).fetchone()
+        assert tuple(stats) == (2, 1, 1, 15)
+
+    def test_record_answer_rolled_back_with_statistics(self, db_manager, questions, monkeypatch):
+        """統計の更新に失敗した場合は回答の記録も破棄されることのテスト"""
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('statistics error')
+
+        monkeypatch.setattr(db_manager, '_update_statistics', fail)
+        with pytest.raises(RuntimeError):
+            db_manager.record_answer(question_id, 1, True)
+
+        assert db_manager.get_learning_records(question_id=question_id) == []
+
+    def test_bulk_record_answers_accumulates_statistics(self, db_manager, questions):
+        """一括記録の統計が既存の統計行に加算されることのテスト"""
+        db_manager.insert_questions_bulk(questions[:2], 'FE', 2024)
+        question_ids = [q['id'] for q in db_manager.get_questions(exam_type='FE')]
+        db_manager.record_answer(question_ids[0], 1, True, response_time=10)
+
+        db_manager.bulk_record_answers([
+            {'question_id': question_ids[0], 'user_answer': 1, 'is_correct': True, 'response_time': 40},
+            {'question_id': question_ids[1], 'user_answer': 2, 'is_correct': False},
+        ])
+
+        with db_manager.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT total_questions, correct_answers, incorrect_answers, average_response_time "
+                "FROM study_statistics"
+            ).fetchall()
+        assert [tuple(row) for row in rows] == [(3, 2, 1, 30)]
+
+    def test_duplicate_statistics_merged_for_unique_index(self, db_manager):
+        """既存DBの重複した統計行が一意インデックス作成時に集約されることのテスト"""
+        with db_manager.get_connection() as conn:
+            conn.execute("DROP INDEX idx_study_statistics_unique_category")
+            conn.executemany(
+                "INSERT INTO study_statistics (exam_category_id, category, total_questions, "
+                "correct_answers, incorrect_answers, average_response_time) VALUES (1, 'テクノロジ系', ?, ?, ?, ?)",
+                [(1, 1, 0, 10), (3, 1, 2, 30)]
+            )
+            conn.commit()
+
+            db_manager._create_indexes(conn)
+
+            rows = conn.execute(
+                "SELECT total_questions, correct_answers, incorrect_answers, average_response_time "
+                "FROM study_statistics"
+            ).fetchall()
+        assert [tuple(row) for row in rows] == [(4, 2, 2, 25)]
+
+    def test_get_progress_over_time(self, db_manager, questions):
+        """指定日数内の学習記録を日別に集計することのテスト"""
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+        db_manager.record_answer(question_id, 1, True)
+        db_manager.record_answer(question_id, 2, False)
+        with db_manager.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO learning_records (question_id, user_answer, is_correct, attempt_date) "
+                "VALUES (?, 1, 1, datetime('now', '-10 days'))", (question_id,)
+            )
+            conn.commit()
+
+        progress = db_manager.get_progress_over_time('FE', days=7)
+
+        assert [(row['total_questions'], row['correct_answers']) for row in progress] == [(2, 1)]
+        assert len(db_manager.get_progress_over_time('FE', days=30)) == 2
+        assert db_manager.get_progress_over_time('AP', days=30) == []
+
+    def test_choices_decoded_with_and_without_orjson(self, db_manager, questions, monkeypatch):
+        """選択肢JSONの復元結果が orjson の有無によらず同じであることのテスト"""
+        questions[0]['choices'] = ['「ア」', 'B\n改行', '"引用"', '']
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+
+        decoded = db_manager.get_question(question_id)['choices']
+        monkeypatch.setattr(database_module, '_loads_choices', json.loads)
+
+        assert decoded == db_manager.get_question(question_id)['choices'] == questions[0]['choices']
+
+    def test_initial_data(self, db_manager):
+        """試験区分・システム設定の初期データが投入されることのテスト"""
+        with db_manager.get_connection() as conn:
+            exams = conn.execute("SELECT name, code, description FROM exam_categories ORDER BY id").fetchall()
+            settings = conn.execute("SELECT COUNT(*) FROM system_settings").fetchone()[0]
+
+        assert [row['code'] for row in exams] == ['FE', 'AP', 'IP', 'SG']
+        assert exams[0]['name'] == '基本情報技術者試験'
+        assert settings == 3
+
+    def test_get_learning_records_question_text_on_demand(self, db_manager, questions):
+        """学習記録の問題文は指定した場合のみ取得することのテスト"""
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+        db_manager.record_answer(question_id, 1, True)
+
+        record = db_manager.get_learning_records(limit=1)[0]
+        detailed = db_manager.get_learning_records(limit=1, include_question_text=True)[0]
+
+        assert 'question_text' not in record
+        assert record['category'] == 'テクノロジ系'
+        assert record['exam_name'] == '基本情報技術者試験'
+        assert detailed['question_text'] == 'テスト問題1'
+
+    def test_iter_learning_records(self, db_manager, questions):
+        """学習記録を新しい順に1件ずつ取得できることのテスト"""
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+        for user_answer in (1, 2, 3):
+            db_manager.record_answer(question_id, user_answer, user_answer == 1)
+
+        records = db_manager.iter_learning_records(limit=2)
+
+        assert not isinstance(records, list)
+        assert [r['user_answer'] for r in records] == [
+            r['user_answer'] for r in db_manager.get_learning_records(limit=2)
+        ]
+
+    def test_iter_learning_records_does_not_hold_pooled_connection(self, db_manager, questions, monkeypatch):
+        """読み出しの合間に同じスレッドで書き込んでも確定し、中断しても接続が残らないことのテスト"""
+        monkeypatch.setattr(database_module, 'LEARNING_RECORDS_FETCH_SIZE', 2)
+        db_manager.insert_questions_bulk(questions[:1], 'FE', 2024)
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+        for _ in range(5):
+            db_manager.record_answer(question_id, 1, True)
+
+        records = db_manager.iter_learning_records()
+        next(records)
+        assert db_manager._local.pooled.depth == 0
+
+        with db_manager.get_connection() as conn:
+            conn.execute("INSERT INTO exam_categories (code, name) VALUES ('ZZ', 'テスト')")
+            conn.commit()
+        assert len(list(records)) == 4
+        records.close()
+
+        with db_manager.get_connection() as conn:
+            assert conn.execute("SELECT 1 FROM exam_categories WHERE code = 'ZZ'").fetchone()
@@ -0,0 +1,106 @@
+"""
+ProgressTracker のテスト
+"""
+import threading
+
+import pytest
+
+from src.core.database import DatabaseManager
+from src.core.progress_tracker import ProgressTracker, _flush_at_exit
+
+
+class TestProgressTracker:
+    """ProgressTracker のテスト"""
+
+    @pytest.fixture
+    def db_manager(self, tmp_path, monkeypatch):
+        """一時ファイルを使用するDBマネージャー"""
+        monkeypatch.setenv('DATABASE_PATH', str(tmp_path / 'test.db'))
+        db = DatabaseManager()
+        db.insert_questions_bulk([
+            {
+                'question_number': i,
+                'question_text': f'テスト問題{i}',
+                'choices': ['選択肢1', '選択肢2', '選択肢3', '選択肢4'],
+                'correct_answer': 1,
+                'category': 'テクノロジ系'
+            }
+            for i in range(1, 4)
+        ], 'FE', 2024)
+        return db
+
+    @pytest.fixture
+    def tracker(self, db_manager):
+        """テスト用ProgressTracker"""
+        return ProgressTracker(db_manager)
+
+    def test_answers_flushed_at_session_end(self, tracker, db_manager):
+        """セッション中の回答が終了時にまとめて記録されることのテスト"""
+        question_ids = [q['id'] for q in db_manager.get_questions(exam_type='FE')]
+        tracker.start_study_session('テストセッション', 'FE')
+
+        for question_id in question_ids:
+            tracker.record_answer(question_id, user_answer=1, correct_answer=1, response_time=10)
+
+        assert db_manager.get_learning_records() == []
+
+        summary = tracker.end_study_session()
+
+        assert summary.total_questions == 3
+        assert len(db_manager.get_learning_records()) == 3
+
+    def test_answers_flushed_at_batch_size(self, tracker, db_manager, monkeypatch):
+        """バッファが一定件数に達すると記録されることのテスト"""
+        monkeypatch.setattr(ProgressTracker, 'ANSWER_FLUSH_SIZE', 2)
+        question_ids = [q['id'] for q in db_manager.get_questions(exam_type='FE')]
+        tracker.start_study_session('テストセッション', 'FE')
+
+        for question_id in question_ids:
+            tracker.record_answer(question_id, user_answer=2, correct_answer=1)
+
+        assert len(db_manager.get_learning_records()) == 2
+        assert tracker.flush_answers() == 1
+        assert len(db_manager.get_learning_records()) == 3
+
+    def test_attempt_date_recorded_at_answer_time(self, tracker, db_manager):
+        """記録される回答日時が回答時点（UTC）であることのテスト"""
+        from datetime import datetime, timezone
+
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+        tracker.start_study_session('テストセッション', 'FE')
+        tracker.record_answer(question_id, user_answer=1, correct_answer=1)
+        tracker.end_study_session()
+
+        record = db_manager.get_learning_records()[0]
+        attempt_date = datetime.strptime(record['attempt_date'], '%Y-%m-%d %H:%M:%S')
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        assert abs((now - attempt_date).total_seconds()) < 5
+
+    def test_answers_flushed_at_exit(self, tracker, db_manager):
+        """終了時の書き込みでバッファ中の回答が記録されることのテスト"""
+        question_id = db_manager.get_questions(exam_type='FE')[0]['id']
+        tracker.start_study_session('テストセッション', 'FE')
+        tracker.record_answer(question_id, user_answer=1, correct_answer=1)
+
+        _flush_at_exit()
+
+        assert len(db_manager.get_learning_records()) == 1
+
+    def test_concurrent_answers_all_recorded(self, tracker, db_manager, monkeypatch):
+        """複数スレッドから記録した回答が欠けずに書き込まれることのテスト"""
+        monkeypatch.setattr(ProgressTracker, 'ANSWER_FLUSH_SIZE', 7)
+        question_ids = [q['id'] for q in db_manager.get_questions(exam_type='FE')]
+        tracker.start_study_session('テストセッション', 'FE')
+
+        def answer():
+            for question_id in question_ids * 10:
+                tracker.record_answer(question_id, user_answer=1, correct_answer=1)
+
+        threads = [threading.Thread(target=answer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tracker.flush_answers()
+
+        assert len(db_manager.get_learning_records()) == 4 * 10 * len(question_ids)
@@ -170,6 +170,30 @@ class TestSessionService:
                 study_mode='practice'
             )
     
+    def test_process_answer_mock_exam_skips_review(self, session_service, mock_db_manager):
+        """模擬試験モードでは結果表示をスキップすることのテスト"""
+        test_questions = [
+            {'id': 1, 'correct_answer': 2, 'explanation': 'テスト解説'},
+            {'id': 2, 'correct_answer': 3, 'explanation': 'テスト解説'}
+        ]
+        
+        with patch('src.web.services.session_service.session', {
+            'questions': test_questions,
+            'current_question': 0,
+            'answers': [],
+            'study_mode': 'mock_exam'
+        }):
+            result = session_service.process_answer(2)
+            
+            assert result['skip_review'] is True
+            assert result['is_last_question'] is False
+            mock_db_manager.record_answer.assert_called_once_with(
+                question_id=1,
+                user_answer=2,
+                is_correct=True,
+                study_mode='mock_exam'
+            )
+    
     def test_calculate_session_result(self, session_service, mock_db_manager):
         """セッション結果計算のテスト"""
         # セッション状態をモック
@@ -224,10 +248,10 @@ class TestSessionService:
             {'category': 'データベース'}
         ]
         
-        # 各分野からの問題をモック
-        mock_db_manager.get_random_questions.side_effect = [
-            [{'id': 1, 'category': 'ネットワーク'}],
-            [{'id': 2, 'category': 'データベース'}]
+        # 弱点分野の問題を1クエリで取得するメソッドをモック
+        mock_db_manager.get_weak_area_questions.return_value = [
+            {'id': 1, 'category': 'ネットワーク'},
+            {'id': 2, 'category': 'データベース'}
         ]
         
         questions = session_service._get_weak_area_questions('FE', 4)
@@ -235,8 +259,11 @@ class TestSessionService:
         # 弱点分野取得の確認
         mock_db_manager.get_weak_areas.assert_called_once_with('FE', limit=3)
         
-        # 問題取得呼び出しの確認
-        assert mock_db_manager.get_random_questions.call_count == 2
+        # 問題取得呼び出しの確認（分野ごとの個別取得は行わない）
+        mock_db_manager.get_weak_area_questions.assert_called_once_with(
+            'FE', ['ネットワーク', 'データベース'], 4
+        )
+        mock_db_manager.get_random_questions.assert_not_called()
         
         # 結果の確認
         assert len(questions) == 2
\ No newline at end of file